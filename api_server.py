@@ -0,0 +1,378 @@
+"""
+Local HTTP JSON API over the investor database.
+
+Serves the queries of query_engine with the standard library's threading
+HTTP server, reusing the dataset loaded in the process (see
+query_engine.open_deal_store). Every response carries an ETag derived from
+the data's fingerprint and the request, so clients revalidate with
+If-None-Match and get 304 Not Modified until the data changes. Encoded
+responses are kept in an in-memory LRU cache under the same tag, and long
+lists are streamed in chunks of rows instead of being encoded in one piece.
+
+Endpoints (GET):
+    /investors                        Filtered investor summary
+    /summary                          Totals of the filtered investor summary
+    /investors/{name}                 Profile figures of an investor
+    /investors/{name}/deals           Deals of an investor
+    /investors/{name}/co-investors    Top co-investors (k, by)
+    /investors/{name}/similar         Most similar investors (k)
+    /companies?q=...                  Deals of companies matching q (fuzzy)
+
+/investors and /summary take the sidebar filters as repeatable parameters
+(geography, deal_size, vertical, stage), plus lead_only and investor (name
+text). List endpoints take offset and limit, and /investors takes sort (a key
+of query_engine.INVESTOR_SORT_KEYS).
+
+Usage:
+    python api_server.py data.json --port 8000
+"""
+import argparse
+import hashlib
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from coinvest import CO_INVESTOR_WEIGHTS
+from query_engine import INVESTOR_SORT_KEYS, LRUCache, investor_profile, open_deal_store, sort_investors
+
+# Query parameter -> deal column filtered (see query_engine.FILTER_COLUMNS)
+FILTER_PARAMETERS = {
+    'geography': 'Geography',
+    'deal_size': 'Deal Size Category',
+    'vertical': 'Climate Vertical',
+    'stage': 'Funding Stage',
+}
+
+# Lists longer than this are streamed with chunked transfer encoding
+STREAM_ROWS = 1_000
+
+# Rows encoded per chunk of a streamed list
+CHUNK_ROWS = 1_000
+
+# Responses larger than this are streamed but not cached
+MAX_CACHED_BYTES = 4 << 20
+
+
+class NotFound(Exception):
+    """Raised for a request naming an unknown endpoint or investor (404)."""
+
+
+def json_records(df, chunk_rows=CHUNK_ROWS):
+    """
+    Encode a table as the rows of a JSON array, a chunk of rows at a time.
+
+    Args:
+        df (pd.DataFrame): Table to encode (dates are written as YYYY-MM-DD)
+        chunk_rows (int): Rows per chunk
+
+    Yields:
+        bytes: Comma-separated JSON objects, without the enclosing brackets;
+            chunks after the first start with a comma
+    """
+    dates = [column for column in df.columns if df[column].dtype.kind == 'M']
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        if dates:
+            chunk = chunk.assign(**{column: chunk[column].dt.strftime('%Y-%m-%d') for column in dates})
+        encoded = chunk.to_json(orient='records', force_ascii=False)[1:-1].encode('utf-8')
+        yield encoded if start == 0 else b',' + encoded
+
+
+def _list_response(df, offset, limit):
+    # {"total": ..., "offset": ..., "items": [...]} of a page of a table
+    page = df.iloc[offset:offset + limit] if limit is not None else df.iloc[offset:]
+    head = json.dumps({'total': len(df), 'offset': offset})[:-1].encode('utf-8') + b', "items": ['
+
+    def chunks():
+        # Encoded lazily, so a streamed list is never held in memory in full
+        yield head
+        yield from json_records(page)
+        yield b']}'
+
+    return chunks(), len(page) > STREAM_ROWS
+
+
+def _json_response(payload):
+    return [json.dumps(payload, ensure_ascii=False).encode('utf-8')], False
+
+
+def _etag_matches(if_none_match, etag):
+    """
+    Whether an If-None-Match header matches an entity tag (weak comparison).
+
+    Args:
+        if_none_match (str): Header value: '*' or a comma-separated list of
+            tags, each optionally weak (W/"...")
+        etag (str): Strong tag of the current response
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+def _flag(query, name):
+    return query.get(name, [''])[-1].lower() in ('1', 'true', 'yes')
+
+
+def _integer(query, name, default, minimum=0):
+    # Last value of an integer parameter; ValueError (400) if malformed
+    if name not in query:
+        return default
+    try:
+        value = int(query[name][-1])
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer") from None
+    if value < minimum:
+        raise ValueError(f"'{name}' must be at least {minimum}")
+    return value
+
+
+def _choice(query, name, choices, default):
+    value = query.get(name, [default])[-1]
+    if value not in choices:
+        raise ValueError(f"'{name}' must be one of: {', '.join(choices)}")
+    return value
+
+
+class InvestorApi:
+    """
+    Routes API requests to a deal store and caches their encoded responses.
+
+    Safe to share between the server's request threads.
+    """
+
+    def __init__(self, filepath, cache_size=1024):
+        """
+        Args:
+            filepath (str): JSON deals file or SQLite database (see query_engine.open_deal_store)
+            cache_size (int): Encoded responses kept in memory
+        """
+        self.filepath = filepath
+        self.responses = LRUCache(maxsize=cache_size)
+        # Filtered summaries, shared by /investors and /summary and by every page and sort order
+        self.summaries = LRUCache(maxsize=256)
+
+    def respond(self, target, if_none_match=None):
+        """
+        Answer a GET request.
+
+        Args:
+            target (str): Request path and query string
+            if_none_match (str): If-None-Match header of the request, if any
+
+        Returns:
+            tuple: (status, ETag or None, body chunks, streamed); a streamed
+                body is a generator to send with chunked transfer encoding,
+                otherwise it is a list holding the whole body
+        """
+        url = urlsplit(target)
+        # Split before unquoting, so names may contain an encoded "/"
+        segments = [unquote(segment) for segment in url.path.strip('/').split('/')]
+        query = parse_qs(url.query, keep_blank_values=True)
+
+        try:
+            store = open_deal_store(self.filepath)
+        except ValueError as e:
+            return 503, None, *_json_response({'error': f"Error loading data: {e}"})
+
+        # One tag per data version and normalized request
+        request_key = (tuple(segments), tuple(sorted((name, tuple(values)) for name, values in query.items())))
+        etag = '"' + hashlib.sha256(repr((store.fingerprint, request_key)).encode('utf-8')).hexdigest()[:32] + '"'
+        if if_none_match is not None and _etag_matches(if_none_match, etag):
+            return 304, etag, [], False
+
+        body = self.responses.get(etag)
+        if body is not None:
+            return 200, etag, [body], False
+
+        try:
+            chunks, streamed = self._route(store, segments, query)
+        except NotFound as e:
+            return 404, None, *_json_response({'error': str(e)})
+        except ValueError as e:
+            return 400, None, *_json_response({'error': str(e)})
+
+        if streamed:
+            return 200, etag, self._caching(etag, chunks), True
+
+        body = b''.join(chunks)
+        if len(body) <= MAX_CACHED_BYTES:
+            self.responses.put(etag, body)
+        return 200, etag, [body], False
+
+    def _caching(self, etag, chunks):
+        # Pass streamed chunks through, caching the body if it stays small enough
+        kept, size = [], 0
+        for chunk in chunks:
+            size += len(chunk)
+            if size <= MAX_CACHED_BYTES:
+                kept.append(chunk)
+            yield chunk
+        if size <= MAX_CACHED_BYTES:
+            self.responses.put(etag, b''.join(kept))
+
+    def _summary(self, store, query):
+        # Investor summary of the request's filters, computed once per data version
+        lead_only = _flag(query, 'lead_only')
+        filters = {column: query.get(name) for name, column in FILTER_PARAMETERS.items()}
+        investor_search = query.get('investor', [''])[-1]
+
+        key = (store.fingerprint, lead_only, tuple(tuple(sorted(values or ())) for values in filters.values()), investor_search)
+        summary = self.summaries.get(key)
+        if summary is None:
+            summary = store.investor_summary(lead_only=lead_only, filters=filters, investor_search=investor_search)
+            self.summaries.put(key, summary)
+        return summary
+
+    def _route(self, store, segments, query):
+        # (body chunks, streamed) of a request; NotFound -> 404, ValueError -> 400
+        offset = _integer(query, 'offset', 0)
+        limit = _integer(query, 'limit', None, minimum=1)
+
+        if segments in (['investors'], ['summary']):
+            summary = self._summary(store, query) if not store.is_empty() else None
+
+            if segments == ['summary']:
+                total_investors = len(summary) if summary is not None else 0
+                total_invested = int(summary['Total Invested'].sum()) if total_investors else 0
+                return _json_response({
+                    'investors': total_investors,
+                    'total_invested': total_invested,
+                    'average_invested': total_invested / total_investors if total_investors else 0,
+                })
+
+            if summary is None or summary.empty:
+                return _json_response({'total': 0, 'offset': offset, 'items': []})
+            if 'sort' in query:
+                summary = sort_investors(summary, _choice(query, 'sort', list(INVESTOR_SORT_KEYS), None))
+            return _list_response(summary, offset, limit)
+
+        if len(segments) in (2, 3) and segments[0] == 'investors':
+            name = segments[1]
+            if store.is_empty():
+                raise NotFound(f"Unknown investor: {name}")
+
+            if len(segments) == 2:
+                profile = investor_profile(store, name)
+                if profile['deals'].empty:
+                    raise NotFound(f"Unknown investor: {name}")
+                return _json_response({
+                    'name': name,
+                    'other_names': profile['other_names'],
+                    'deals_done': int(profile['deals_done']),
+                    'total_invested': int(profile['total_invested']),
+                    'verticals': {str(value): int(count) for value, count in profile['verticals'].items()},
+                    'stages': {str(value): int(count) for value, count in profile['stages'].items()},
+                })
+
+            deals = store.investor_deals(name)
+            if deals.empty:
+                raise NotFound(f"Unknown investor: {name}")
+            if segments[2] == 'deals':
+                return _list_response(deals, offset, limit)
+            if segments[2] == 'co-investors':
+                by = _choice(query, 'by', list(CO_INVESTOR_WEIGHTS), "Shared Deals")
+                return _list_response(store.co_investors(name, k=_integer(query, 'k', 10, minimum=1), by=by), offset, limit)
+            if segments[2] == 'similar':
+                return _list_response(store.similar_investors(name, k=_integer(query, 'k', 10, minimum=1)), offset, limit)
+
+        if segments == ['companies']:
+            search = query.get('q', [''])[-1].strip()
+            if not search:
+                raise ValueError("'q' is required")
+            if store.is_empty():
+                return _json_response({'total': 0, 'offset': offset, 'items': []})
+            matches = store.search_companies(search, fuzzy=_flag(query, 'fuzzy'))
+            return _list_response(matches, offset, limit)
+
+        raise NotFound(f"No such endpoint: /{'/'.join(segments)}")
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP/1.1 handler serving an InvestorApi (the server's api attribute).
+    """
+
+    # Keep-alive connections and chunked streaming need HTTP/1.1
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; with Nagle's algorithm the body
+    # waits for the client's delayed ACK of the headers (about 40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        status, etag, body, streamed = self.server.api.respond(self.path, self.headers.get('If-None-Match'))
+
+        self.send_response(status)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            # Cacheable by clients, but always revalidated against the tag
+            self.send_header('Cache-Control', 'no-cache')
+        if status == 304:
+            self.end_headers()
+            return
+
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if not streamed:
+            self.send_header('Content-Length', str(len(body[0])))
+            self.end_headers()
+            self.wfile.write(body[0])
+            return
+
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for chunk in body:
+            if chunk:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, format, *args):
+        # Request logging would dominate the cost of cached responses
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(filepath, host='127.0.0.1', port=8000, quiet=False):
+    """
+    Create an API server for a data file (call serve_forever to run it).
+
+    Args:
+        filepath (str): JSON deals file or SQLite database
+        host (str): Interface to listen on
+        port (int): Port to listen on (0 picks a free port)
+        quiet (bool): Do not log requests
+
+    Returns:
+        ThreadingHTTPServer: Server with one thread per connection
+    """
+    server = ThreadingHTTPServer((host, port), ApiRequestHandler)
+    server.daemon_threads = True
+    server.api = InvestorApi(filepath)
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the investor database as a local HTTP JSON API.")
+    parser.add_argument('source', help='JSON deals file or SQLite database')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--quiet', action='store_true', help='Do not log requests')
+    args = parser.parse_args()
+
+    server = make_server(args.source, args.host, args.port, args.quiet)
+    print(f"Serving {args.source} on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,21 @@
 
 import streamlit as st
 import pandas as pd
-import math
-import requests
-from bs4 import BeautifulSoup
-import openai
-import json
+import numpy as np
+import os
+import sqlite3
+
+from coinvest import CO_INVESTOR_WEIGHTS
+from formatting import format_currency, format_currency_series
+from fx import DEFAULT_FX_TABLE
+from similarity import PROFILE_COLUMNS
+from trends import TREND_DIMENSIONS, TREND_MEASURES, month_starts
+from article_fetcher import ArticleCache, ArticleFetcher, FundingExtractor, deal_record
+from table_cache import CACHE_DIR_NAME
+from query_engine import (
+    INVESTOR_SORT_KEYS, LRUCache, extract_funding_data, investor_profile, open_deal_store,
+    page_bounds, sort_investors, summary_cache_key
+)
 
 # Configure Streamlit page for wide layout and better visibility
 st.set_page_config(
@@ -62,365 +72,105 @@ with col2:
     st.markdown('<h1 class="funds-title">FundsRUS</h1>', unsafe_allow_html=True)
     st.markdown('<p class="subtitle">Track funding rounds, investors, and trends in climate technology startups</p>', unsafe_allow_html=True)
 
-def load_data(filepath):
+@st.cache_resource
+def get_summary_cache():
     """
-    Load data from a JSON file and return as a pandas DataFrame.
-
-    Args:
-        filepath (str): Path to the JSON file
-
-    Returns:
-        pd.DataFrame: DataFrame with 'Funding Date' column converted to datetime
-    """
-    import json
-
-    try:
-        # Read the JSON file as text first
-        with open(filepath, 'r', encoding='utf-8') as file:
-            content = file.read().strip()
-
-        # Wrap the content in square brackets to make it a proper JSON array
-        if not content.startswith('['):
-            content = '[' + content + ']'
-
-        # Parse the JSON
-        data = json.loads(content)
-
-        # Create DataFrame from the list of dictionaries
-        df = pd.DataFrame(data)
-
-        # Convert 'Funding Date' column to datetime objects
-        df['Funding Date'] = pd.to_datetime(df['Funding Date'])
-
-        # Clean Amount column - replace infinite and NaN values with 0
-        if 'Amount' in df.columns:
-            df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')  # Convert to numeric, NaN for invalid
-            df['Amount'] = df['Amount'].replace([float('inf'), -float('inf')], 0)  # Replace infinite with 0
-            df['Amount'] = df['Amount'].fillna(0)  # Replace NaN with 0
-
-        return df
-
-    except Exception as e:
-        st.error(f"Error loading data: {str(e)}")
-        return pd.DataFrame()  # Return empty DataFrame on error
-
-def create_investor_summary(df, lead_only=False):
-    """
-    Create an investor-centric summary DataFrame from deals data.
-
-    Args:
-        df (pd.DataFrame): Original deals DataFrame
-        lead_only (bool): If True, only include lead investors
-
-    Returns:
-        pd.DataFrame: Investor summary with metrics
-    """
-    investor_data = []
-
-    # Get all unique investors from both columns
-    all_investors = set()
-
-    for _, row in df.iterrows():
-        # Parse lead investors
-        lead_investors = str(row['Lead Investor(s)']).split(', ') if pd.notna(row['Lead Investor(s)']) else []
-        other_investors = str(row['Other Investors']).split(', ') if pd.notna(row['Other Investors']) else []
-
-        # Clean and add investors (skip "Not specified")
-        for investor in lead_investors:
-            investor = investor.strip()
-            if investor and investor != "Not specified" and investor != "nan":
-                all_investors.add(investor)
-
-        # Add other investors only if not lead_only
-        if not lead_only:
-            for investor in other_investors:
-                investor = investor.strip()
-                if investor and investor != "Not specified" and investor != "nan":
-                    all_investors.add(investor)
-
-    # Calculate metrics for each investor
-    for investor in all_investors:
-        investor_deals = []
-        total_invested = 0
-        verticals = []
-        stages = []
-        lead_deals = 0
-
-        # Find all deals this investor participated in
-        for _, row in df.iterrows():
-            lead_investors = str(row['Lead Investor(s)']).split(', ') if pd.notna(row['Lead Investor(s)']) else []
-            other_investors = str(row['Other Investors']).split(', ') if pd.notna(row['Other Investors']) else []
-
-            # Clean investor names for comparison
-            lead_investors = [inv.strip() for inv in lead_investors]
-            other_investors = [inv.strip() for inv in other_investors]
-
-            # Check participation
-            is_lead = investor in lead_investors
-            is_other = investor in other_investors
-
-            if is_lead or (is_other and not lead_only):
-                investor_deals.append(row)
-                # Safely add amount, handling NaN and infinite values
-                amount = row['Amount']
-                if pd.notna(amount) and not math.isinf(amount):
-                    total_invested += amount
-                verticals.append(row['Climate Vertical'])
-                stages.append(row['Funding Stage'])
-                if is_lead:
-                    lead_deals += 1
-
-        # Calculate preferred verticals (top 2-3)
-        vertical_counts = pd.Series(verticals).value_counts()
-        preferred_verticals = vertical_counts.head(3).index.tolist()
-
-        # Calculate preferred stages (top 2-3)
-        stage_counts = pd.Series(stages).value_counts()
-        preferred_stages = stage_counts.head(3).index.tolist()
-
-        investor_data.append({
-            'Investor Name': investor,
-            'Deals Done': len(investor_deals),
-            'Lead Deals': lead_deals,
-            'Total Invested': total_invested,
-            'Preferred Verticals': ', '.join(preferred_verticals),
-            'Preferred Stages': ', '.join(preferred_stages)
-        })
-
-    # Create DataFrame and sort by total invested
-    investor_df = pd.DataFrame(investor_data)
-    investor_df = investor_df.sort_values('Total Invested', ascending=False).reset_index(drop=True)
-
-    return investor_df
-
-def get_investor_deals(df, investor_name):
-    """
-    Get all deals for a specific investor.
-
-    Args:
-        df (pd.DataFrame): Original deals DataFrame
-        investor_name (str): Name of the investor
+    Return the process-wide investor summary cache, shared across reruns and sessions.
 
     Returns:
-        pd.DataFrame: All deals this investor participated in
+        LRUCache: Filtered investor summaries keyed by summary_cache_key
     """
-    investor_deals = []
+    return LRUCache(maxsize=256, ttl=3600)
 
-    for _, row in df.iterrows():
-        lead_investors = str(row['Lead Investor(s)']).split(', ') if pd.notna(row['Lead Investor(s)']) else []
-        other_investors = str(row['Other Investors']).split(', ') if pd.notna(row['Other Investors']) else []
+# On-disk cache of fetched articles and their extractions
+ARTICLE_CACHE_DIR = os.path.join(CACHE_DIR_NAME, 'articles')
 
-        # Clean investor names for comparison
-        lead_investors = [inv.strip() for inv in lead_investors]
-        other_investors = [inv.strip() for inv in other_investors]
-
-        if investor_name in lead_investors or investor_name in other_investors:
-            # Add role information
-            role = "Lead" if investor_name in lead_investors else "Other"
-            row_dict = row.to_dict()
-            row_dict['Role'] = role
-            investor_deals.append(row_dict)
-
-    return pd.DataFrame(investor_deals)
-
-def categorize_deal_size(amount):
+@st.cache_resource
+def get_article_services():
     """
-    Categorize deal size into buckets relevant to funding stages.
-
-    Args:
-        amount (float): Deal amount in USD
+    Shared article fetcher and extractor for all sessions.
 
     Returns:
-        str: Deal size category
+        tuple: (ArticleFetcher with a pooled session, FundingExtractor), both
+            backed by the on-disk article cache
     """
-    if amount < 1_000_000:
-        return "Pre-Seed (<$1M)"
-    elif amount <= 5_000_000:
-        return "Seed ($1M-$5M)"
-    elif amount <= 20_000_000:
-        return "Series A ($5M-$20M)"
-    else:
-        return "Series B+ (>$20M)"
+    cache = ArticleCache(ARTICLE_CACHE_DIR)
+    return ArticleFetcher(cache=cache), FundingExtractor(cache=cache)
 
-def add_geography_column(df):
+def extract_data_with_ai(url, fetcher=None, extractor=None, client=None):
     """
-    Add geography information based on investor names and known patterns.
-    This is a simplified approach - in production, you'd have a proper database.
-
-    Args:
-        df (pd.DataFrame): Original deals DataFrame
-
-    Returns:
-        pd.DataFrame: DataFrame with Geography column added
-    """
-    df = df.copy()
-
-    # Simple geography mapping based on known investor patterns
-    # This is a basic implementation - in reality you'd have a comprehensive database
-    north_america_indicators = [
-        'ventures', 'capital', 'partners', 'fund', 'investment', 'vc',
-        'sequoia', 'andreessen', 'kleiner', 'accel', 'benchmark', 'greylock',
-        'first round', 'union square', 'spark', 'foundry', 'insight',
-        'general catalyst', 'nea', 'khosla', 'draper', 'sv angel'
-    ]
-
-    europe_indicators = [
-        'european', 'london', 'berlin', 'paris', 'stockholm', 'amsterdam',
-        'atomico', 'balderton', 'accel', 'index', 'northzone', 'creandum',
-        'eurazeo', 'lakestar', 'rocket', 'target global'
-    ]
-
-    def determine_geography(lead_investors, other_investors):
-        all_investors = str(lead_investors).lower() + ' ' + str(other_investors).lower()
-
-        # Count indicators for each region
-        na_score = sum(1 for indicator in north_america_indicators if indicator in all_investors)
-        eu_score = sum(1 for indicator in europe_indicators if indicator in all_investors)
-
-        if na_score > eu_score:
-            return "North America"
-        elif eu_score > na_score:
-            return "Europe"
-        else:
-            return "Global/Other"
-
-    # Apply geography determination
-    df['Geography'] = df.apply(
-        lambda row: determine_geography(row['Lead Investor(s)'], row['Other Investors']),
-        axis=1
-    )
-
-    return df
-
-def extract_data_with_ai(url):
-    """
-    Extract funding data from a news article URL using AI.
+    Extract funding data from a news article URL (see query_engine.extract_funding_data).
 
     Args:
         url (str): URL of the news article
+        fetcher (ArticleFetcher): Fetcher to use (default: the shared one)
+        extractor (FundingExtractor): Extractor to use (default: the shared one)
+        client: Model client exposing chat.completions.create (default: openai
+            configured with OPENAI_API_KEY from the Streamlit secrets)
 
     Returns:
         dict: Extracted funding data or error message
     """
-    try:
-        # Step A: Fetch and parse the article text
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Find the main article body (this might need tuning for different sites)
-        article_text = ' '.join(p.get_text() for p in soup.find_all('p'))
-
-        if not article_text:
-            return {"error": "Could not extract text from the article."}
-
-        # Step B: Call the OpenAI API
-        system_prompt = """
-        You are an expert financial analyst. Extract the following information from the article text provided.
-        Respond ONLY with a valid JSON object. If information is not found, use null.
-        The schema is: {"companyName": "string", "amount": integer, "currency": "string", "fundingStage": "string", "leadInvestors": ["string"], "otherInvestors": ["string"], "climateVertical": "string"}
-        """
+    if fetcher is None or extractor is None:
+        shared_fetcher, shared_extractor = get_article_services()
+        fetcher = fetcher or shared_fetcher
+        extractor = extractor or shared_extractor
 
-        # Check if OpenAI API key is available and valid
+    api_key = None
+    if client is None:
         try:
             api_key = st.secrets.get("OPENAI_API_KEY", "")
-            if not api_key or api_key == "your-openai-api-key-here":
-                return {"error": "OpenAI API key not configured. Please add a valid OPENAI_API_KEY to .streamlit/secrets.toml"}
         except Exception:
             return {"error": "No secrets found. Please create .streamlit/secrets.toml with OPENAI_API_KEY"}
 
-        openai.api_key = api_key
+    return extract_funding_data(url, fetcher, extractor, client=client, api_key=api_key)
 
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": article_text[:4000]}  # Truncate to fit model context limit
-            ]
-        )
-
-        # Step C: Return the structured data
-        return json.loads(response.choices[0].message.content)
-
-    except Exception as e:
-        error_msg = str(e)
-        if "429" in error_msg or "insufficient_quota" in error_msg or "quota" in error_msg.lower():
-            return {"error": "OpenAI API quota exceeded. Please check your billing at https://platform.openai.com/usage and add credits to your account."}
-        elif "401" in error_msg or "invalid" in error_msg.lower():
-            return {"error": "Invalid OpenAI API key. Please check your API key at https://platform.openai.com/api-keys"}
-        else:
-            return {"error": f"An error occurred: {error_msg}"}
+# Investors rendered per page. A card emits about 11 elements (divider,
+# subheader, tags, three metrics, button), so the largest page caps the
+# card view at roughly 1,100 elements per rerun.
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+DEFAULT_PAGE_SIZE = 25
 
-def format_currency(amount):
-    """
-    Format currency amounts to be human-readable.
-
-    Args:
-        amount (float): Amount to format
-
-    Returns:
-        str: Formatted currency string
-    """
-    # Handle NaN, None, and infinite values
-    if pd.isna(amount) or amount is None:
-        return "$0"
-    if math.isinf(amount):
-        return "N/A"
-
-    # Convert to float and handle any remaining edge cases
-    try:
-        amount = float(amount)
-    except (ValueError, TypeError):
-        return "$0"
-
-    # Handle negative values
-    if amount < 0:
-        return f"-{format_currency(abs(amount))}"
-
-    # Format based on magnitude
-    if amount >= 1_000_000_000:
-        return f"${amount / 1_000_000_000:.1f}B"
-    if amount >= 1_000_000:
-        return f"${amount / 1_000_000:.1f}M"
-    if amount >= 1_000:
-        return f"${amount / 1_000:.1f}K"
-    return f"${amount:.0f}"
-
-def display_investor_profile(df, investor_name):
+def display_investor_profile(store, investor_name):
     """
     Display detailed profile page for a specific investor.
 
     Args:
-        df (pd.DataFrame): Original deals DataFrame
+        store: Deal store (see open_deal_store)
         investor_name (str): Name of the investor
     """
     # Header with investor name
     st.header(f"👤 {investor_name}")
 
+    profile = investor_profile(store, investor_name)
+
+    # Other spellings merged into this investor
+    if profile['other_names']:
+        st.caption("Also listed as: " + ", ".join(profile['other_names']))
+
     # Back to list button
     if st.button("← Back to Investor List"):
         st.session_state.selected_investor = None
         st.rerun()
 
     # Get investor's deals
-    investor_deals_df = get_investor_deals(df, investor_name)
+    investor_deals_df = profile['deals']
 
     if investor_deals_df.empty:
         st.warning("No deals found for this investor.")
         return
 
-    # Calculate investor-specific KPIs
-    total_deals = len(investor_deals_df)
-    total_invested = investor_deals_df['Amount'].sum()
-
-    # Get preferred verticals and stages
-    verticals = investor_deals_df['Climate Vertical'].value_counts()
-    stages = investor_deals_df['Funding Stage'].value_counts()
+    # Investor-specific KPIs, preferred verticals and stages
+    total_deals = profile['deals_done']
+    total_invested = profile['total_invested']
+    verticals = profile['verticals']
+    stages = profile['stages']
 
     # Display KPIs using st.metric for a professional dashboard feel
     col1, col2 = st.columns(2)
     col1.metric(label="Deals Done", value=total_deals)
-    col2.metric(label="Total Capital Deployed (in their deals)", value=format_currency(total_invested))
+    col2.metric(label="Total Capital Deployed (in their deals)", value=format_currency(total_invested),
+                help="Deal amounts converted to USD at the rate of their funding date")
 
     # Display preferred verticals and stages
     col1, col2 = st.columns(2)
@@ -441,18 +191,68 @@ def display_investor_profile(df, investor_name):
         else:
             st.write("No data available")
 
+    # Display the investors they most often share deals with
+    st.subheader("🤝 Top Co-Investors")
+    rank_by = st.radio("Rank co-investors by", list(CO_INVESTOR_WEIGHTS), horizontal=True, key="co_investor_rank")
+    co_investors = store.co_investors(investor_name, k=10, by=rank_by)
+
+    if not co_investors.empty:
+        co_investors['Shared Capital'] = format_currency_series(co_investors['Shared Capital'])
+        st.dataframe(
+            co_investors,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Shared Capital": st.column_config.TextColumn(
+                    "Shared Capital",
+                    help="USD amount of the deals they were both in"
+                ),
+                "Shared Lead Deals": st.column_config.NumberColumn(
+                    "Shared Lead Deals",
+                    help="Deals they both led"
+                )
+            }
+        )
+    else:
+        st.write("No co-investors found")
+
+    # Display the investors whose deals look most like this investor's
+    st.subheader("🧭 Similar Investors")
+    similar = store.similar_investors(investor_name, k=10)
+
+    if not similar.empty:
+        st.dataframe(
+            similar,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Similarity": st.column_config.ProgressColumn(
+                    "Similarity",
+                    help="Cosine similarity of their deal counts by vertical, stage, deal size and geography",
+                    format="%.2f",
+                    min_value=0,
+                    max_value=1
+                )
+            }
+        )
+    else:
+        st.write("No similar investors found")
+
     # Display all deals table
     st.subheader("All Deals")
     st.write(f"📊 **{total_deals} deals found**")
 
     # Prepare deals table for display
     deals_display = investor_deals_df[[
-        'Company Name', 'Funding Date', 'Amount', 'Currency',
+        'Company Name', 'Funding Date', 'Amount', 'Currency', 'Amount (USD)',
         'Funding Stage', 'Climate Vertical', 'Role', 'Source URL'
     ]].copy()
 
-    # Format the Amount column using our helper function
-    deals_display['Amount'] = deals_display['Amount'].apply(format_currency)
+    # Format the amount columns using our helper function
+    deals_display['Amount'] = format_currency_series(deals_display['Amount'])
+    deals_display['Amount (USD)'] = format_currency_series(deals_display['Amount (USD)']).where(
+        deals_display['Amount (USD)'].notna(), "N/A (no exchange rate)"
+    )
 
     # Display the deals table
     st.dataframe(
@@ -477,6 +277,11 @@ def display_investor_profile(df, investor_name):
                 "Currency",
                 width="small"
             ),
+            "Amount (USD)": st.column_config.TextColumn(
+                "Amount (USD)",
+                width="small",
+                help="Converted at the rate of the funding date"
+            ),
             "Funding Stage": st.column_config.TextColumn(
                 "Funding Stage",
                 width="medium"
@@ -502,28 +307,29 @@ if __name__ == "__main__":
     if 'selected_investor' not in st.session_state:
         st.session_state.selected_investor = None
 
-    # Define the path to the data file
-    data_file_path = "data.json"
+    # Define the path to the data file: a JSON deals file or a SQLite database
+    data_file_path = os.environ.get("FUNDSRUS_DATA_FILE", "data.json")
 
-    # Load the data
-    df = load_data(data_file_path)
+    # Open the storage backend. JSON data is cached in memory and reloaded in the
+    # background when the file changes; a rerun keeps the snapshot it started with
+    try:
+        store = open_deal_store(data_file_path, watch=True)
+    except ValueError as e:
+        st.error(f"Error loading data: {str(e)}")
+        store = None
+    has_data = store is not None and not store.is_empty()
 
     # Check if data was loaded successfully
-    if not df.empty:
-        # Add geography column to the data
-        df = add_geography_column(df)
-
-        # Add deal size categories
-        df['Deal Size Category'] = df['Amount'].apply(categorize_deal_size)
+    if has_data:
 
         # Create main tabs
-        tab1, tab2 = st.tabs(["Investor Database", "Glossary"])
+        tab1, tab_trends, tab2 = st.tabs(["Investor Database", "Trends", "Glossary"])
 
         with tab1:
             # Check if an investor is selected for profile view
             if st.session_state.selected_investor:
                 # Display investor profile
-                display_investor_profile(df, st.session_state.selected_investor)
+                display_investor_profile(store, st.session_state.selected_investor)
             else:
                 # Display main investor database
                 # Add main title
@@ -539,11 +345,18 @@ if __name__ == "__main__":
 
                 # Display company search results if search term is provided
                 if company_search:
-                    # Search for the company in the deals data
-                    company_matches = df[df['Company Name'].str.contains(company_search, case=False, na=False)]
+                    # Search for the company in the deals data (literal, case-insensitive)
+                    company_matches = store.search_companies(company_search)
+                    fuzzy_matches = company_matches.empty
+                    if fuzzy_matches:
+                        # No exact match - fall back to similarly spelled company names
+                        company_matches = store.search_companies(company_search, fuzzy=True)
 
                     if not company_matches.empty:
-                        st.success(f"Found {len(company_matches)} funding round(s) for companies matching '{company_search}':")
+                        if fuzzy_matches:
+                            st.info(f"No exact matches for '{company_search}'. Showing {len(company_matches)} funding round(s) for similarly named companies:")
+                        else:
+                            st.success(f"Found {len(company_matches)} funding round(s) for companies matching '{company_search}':")
 
                         for idx, deal in company_matches.iterrows():
                             with st.expander(f"📈 {deal['Company Name']} - {deal['Funding Stage']} ({deal['Funding Date'].strftime('%Y-%m-%d')})"):
@@ -552,6 +365,9 @@ if __name__ == "__main__":
                                 with col1:
                                     st.write("**💰 Deal Details:**")
                                     st.write(f"• **Amount**: {format_currency(deal['Amount'])} {deal['Currency']}")
+                                    if pd.notna(deal['Currency']) and deal['Currency'] != DEFAULT_FX_TABLE.base:
+                                        usd = format_currency(deal['Amount (USD)']) if pd.notna(deal['Amount (USD)']) else "N/A (no exchange rate)"
+                                        st.write(f"• **Amount (USD)**: {usd}")
                                     st.write(f"• **Stage**: {deal['Funding Stage']}")
                                     st.write(f"• **Date**: {deal['Funding Date'].strftime('%Y-%m-%d')}")
                                     st.write(f"• **Vertical**: {deal['Climate Vertical']}")
@@ -568,6 +384,39 @@ if __name__ == "__main__":
                     else:
                         st.warning(f"No companies found matching '{company_search}'. Try a different search term or check the spelling.")
 
+                # Startup profile matching section
+                with st.expander("🎯 Match My Startup Profile"):
+                    st.write("Describe your startup to find the investors whose past deals look most like it:")
+                    profile = {}
+                    profile_columns = st.columns(2)
+                    for i, column in enumerate(PROFILE_COLUMNS):
+                        with profile_columns[i % 2]:
+                            profile[column] = st.multiselect(
+                                column,
+                                options=[value for value in store.filter_values(column) if pd.notna(value)],
+                                key=f"profile_{column}"
+                            )
+
+                    if any(profile.values()):
+                        profile_matches = store.match_investors(profile, k=10)
+                        if not profile_matches.empty:
+                            st.dataframe(
+                                profile_matches,
+                                use_container_width=True,
+                                hide_index=True,
+                                column_config={
+                                    "Similarity": st.column_config.ProgressColumn(
+                                        "Match",
+                                        help="Cosine similarity between this profile and the investor's deals",
+                                        format="%.2f",
+                                        min_value=0,
+                                        max_value=1
+                                    )
+                                }
+                            )
+                        else:
+                            st.info("No investors have deals matching this profile yet.")
+
                 st.divider()  # Visual separator between search and main content
 
                 # Sidebar filters
@@ -584,7 +433,7 @@ if __name__ == "__main__":
                 )
 
                 # Geography filter
-                geographies = ["All"] + df['Geography'].unique().tolist()
+                geographies = ["All"] + store.filter_values('Geography')
                 selected_geography = st.sidebar.selectbox(
                     "Geography",
                     options=geographies,
@@ -594,7 +443,7 @@ if __name__ == "__main__":
 
                 # Deal Size Buckets - Relevant to funding stages
                 st.sidebar.subheader("💰 Deal Size Focus")
-                deal_size_categories = ["All"] + df['Deal Size Category'].unique().tolist()
+                deal_size_categories = ["All"] + store.filter_values('Deal Size Category')
                 selected_deal_size = st.sidebar.selectbox(
                     "Deal Size Category",
                     options=deal_size_categories,
@@ -606,7 +455,7 @@ if __name__ == "__main__":
                 st.sidebar.subheader("📊 Basic Filters")
 
                 # Climate Vertical multi-select filter
-                climate_verticals = df['Climate Vertical'].unique().tolist()
+                climate_verticals = store.filter_values('Climate Vertical')
                 selected_verticals = st.sidebar.multiselect(
                     "Climate Vertical",
                     options=climate_verticals,
@@ -614,7 +463,7 @@ if __name__ == "__main__":
                 )
 
                 # Funding Stage select box filter
-                funding_stages = ["All"] + df['Funding Stage'].unique().tolist()
+                funding_stages = ["All"] + store.filter_values('Funding Stage')
                 selected_stage = st.sidebar.selectbox(
                     "Funding Stage",
                     options=funding_stages,
@@ -646,36 +495,27 @@ if __name__ == "__main__":
                         icon="💡"
                     )
 
-                # Filter the deals DataFrame first to get relevant investors
-                filtered_deals_df = df.copy()
-
-                # Apply Geography filter to deals
-                if selected_geography != "All":
-                    filtered_deals_df = filtered_deals_df[filtered_deals_df['Geography'] == selected_geography]
-
-                # Apply Deal Size Category filter to deals
-                if selected_deal_size != "All":
-                    filtered_deals_df = filtered_deals_df[filtered_deals_df['Deal Size Category'] == selected_deal_size]
-
-                # Apply Climate Vertical filter to deals
-                if selected_verticals:
-                    filtered_deals_df = filtered_deals_df[filtered_deals_df['Climate Vertical'].isin(selected_verticals)]
-
-                # Apply Funding Stage filter to deals
-                if selected_stage != "All":
-                    filtered_deals_df = filtered_deals_df[filtered_deals_df['Funding Stage'] == selected_stage]
-
-                # Create filtered investor summary based on filtered deals and lead_only setting
-                if len(filtered_deals_df) > 0:
-                    filtered_investor_summary = create_investor_summary(filtered_deals_df, lead_only=lead_only)
-                else:
-                    columns = ['Investor Name', 'Deals Done', 'Lead Deals', 'Total Invested', 'Preferred Verticals', 'Preferred Stages']
-                    filtered_investor_summary = pd.DataFrame(columns=columns)
-
-                # Apply Investor Name filter to investor summary
-                if investor_search:
-                    investor_mask = filtered_investor_summary['Investor Name'].str.contains(investor_search, case=False, na=False)
-                    filtered_investor_summary = filtered_investor_summary[investor_mask]
+                # Reuse the investor summary if these filters were already computed
+                summary_cache = get_summary_cache()
+                summary_key = summary_cache_key(
+                    store.fingerprint, lead_only, selected_geography, selected_deal_size,
+                    selected_verticals, selected_stage, investor_search
+                )
+                filtered_investor_summary = summary_cache.get(summary_key)
+
+                if filtered_investor_summary is None:
+                    # Summarize the investors of the deals matching the sidebar filters
+                    filtered_investor_summary = store.investor_summary(
+                        lead_only=lead_only,
+                        filters={
+                            'Geography': None if selected_geography == "All" else [selected_geography],
+                            'Deal Size Category': None if selected_deal_size == "All" else [selected_deal_size],
+                            'Climate Vertical': selected_verticals,
+                            'Funding Stage': None if selected_stage == "All" else [selected_stage]
+                        },
+                        investor_search=investor_search
+                    )
+                    summary_cache.put(summary_key, filtered_investor_summary)
 
                 # KPI Dashboard Section
                 st.subheader("📊 Investor Overview")
@@ -699,7 +539,8 @@ if __name__ == "__main__":
                 with col2:
                     st.metric(
                         label="Total Capital Tracked",
-                        value=format_currency(total_funding_tracked)
+                        value=format_currency(total_funding_tracked),
+                        help="Deal amounts converted to USD at the rate of their funding date"
                     )
 
                 with col3:
@@ -723,8 +564,8 @@ if __name__ == "__main__":
                     
                     # Add a formatted summary below the chart
                     st.write("**Top 5 Investors:**")
-                    for idx, (investor, amount) in enumerate(chart_data.head(5).items(), 1):
-                        st.write(f"{idx}. **{investor}**: {format_currency(amount)}")
+                    for idx, (investor, amount) in enumerate(format_currency_series(chart_data.head(5)).items(), 1):
+                        st.write(f"{idx}. **{investor}**: {amount}")
                 else:
                     st.info("No investors found for the selected filters.")
 
@@ -784,15 +625,40 @@ if __name__ == "__main__":
 
                 # Create investor display based on selected view
                 if not filtered_investors.empty:
+                    # Sort and page the list so only one page of investors is rendered per rerun
+                    sort_col, size_col = st.columns(2)
+                    sort_by = sort_col.selectbox("Sort by", list(INVESTOR_SORT_KEYS), key="investor_sort")
+                    page_size = size_col.selectbox(
+                        "Investors per page",
+                        PAGE_SIZE_OPTIONS,
+                        index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE),
+                        key="investor_page_size"
+                    )
+                    filtered_investors = sort_investors(filtered_investors, sort_by)
+
+                    # Go back to the first page whenever the listed investors or their order change
+                    list_context = (summary_key, selected, sort_by, page_size)
+                    if st.session_state.get("investor_list_context") != list_context:
+                        st.session_state.investor_list_context = list_context
+                        st.session_state.investor_page = 1
+
+                    start, end, page, num_pages = page_bounds(
+                        len(filtered_investors), st.session_state.get("investor_page", 1), page_size
+                    )
+                    st.session_state.investor_page = page
+                    st.number_input("Page", min_value=1, max_value=num_pages, step=1, key="investor_page")
+                    st.caption(f"Showing investors {start + 1}-{end} of {len(filtered_investors)} (page {page} of {num_pages})")
+                    page_investors = filtered_investors.iloc[start:end]
+                    page_invested = format_currency_series(page_investors['Total Invested'])
+
                     if view_option == "📋 Card View":
                         st.write("💡 **Tip**: Scan the cards below to quickly identify investors that match your criteria:")
 
-                        # Create rich investor cards
-                        for idx, row in filtered_investors.iterrows():
+                        # Create rich investor cards for the current page
+                        for idx, row in page_investors.iterrows():
                             investor_name = row['Investor Name']
                             deals_done = row['Deals Done']
                             lead_deals = row['Lead Deals']
-                            total_invested = row['Total Invested']
                             preferred_verticals = row['Preferred Verticals'].split(', ') if row['Preferred Verticals'] else []
                             preferred_stages = row['Preferred Stages'].split(', ') if row['Preferred Stages'] else []
 
@@ -822,7 +688,7 @@ if __name__ == "__main__":
                                 # Key metrics in the right column
                                 st.metric("Total Deals", deals_done)
                                 st.metric("Lead Deals", lead_deals, help="Deals where they were the lead investor")
-                                st.metric("Capital Deployed", format_currency(total_invested))
+                                st.metric("Capital Deployed", page_invested[idx])
 
                                 # View profile button
                                 if st.button("👁️ View Profile", key=f"card_btn_{idx}", help="See detailed investor profile"):
@@ -832,15 +698,14 @@ if __name__ == "__main__":
                     else:  # Table View
                         st.write("Click on an investor name to view their detailed profile:")
 
-                        # Create buttons for each investor (original format)
-                        for idx, row in filtered_investors.iterrows():
+                        # Create buttons for each investor on the current page (original format)
+                        for idx, row in page_investors.iterrows():
                             investor_name = row['Investor Name']
                             deals_done = row['Deals Done']
                             lead_deals = row['Lead Deals']
-                            total_invested = row['Total Invested']
 
                             # Format the button label with key info including lead deals
-                            button_label = f"👤 {investor_name} | {deals_done} deals ({lead_deals} lead) | {format_currency(total_invested)}"
+                            button_label = f"👤 {investor_name} | {deals_done} deals ({lead_deals} lead) | {page_invested[idx]}"
 
                             if st.button(button_label, key=f"investor_{idx}"):
                                 st.session_state.selected_investor = investor_name
@@ -860,7 +725,7 @@ if __name__ == "__main__":
 
                     # Format the Total Invested column using our helper function
                     if not display_df.empty:
-                        display_df['Total Invested'] = display_df['Total Invested'].apply(format_currency)
+                        display_df['Total Invested'] = format_currency_series(display_df['Total Invested'])
 
                         # Add a 'Select' column with checkboxes for building target list
                         display_df.insert(0, 'Select', False)
@@ -938,6 +803,60 @@ if __name__ == "__main__":
                     else:
                         st.info("No investors found for the selected filters.")
 
+        with tab_trends:
+            # Funding trends, sliced from the precomputed monthly rollup
+            st.header("📈 Funding Trends")
+
+            first_month, last_month = store.trend_months()
+            if last_month < first_month:
+                st.info("No dated deals to chart yet.")
+            else:
+                measure_col, by_col = st.columns(2)
+                trend_measure = measure_col.radio("Measure", list(TREND_MEASURES), horizontal=True, key="trend_measure")
+                trend_by = by_col.selectbox("Break down by", ["Nothing"] + TREND_DIMENSIONS, key="trend_by")
+                trend_by = None if trend_by == "Nothing" else trend_by
+
+                trend_filters = {}
+                filter_columns = st.columns(len(TREND_DIMENSIONS))
+                for filter_column, column in zip(filter_columns, TREND_DIMENSIONS):
+                    with filter_column:
+                        trend_filters[column] = st.multiselect(
+                            column,
+                            options=[value for value in store.filter_values(column) if pd.notna(value)],
+                            placeholder="All",
+                            key=f"trend_{column}"
+                        )
+
+                # Month range, as month numbers labelled by their first day
+                trend_start, trend_end = first_month, last_month
+                if last_month > first_month:
+                    month_labels = dict(zip(range(first_month, last_month + 1), month_starts(np.arange(first_month, last_month + 1)).strftime('%b %Y')))
+                    trend_start, trend_end = st.select_slider(
+                        "Months",
+                        options=list(month_labels),
+                        value=(first_month, last_month),
+                        format_func=month_labels.get,
+                        key="trend_months"
+                    )
+
+                # Totals of the slice, one KPI per measure
+                kpi_columns = st.columns(len(TREND_MEASURES))
+                for kpi_column, measure in zip(kpi_columns, TREND_MEASURES):
+                    total = store.funding_trends(measure, trend_filters, None, trend_start, trend_end)[measure].sum()
+                    kpi_column.metric(measure, format_currency(total) if measure == 'Capital (USD)' else f"{total:,}")
+
+                trend = store.funding_trends(trend_measure, trend_filters, trend_by, trend_start, trend_end)
+                if trend.empty or not trend.to_numpy().any():
+                    st.info("No deals match the selected filters in these months.")
+                else:
+                    st.bar_chart(trend)
+                    with st.expander("Monthly figures"):
+                        table = trend.copy()
+                        table.index = table.index.strftime('%b %Y')
+                        if trend_measure == 'Capital (USD)':
+                            table = table.apply(format_currency_series)
+                        st.dataframe(table, use_container_width=True)
+
         with tab2:
             # Glossary Tab Content
             st.header("📚 Key Terminology")
@@ -982,11 +901,16 @@ if __name__ == "__main__":
             """)
 
     else:
-        st.warning("No data to display. Please check your data.json file.")
+        st.warning(f"No data to display. Please check your {data_file_path} file.")
 
     # AI Assistant Feature
     st.markdown("---")
-    with st.expander("🤖 AI Assistant: Extract New Funding Deal"):
+    append_message = st.session_state.pop('append_message', None)
+    with st.expander("🤖 AI Assistant: Extract New Funding Deal", expanded=append_message is not None):
+        # Result of adding a deal, shown after the rerun that refreshed the data
+        if append_message is not None:
+            getattr(st, append_message[0])(append_message[1])
+
         st.info("Paste the URL of a funding announcement article below to see the AI in action.", icon="💡")
         url_input = st.text_input("Article URL")
 
@@ -1014,13 +938,29 @@ if __name__ == "__main__":
                     else:
                         st.subheader("✅ Extracted Data:")
                         st.json(extracted_data)
-                        st.success("Extraction complete! This data can be added to the main database in a future version.")
+                        st.session_state.extracted_deal = deal_record(extracted_data, url_input)
+                        st.success("Extraction complete! Review the data, then add it to the main database below.")
             else:
                 st.warning("Please enter a URL.")
 
+        # Offer to add the last extracted deal to the database
+        if st.session_state.get('extracted_deal') and store is not None:
+            if st.button("➕ Add Deal to Database"):
+                try:
+                    added = store.append(st.session_state.extracted_deal)
+                except (ValueError, sqlite3.Error) as e:
+                    st.error(f"❌ Could not add this deal: {e}")
+                else:
+                    st.session_state.extracted_deal = None
+                    if added:
+                        st.session_state.append_message = ('success', "✅ Deal added to the database.")
+                    else:
+                        st.session_state.append_message = ('warning', "This deal is already in the database (same company, date and amount).")
+                    st.rerun()
+
     # Add data freshness caption to build trust
-    if not df.empty:
-        last_updated_date = df['Funding Date'].max().strftime("%B %d, %Y")
+    if has_data:
+        last_updated_date = store.last_updated().strftime("%B %d, %Y")
         st.caption(f"Data sourced from public announcements. Last updated: {last_updated_date}")
 
 
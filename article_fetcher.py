@@ -0,0 +1,366 @@
+"""
+Fetching and AI extraction of funding announcement articles.
+
+Articles are fetched through one pooled requests session with timeouts, and
+both the fetched HTML and the extracted JSON are kept in a content-addressed
+on-disk cache:
+
+- urls/<sha256 of url>.json points a URL at the hash of its fetched content
+- html/<content hash>.html holds the article HTML
+- extractions/<sha256 of content hash, model and prompt>.json holds the model output
+
+Extracting a known article again therefore costs no HTTP request and no model
+call. The model client is passed in (anything exposing
+chat.completions.create, such as the openai module), so a stub can be used.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from functools import cached_property
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 20)
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+# Characters of article text sent to the model, to fit its context limit
+MAX_ARTICLE_CHARS = 4000
+
+EXTRACTION_PROMPT = """
+        You are an expert financial analyst. Extract the following information from the article text provided.
+        Respond ONLY with a valid JSON object. If information is not found, use null.
+        The schema is: {"companyName": "string", "fundingDate": "YYYY-MM-DD", "amount": integer, "currency": "string", "fundingStage": "string", "leadInvestors": ["string"], "otherInvestors": ["string"], "climateVertical": "string", "companyDescription": "string"}
+        """
+
+
+def _sha256(data):
+    return hashlib.sha256(data if isinstance(data, bytes) else data.encode('utf-8')).hexdigest()
+
+
+def make_session(pool_size=10, retries=2):
+    """
+    Create a requests session with a connection pool and retries on transient errors.
+
+    Args:
+        pool_size (int): Connections kept open per host
+        retries (int): Retries for connection errors and 502/503/504 responses
+
+    Returns:
+        requests.Session: Session with the browser User-Agent set
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=retries, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+            allowed_methods=('GET',), raise_on_status=False
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+class ArticleCache:
+    """
+    Content-addressed on-disk cache of article HTML and extracted JSON.
+
+    Files are written under a temporary name and renamed into place, so
+    concurrent readers never see partial entries.
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory (str): Root directory of the cache (created on first write)
+        """
+        self.directory = directory
+
+    def _path(self, kind, key, extension):
+        return os.path.join(self.directory, kind, f"{key}.{extension}")
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.tmp-', dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _read_json(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def get_html(self, url):
+        """
+        Return the cached content of a URL.
+
+        Args:
+            url (str): Article URL
+
+        Returns:
+            tuple: (content hash, HTML bytes), or None if not cached
+        """
+        entry = self._read_json(self._path('urls', _sha256(url), 'json'))
+        if entry is None:
+            return None
+        try:
+            with open(self._path('html', entry['content_hash'], 'html'), 'rb') as file:
+                return entry['content_hash'], file.read()
+        except (OSError, KeyError, TypeError):
+            return None
+
+    def put_html(self, url, content):
+        """
+        Store fetched content and point the URL at it.
+
+        Args:
+            url (str): Article URL
+            content (bytes): Fetched HTML
+
+        Returns:
+            str: Content hash
+        """
+        content_hash = _sha256(content)
+        html_path = self._path('html', content_hash, 'html')
+        if not os.path.exists(html_path):
+            self._write(html_path, content)
+        entry = {'url': url, 'content_hash': content_hash, 'fetched_at': time.time()}
+        self._write(self._path('urls', _sha256(url), 'json'), json.dumps(entry).encode('utf-8'))
+        return content_hash
+
+    def get_extraction(self, key):
+        """
+        Args:
+            key (str): Extraction key (see FundingExtractor.extraction_key)
+
+        Returns:
+            dict: Cached extraction, or None if not cached
+        """
+        return self._read_json(self._path('extractions', key, 'json'))
+
+    def put_extraction(self, key, data):
+        """
+        Args:
+            key (str): Extraction key (see FundingExtractor.extraction_key)
+            data (dict): Extracted funding data
+        """
+        self._write(self._path('extractions', key, 'json'), json.dumps(data).encode('utf-8'))
+
+
+class Article(namedtuple('Article', ['url', 'content_hash', 'html'])):
+    """Fetched article: its URL, the hash of its content and the raw HTML bytes."""
+
+    @cached_property
+    def text(self):
+        """
+        Returns:
+            str: Text of the article's <p> elements joined with spaces
+        """
+        soup = BeautifulSoup(self.html, 'html.parser')
+        return ' '.join(p.get_text() for p in soup.find_all('p'))
+
+
+class HostRateLimiter:
+    """
+    Space out requests to the same host by a minimum interval.
+
+    Safe to share between threads; requests to different hosts do not wait
+    for each other.
+    """
+
+    def __init__(self, interval):
+        """
+        Args:
+            interval (float): Minimum seconds between two requests to one host
+        """
+        self.interval = interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """
+        Block until a request to the URL's host is allowed.
+
+        Args:
+            url (str): URL about to be requested
+        """
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ArticleFetcher:
+    """Fetch articles through a shared pooled session, reusing cached content."""
+
+    def __init__(self, session=None, cache=None, timeout=DEFAULT_TIMEOUT, rate_limiter=None):
+        """
+        Args:
+            session (requests.Session): Session to fetch with (default: make_session())
+            cache (ArticleCache): Cache for fetched HTML, or None to always fetch
+            timeout (tuple): (connect, read) timeouts in seconds
+            rate_limiter (HostRateLimiter): Per-host limiter applied to network
+                requests (cache hits are not limited)
+        """
+        self.session = session if session is not None else make_session()
+        self.cache = cache
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+
+    def fetch(self, url, refresh=False):
+        """
+        Fetch an article, from the cache when it was fetched before.
+
+        Args:
+            url (str): Article URL
+            refresh (bool): Ignore the cached copy and fetch again
+
+        Returns:
+            Article: The fetched article
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status
+        """
+        if self.cache is not None and not refresh:
+            cached = self.cache.get_html(url)
+            if cached is not None:
+                return Article(url, cached[0], cached[1])
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+
+        # Only successful responses are cached, so error pages are fetched again next time
+        if self.cache is not None:
+            content_hash = self.cache.put_html(url, response.content)
+        else:
+            content_hash = _sha256(response.content)
+        return Article(url, content_hash, response.content)
+
+
+class FundingExtractor:
+    """Extract funding data from articles with a chat model, caching the results."""
+
+    def __init__(self, cache=None, model=DEFAULT_MODEL, prompt=EXTRACTION_PROMPT):
+        """
+        Args:
+            cache (ArticleCache): Cache for extracted JSON, or None to always call the model
+            model (str): Chat model name
+            prompt (str): System prompt describing the output schema
+        """
+        self.cache = cache
+        self.model = model
+        self.prompt = prompt
+
+    def extraction_key(self, article):
+        """
+        Cache key of an extraction: changes with the article content, model or prompt.
+
+        Args:
+            article (Article): Fetched article
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        return _sha256(f"{article.content_hash}\n{self.model}\n{self.prompt}")
+
+    def cached_extraction(self, article):
+        """
+        Args:
+            article (Article): Fetched article
+
+        Returns:
+            dict: Earlier extraction of the same content, or None
+        """
+        return self.cache.get_extraction(self.extraction_key(article)) if self.cache is not None else None
+
+    def extract(self, article, client):
+        """
+        Extract funding data from an article, calling the model only on a cache miss.
+
+        Args:
+            article (Article): Fetched article with non-empty text
+            client: Model client exposing chat.completions.create (e.g. the openai module)
+
+        Returns:
+            dict: Extracted funding data
+
+        Raises:
+            ValueError: If the model reply is not a JSON object
+        """
+        cached = self.cached_extraction(article)
+        if cached is not None:
+            return cached
+
+        response = client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self.prompt},
+                {"role": "user", "content": article.text[:MAX_ARTICLE_CHARS]}
+            ]
+        )
+        data = json.loads(response.choices[0].message.content)
+        if not isinstance(data, dict):
+            raise ValueError("Model reply is not a JSON object")
+
+        if self.cache is not None:
+            self.cache.put_extraction(self.extraction_key(article), data)
+        return data
+
+
+def _investor_list(names):
+    if isinstance(names, str):
+        names = [names]
+    names = [str(name).strip() for name in names or [] if name and str(name).strip()]
+    return ', '.join(names) if names else "Not specified"
+
+
+def deal_record(extraction, url):
+    """
+    Convert an extraction into a deal record in the data.json schema.
+
+    Args:
+        extraction (dict): Output of FundingExtractor.extract
+        url (str): Source URL of the article
+
+    Returns:
+        dict: Deal record with the data.json keys
+    """
+    return {
+        "Company Name": extraction.get("companyName"),
+        "Funding Date": extraction.get("fundingDate"),
+        "Amount": extraction.get("amount"),
+        "Currency": extraction.get("currency"),
+        "Funding Stage": extraction.get("fundingStage"),
+        "Lead Investor(s)": _investor_list(extraction.get("leadInvestors")),
+        "Other Investors": _investor_list(extraction.get("otherInvestors")),
+        "Climate Vertical": extraction.get("climateVertical"),
+        "Company Description": extraction.get("companyDescription"),
+        "Source URL": url,
+    }
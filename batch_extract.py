@@ -0,0 +1,267 @@
+"""
+Batch extraction of funding data from many announcement URLs.
+
+Runs the same fetch and AI extraction as the AI Assistant (article_fetcher),
+over a file of URLs with bounded thread-pool concurrency, a per-host rate
+limit and retries with exponential backoff. Each extracted deal is checked
+with deal_store.validate_deal and appended to an NDJSON file in the data.json
+schema as soon as it is ready; that file is also the checkpoint, so rerunning
+the same command skips URLs already done.
+URLs that fail, including extractions that are not a valid deal, are logged to
+<output>.errors.ndjson and retried on the next run.
+
+Usage:
+    python batch_extract.py urls.txt -o extracted.ndjson --workers 8 --host-interval 1.0
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import requests
+
+from article_fetcher import ArticleCache, ArticleFetcher, FundingExtractor, HostRateLimiter, deal_record, make_session
+from deal_store import validate_deal
+from table_cache import CACHE_DIR_NAME
+
+DEFAULT_CACHE_DIR = os.path.join(CACHE_DIR_NAME, 'articles')
+
+
+def read_urls(filepath):
+    """
+    Read article URLs, one per line; blank lines and '#' comments are skipped.
+
+    Args:
+        filepath (str): Path of the URL list
+
+    Returns:
+        list: Distinct URLs in file order
+    """
+    with open(filepath, 'r', encoding='utf-8') as file:
+        lines = (line.strip() for line in file)
+        return list(dict.fromkeys(line for line in lines if line and not line.startswith('#')))
+
+
+def completed_urls(output_path):
+    """
+    Source URLs already written to an output file.
+
+    A partially written last line (from an interrupted run) is truncated away,
+    so appending can continue cleanly.
+
+    Args:
+        output_path (str): NDJSON output of an earlier run
+
+    Returns:
+        set: URLs that do not need to be processed again
+    """
+    if not os.path.exists(output_path):
+        return set()
+
+    with open(output_path, 'rb+') as file:
+        data = file.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            file.truncate(end)
+
+    done = set()
+    for line in data[:end].splitlines():
+        try:
+            done.add(json.loads(line)['Source URL'])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return done
+
+
+def is_retryable(error):
+    """
+    Whether a failed attempt is worth retrying.
+
+    Connection errors, timeouts, HTTP 429 and 5xx responses (from the article
+    site or the model API) are transient; everything else is permanent.
+
+    Args:
+        error (Exception): Error raised by the attempt
+
+    Returns:
+        bool: True to retry
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)):
+        return True
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def extract_one(url, fetcher, extractor, client):
+    """
+    Fetch and extract one article into a validated deal record.
+
+    Args:
+        url (str): Article URL
+        fetcher (ArticleFetcher): Article fetcher
+        extractor (FundingExtractor): Funding extractor
+        client: Model client exposing chat.completions.create
+
+    Returns:
+        dict: Deal record in the data.json schema, normalized by validate_deal
+
+    Raises:
+        ValueError: If the article has no text or the extracted deal is invalid
+    """
+    article = fetcher.fetch(url)
+    if not article.text:
+        raise ValueError("Could not extract text from the article.")
+    return validate_deal(deal_record(extractor.extract(article, client), url))
+
+
+def latency_percentiles(latencies):
+    """
+    Args:
+        latencies (list): Seconds per URL
+
+    Returns:
+        dict: p50/p90/p99 latency in seconds (empty if there are no latencies)
+    """
+    if not latencies:
+        return {}
+    return {f"p{p}": float(np.percentile(latencies, p)) for p in (50, 90, 99)}
+
+
+def run_batch(urls, output_path, fetcher, extractor, client, workers=8, retries=3, backoff=1.0, progress=None):
+    """
+    Extract deals from many URLs concurrently, appending them to an NDJSON file.
+
+    URLs already present in the output file are skipped, so an interrupted run
+    can be resumed with the same arguments.
+
+    Args:
+        urls (list): Article URLs
+        output_path (str): NDJSON file of deal records (appended to)
+        fetcher (ArticleFetcher): Article fetcher; its rate limiter paces each host,
+            and its session should not retry by itself so retries are paced too
+        extractor (FundingExtractor): Funding extractor
+        client: Model client exposing chat.completions.create
+        workers (int): Maximum URLs processed at the same time
+        retries (int): Retries per URL after a transient failure
+        backoff (float): Base delay in seconds, doubled on every retry (with jitter)
+        progress (callable): Called with (done, total) after each URL
+
+    Returns:
+        dict: 'total', 'skipped', 'succeeded', 'failed', 'seconds',
+            'urls_per_sec' and 'latency' percentiles
+    """
+    done = completed_urls(output_path)
+    pending = [url for url in urls if url not in done]
+    errors_path = output_path + '.errors.ndjson'
+
+    latencies = []
+    counts = {'succeeded': 0, 'failed': 0}
+
+    def process(url):
+        start = time.perf_counter()
+        for attempt in range(retries + 1):
+            try:
+                return url, extract_one(url, fetcher, extractor, client), None, time.perf_counter() - start
+            except Exception as e:
+                if attempt == retries or not is_retryable(e):
+                    return url, None, e, time.perf_counter() - start
+                time.sleep(backoff * 2 ** attempt * (0.5 + random.random()))
+
+    start = time.perf_counter()
+    with open(output_path, 'a', encoding='utf-8') as output, open(errors_path, 'a', encoding='utf-8') as errors:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(process, url) for url in pending]
+
+            for i, future in enumerate(as_completed(futures), 1):
+                # Results are written from this thread only, one line per URL
+                url, record, error, seconds = future.result()
+                latencies.append(seconds)
+                if error is None:
+                    counts['succeeded'] += 1
+                    output.write(json.dumps(record) + '\n')
+                    output.flush()
+                else:
+                    counts['failed'] += 1
+                    errors.write(json.dumps({'url': url, 'error': f"{type(error).__name__}: {error}"}) + '\n')
+                    errors.flush()
+                if progress is not None:
+                    progress(i, len(pending))
+
+    seconds = time.perf_counter() - start
+    return {
+        'total': len(urls),
+        'skipped': len(urls) - len(pending),
+        'succeeded': counts['succeeded'],
+        'failed': counts['failed'],
+        'seconds': seconds,
+        'urls_per_sec': len(pending) / seconds if seconds > 0 else 0.0,
+        'latency': latency_percentiles(latencies),
+    }
+
+
+def load_api_key(secrets_path=os.path.join('.streamlit', 'secrets.toml')):
+    """
+    Read the OpenAI API key from OPENAI_API_KEY or the Streamlit secrets file.
+
+    Args:
+        secrets_path (str): Path of the Streamlit secrets file
+
+    Returns:
+        str: API key, or '' if not configured
+    """
+    api_key = os.environ.get('OPENAI_API_KEY', '')
+    if not api_key and os.path.exists(secrets_path):
+        import tomllib
+        with open(secrets_path, 'rb') as file:
+            api_key = tomllib.load(file).get('OPENAI_API_KEY', '')
+    return '' if api_key == 'your-openai-api-key-here' else api_key
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('urls', help='File with one article URL per line')
+    parser.add_argument('-o', '--output', required=True, help='NDJSON file of extracted deals (appended to)')
+    parser.add_argument('--workers', type=int, default=8, help='URLs processed concurrently')
+    parser.add_argument('--host-interval', type=float, default=1.0, help='Minimum seconds between requests to one host')
+    parser.add_argument('--retries', type=int, default=3, help='Retries per URL after a transient failure')
+    parser.add_argument('--backoff', type=float, default=1.0, help='Base retry delay in seconds')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Article and extraction cache directory')
+    args = parser.parse_args()
+
+    api_key = load_api_key()
+    if not api_key:
+        sys.exit("OpenAI API key not configured. Set OPENAI_API_KEY or add it to .streamlit/secrets.toml")
+
+    import openai
+    openai.api_key = api_key
+
+    cache = ArticleCache(args.cache_dir)
+    fetcher = ArticleFetcher(
+        # Retries happen in run_batch, where they go through the rate limiter
+        session=make_session(pool_size=args.workers, retries=0),
+        cache=cache,
+        rate_limiter=HostRateLimiter(args.host_interval)
+    )
+
+    def progress(done, total):
+        print(f"\r{done}/{total} URLs", end='', file=sys.stderr, flush=True)
+
+    stats = run_batch(
+        read_urls(args.urls), args.output, fetcher, FundingExtractor(cache=cache), openai,
+        workers=args.workers, retries=args.retries, backoff=args.backoff, progress=progress
+    )
+
+    print(file=sys.stderr)
+    print(f"{stats['succeeded']} extracted, {stats['failed']} failed, {stats['skipped']} already done "
+          f"of {stats['total']} URLs in {stats['seconds']:.1f}s ({stats['urls_per_sec']:.2f} URLs/sec)")
+    if stats['latency']:
+        print("latency per URL: " + ', '.join(f"{name} {value:.2f}s" for name, value in stats['latency'].items()))
+
+
+if __name__ == '__main__':
+    main()
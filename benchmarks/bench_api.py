@@ -0,0 +1,198 @@
+"""
+Load-test the HTTP JSON API server.
+
+Writes a synthetic deals file, serves it with api_server in a separate
+process, checks the API's answers against query_engine for a sample of
+requests (including a streamed list and revalidation after an append), then
+has concurrent keep-alive clients replay a mix of requests and reports
+requests per second and latency percentiles for first (uncached), cached
+and conditional (304 Not Modified) requests.
+
+Usage:
+    python benchmarks/bench_api.py --deals 20000 --clients 8
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlencode
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from query_engine import DatasetCache, JsonDealStore
+
+VERTICALS = ['Energy', 'Mobility', 'Food & Agriculture', 'Buildings', 'Carbon Removal', 'Industry', 'Water']
+STAGES = ['Pre-Seed', 'Seed', 'Series A', 'Series B', 'Series C', 'Growth']
+COUNTRIES = ['Germany', 'France', 'United States', 'Canada', 'India', 'Kenya', 'Brazil', 'Australia']
+
+
+def write_deals(path, deals, investors, seed=0):
+    """NDJSON deals whose investors are drawn from a Zipf-like population."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Investor {i:06d}" for i in range(investors)], dtype=object)
+    popularity = 1.0 / np.arange(1, investors + 1)
+    popularity /= popularity.sum()
+    dates = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 2_000, deals), unit='D')
+
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(deals):
+            picks = list(dict.fromkeys(names[rng.choice(investors, rng.integers(1, 7), p=popularity)]))
+            file.write(json.dumps({
+                'Company Name': f"Company {i:06d}",
+                'Funding Date': dates[i].strftime('%Y-%m-%d'),
+                'Amount': int(rng.integers(1, 2_000)) * 50_000,
+                'Currency': str(rng.choice(['USD', 'EUR'])),
+                'Funding Stage': str(rng.choice(STAGES)),
+                'Lead Investor(s)': picks[0],
+                'Other Investors': ', '.join(picks[1:]) or 'Not specified',
+                'Climate Vertical': str(rng.choice(VERTICALS)),
+                'Company Description': f"Climate company based in {rng.choice(COUNTRIES)}.",
+                'Source URL': f"https://example.com/news/{i}",
+            }) + '\n')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(source, port):
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'api_server.py'), source, '--port', str(port), '--quiet'],
+                              stdout=subprocess.DEVNULL)
+    # Wait until the server accepts connections (the data loads on the first request)
+    for _ in range(600):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("API server did not start")
+
+
+def get(conn, path, etag=None):
+    conn.request('GET', path, headers={'If-None-Match': etag} if etag else {})
+    response = conn.getresponse()
+    return response.status, response.getheader('ETag'), response.getheader('Transfer-Encoding'), response.read()
+
+
+def workload(store):
+    """Request paths of a mixed workload over the sidebar filters and the top investors."""
+    top = store.investor_summary()['Investor Name'].head(20).tolist()
+    paths = []
+    for vertical in VERTICALS:
+        for stage in STAGES:
+            filters = urlencode({'vertical': vertical, 'stage': stage})
+            paths += [f"/investors?{filters}&limit=25", f"/summary?{filters}"]
+    for name in top:
+        investor = quote(name, safe='')
+        paths += [f"/investors/{investor}", f"/investors/{investor}/deals?limit=50",
+                  f"/investors/{investor}/co-investors", f"/investors/{investor}/similar"]
+    paths += [f"/companies?q=Company%20{i:03d}&limit=20" for i in range(20)]
+    return paths
+
+
+def check(conn, store):
+    """Compare API answers with query_engine, including a streamed list and an append."""
+    status, etag, encoding, body = get(conn, '/investors')
+    items = pd.DataFrame(json.loads(body)['items'])
+    expected = store.investor_summary()
+    assert status == 200 and encoding == 'chunked', "the full investor list is not streamed"
+    pd.testing.assert_frame_equal(items, expected.reset_index(drop=True), check_dtype=False)
+
+    items = pd.DataFrame(json.loads(get(conn, '/investors?vertical=Water&stage=Seed&lead_only=1')[3])['items'])
+    filtered = store.investor_summary(lead_only=True, filters={'Climate Vertical': ['Water'], 'Funding Stage': ['Seed']})
+    pd.testing.assert_frame_equal(items, filtered.reset_index(drop=True), check_dtype=False)
+
+    name = expected['Investor Name'].iloc[0]
+    deals = json.loads(get(conn, f"/investors/{quote(name, safe='')}/deals")[3])
+    assert deals['total'] == len(store.investor_deals(name)), "investor deals differ"
+    assert get(conn, '/investors', etag)[0] == 304, "unchanged data is not revalidated"
+
+    # A new deal changes the fingerprint, so the old tag no longer matches
+    store.append({'Company Name': 'Late Arrival', 'Funding Date': '2025-06-01', 'Amount': 1_000_000, 'Currency': 'USD',
+                  'Funding Stage': 'Seed', 'Lead Investor(s)': 'Brand New Capital', 'Other Investors': 'Not specified',
+                  'Climate Vertical': 'Water', 'Company Description': 'x', 'Source URL': 'https://example.com/late'})
+    status, _, _, body = get(conn, '/investors', etag)
+    assert status == 200 and json.loads(body)['total'] == len(expected) + 1, "stale response after an append"
+
+
+def run_clients(port, paths, clients, requests, etags=None):
+    """Replay paths from concurrent keep-alive clients; returns (seconds, latencies)."""
+    latencies = [[] for _ in range(clients)]
+
+    def client(index):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        for i in range(index, requests, clients):
+            path = paths[i % len(paths)]
+            start = time.perf_counter()
+            status, _, _, _ = get(conn, path, etags.get(path) if etags else None)
+            latencies[index].append(time.perf_counter() - start)
+            assert status == (304 if etags else 200), f"{path}: HTTP {status}"
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, np.concatenate(latencies)
+
+
+def report(label, seconds, latencies):
+    print(f"{label:<12} {len(latencies) / seconds:9,.0f} req/s   " +
+          '  '.join(f"p{p} {np.percentile(latencies, p) * 1000:7.2f} ms" for p in (50, 90, 99)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--deals', type=int, default=20_000, help='Synthetic deals')
+    parser.add_argument('--investors', type=int, default=3_000, help='Synthetic investor population')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent keep-alive clients')
+    parser.add_argument('--requests', type=int, default=4_000, help='Requests per phase')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'deals.json')
+        write_deals(source, args.deals, args.investors)
+        store = JsonDealStore(source, DatasetCache())
+
+        port = free_port()
+        server = start_server(source, port)
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+            start = time.perf_counter()
+            get(conn, '/summary')
+            print(f"{args.deals:,} deals loaded by the server in {time.perf_counter() - start:.1f}s")
+
+            paths = workload(store)
+            check(conn, store)
+
+            # Every path once: nothing is cached yet, so each request runs its query
+            seconds, latencies = run_clients(port, paths, args.clients, len(paths))
+            report('first', seconds, latencies)
+
+            etags = {path: get(conn, path)[1] for path in paths}
+            seconds, latencies = run_clients(port, paths, args.clients, args.requests)
+            report('cached', seconds, latencies)
+            seconds, latencies = run_clients(port, paths, args.clients, args.requests, etags=etags)
+            report('304', seconds, latencies)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
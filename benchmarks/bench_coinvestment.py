@@ -0,0 +1,118 @@
+"""
+Benchmark the co-investment graph against scanning the investor strings of every deal.
+
+Builds a synthetic deals table with a long-tailed investor population, checks
+that the graph's top co-investors match a row-by-row scan of the 'Lead
+Investor(s)' and 'Other Investors' strings for a sample of investors, and
+reports build time, memory and query latency percentiles.
+
+Usage:
+    python benchmarks/bench_coinvestment.py --deals 200000 --investors 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coinvest import CO_INVESTOR_WEIGHTS, CoInvestmentGraph
+from enrichment import build_participation_index
+
+
+def synthetic_deals(deals, investors, seed=0):
+    """Deals with 1-3 lead and 0-8 other investors drawn from a Zipf-like population."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Investor {i:06d}" for i in range(investors)], dtype=object)
+    popularity = 1.0 / np.arange(1, investors + 1)
+    popularity /= popularity.sum()
+
+    def investor_lists(low, high):
+        counts = rng.integers(low, high, deals)
+        picks = names[rng.choice(investors, counts.sum(), p=popularity)]
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        return [', '.join(dict.fromkeys(picks[bounds[i]:bounds[i + 1]])) or None for i in range(deals)]
+
+    return pd.DataFrame({
+        'Lead Investor(s)': investor_lists(1, 4),
+        'Other Investors': investor_lists(0, 9),
+        'Amount (USD)': rng.integers(1, 2_000, deals) * 50_000,
+    })
+
+
+def scan_co_investors(df, investor_name, k, by):
+    """Row-by-row reference: split the investor strings of every deal."""
+    weights, first_seen = {}, {}
+    for lead_text, other_text, amount in zip(df['Lead Investor(s)'], df['Other Investors'], df['Amount (USD)']):
+        leads = [name.strip() for name in lead_text.split(', ')] if isinstance(lead_text, str) else []
+        others = [name.strip() for name in other_text.split(', ')] if isinstance(other_text, str) else []
+        roles = {name: 'Lead' for name in leads}
+        for name in others:
+            roles.setdefault(name, 'Other')
+        for name in roles:
+            first_seen.setdefault(name, len(first_seen))
+        if investor_name not in roles:
+            continue
+        for name, role in roles.items():
+            if name != investor_name:
+                entry = weights.setdefault(name, [0, 0, 0])
+                entry[0] += 1
+                entry[1] += int(role == 'Lead' and roles[investor_name] == 'Lead')
+                entry[2] += int(amount)
+    column = list(CO_INVESTOR_WEIGHTS).index(by)
+    ranked = sorted(weights.items(), key=lambda item: (-item[1][column], first_seen[item[0]]))[:k]
+    return [[name] + entry for name, entry in ranked]
+
+
+def percentiles(seconds):
+    return ', '.join(f"p{p} {np.percentile(seconds, p) * 1000:.2f} ms" for p in (50, 90, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--deals', type=int, default=100_000, help='Number of synthetic deals')
+    parser.add_argument('--investors', type=int, default=10_000, help='Size of the investor population')
+    parser.add_argument('--queries', type=int, default=500, help='Number of top-k queries')
+    parser.add_argument('--checks', type=int, default=5, help='Investors checked against the row-by-row scan')
+    args = parser.parse_args()
+
+    df = synthetic_deals(args.deals, args.investors)
+    participation = build_participation_index(df)
+
+    start = time.perf_counter()
+    graph = CoInvestmentGraph(participation, df['Amount (USD)'])
+    build_seconds = time.perf_counter() - start
+
+    investor_count = participation['Investor'].nunique()
+    graph_bytes = sum(array.nbytes for array in (graph._indptr, graph._indices, graph._deals, graph._lead_deals, graph._capital))
+    print(f"{len(df):,} deals, {investor_count:,} investors, {len(participation):,} participations, {graph.edge_count:,} edges")
+
+    rng = np.random.default_rng(1)
+    scan_seconds = []
+    for name in rng.choice(participation['Investor'].unique(), args.checks):
+        for by in CO_INVESTOR_WEIGHTS:
+            start = time.perf_counter()
+            expected = scan_co_investors(df, name, 10, by)
+            scan_seconds.append(time.perf_counter() - start)
+            got = graph.top_co_investors(name, 10, by)
+            assert got.values.tolist() == expected, f"graph disagrees with the row-by-row scan for {name!r} by {by}"
+
+    query_seconds = []
+    names = rng.choice(participation['Investor'].unique(), args.queries)
+    rankings = list(CO_INVESTOR_WEIGHTS)
+    for i, name in enumerate(names):
+        start = time.perf_counter()
+        graph.top_co_investors(name, 10, rankings[i % len(rankings)])
+        query_seconds.append(time.perf_counter() - start)
+
+    print(f"graph build:        {build_seconds * 1000:10.1f} ms")
+    print(f"graph memory:       {graph_bytes / 2 ** 20:10.1f} MiB  (dense matrix: {investor_count ** 2 * 24 / 2 ** 20:,.0f} MiB)")
+    print(f"row-by-row scan:    {percentiles(scan_seconds)}")
+    print(f"top-10 query:       {percentiles(query_seconds)}")
+
+
+if __name__ == '__main__':
+    main()
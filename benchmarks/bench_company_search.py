@@ -0,0 +1,100 @@
+"""
+Benchmark the company-name search index against a full str.contains scan.
+
+Builds a synthetic table of distinct company names from words in data.json,
+checks that the index returns exactly the rows of a literal, case-insensitive
+str.contains for every query, and reports build time and query latency
+percentiles.
+
+Usage:
+    python benchmarks/bench_company_search.py --companies 200000
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import CompanySearchIndex
+
+
+def synthetic_companies(companies, seed=0):
+    """Combine words from data.json company names into distinct synthetic names."""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data.json')
+    with open(path, 'r', encoding='utf-8') as file:
+        records = json.load(file)
+
+    words = sorted({
+        word
+        for record in records
+        for word in re.findall(r'\w+', str(record.get('Company Name') or ''))
+    })
+
+    rng = np.random.default_rng(seed)
+    names = set()
+    while len(names) < companies:
+        for count in rng.integers(1, 4, companies):
+            names.add(' '.join(rng.choice(words, count)) + f" {rng.integers(1000)}")
+            if len(names) == companies:
+                break
+    return pd.Series(sorted(names)), words
+
+
+def percentiles(seconds):
+    return ', '.join(f"p{p} {np.percentile(seconds, p) * 1000:.2f} ms" for p in (50, 90, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--companies', type=int, default=100_000, help='Number of distinct company names')
+    parser.add_argument('--queries', type=int, default=200, help='Number of search queries')
+    args = parser.parse_args()
+
+    names, words = synthetic_companies(args.companies)
+    rng = np.random.default_rng(1)
+
+    # Query mix: whole words, name fragments and misspellings
+    queries = list(rng.choice(words, args.queries // 2))
+    for name in rng.choice(names.to_numpy(), args.queries - len(queries)):
+        start = int(rng.integers(len(name)))
+        queries.append(name[start:start + int(rng.integers(3, 12))].upper())
+    print(f"{len(names):,} companies, {len(queries)} queries")
+
+    start = time.perf_counter()
+    index = CompanySearchIndex(names)
+    build_seconds = time.perf_counter() - start
+
+    scan_seconds, index_seconds = [], []
+    for query in queries:
+        start = time.perf_counter()
+        expected = np.flatnonzero(names.str.contains(query, case=False, regex=False, na=False).to_numpy())
+        scan_seconds.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        got = index.search(query)
+        index_seconds.append(time.perf_counter() - start)
+
+        assert np.array_equal(got, expected), f"index disagrees with str.contains for {query!r}"
+
+    fuzzy_seconds = []
+    for query in queries:
+        # Drop one character to simulate a typo
+        cut = int(rng.integers(len(query)))
+        start = time.perf_counter()
+        index.search(query[:cut] + query[cut + 1:], fuzzy=True)
+        fuzzy_seconds.append(time.perf_counter() - start)
+
+    print(f"index build:        {build_seconds * 1000:10.1f} ms")
+    print(f"str.contains scan:  {percentiles(scan_seconds)}")
+    print(f"index (literal):    {percentiles(index_seconds)}  ({np.median(scan_seconds) / np.median(index_seconds):.1f}x at p50)")
+    print(f"index (fuzzy):      {percentiles(fuzzy_seconds)}")
+
+
+if __name__ == '__main__':
+    main()
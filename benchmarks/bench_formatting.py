@@ -0,0 +1,77 @@
+"""
+Benchmark the column-wise deal size bucketing and currency formatting against the row-wise apply.
+
+Builds synthetic amounts with the awkward cases mixed in (bucket bounds,
+rounding ties such as $1.05B, NaN, inf and negatives), checks that both
+implementations agree on every row, and reports timings.
+
+Usage:
+    python benchmarks/bench_formatting.py --rows 2000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enrichment import bucket_deal_sizes, categorize_deal_size
+from formatting import format_currency, format_currency_series
+
+EDGE_AMOUNTS = [
+    0, -0.0, 0.5, 1.5, 999.5, 999_949, 999_950, 999_999.99, 1_000_000, 1_050_000, 5_000_000, 5_000_001,
+    20_000_000, 20_000_000.5, 999_999_999.96, 1_050_000_000, 1_250_000_000, 1e20, -2_500_000, -1049,
+    np.nan, np.inf, -np.inf,
+]
+
+
+def synthetic_amounts(rows, seed=0):
+    """Deal-like amounts: mostly round figures, some arbitrary floats and edge cases."""
+    rng = np.random.default_rng(seed)
+    kind = rng.integers(0, 4, rows)
+    amounts = np.select(
+        [kind == 0, kind == 1, kind == 2],
+        [
+            rng.integers(1, 2_000, rows) * 50_000.0,
+            rng.random(rows) * 10.0 ** rng.integers(0, 12, rows),
+            rng.choice(np.array(EDGE_AMOUNTS, dtype=np.float64), rows),
+        ],
+        rng.integers(0, 10 ** 11, rows).astype(np.float64)
+    )
+    amounts[rng.random(rows) < 0.05] *= -1
+    return pd.Series(amounts, name='Amount')
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Number of synthetic amounts')
+    args = parser.parse_args()
+
+    amounts = synthetic_amounts(args.rows)
+    print(f"{len(amounts):,} amounts, {amounts.nunique():,} distinct")
+
+    expected_sizes, apply_sizes_seconds = timed(lambda: amounts.apply(categorize_deal_size).astype('category'))
+    sizes, bucket_seconds = timed(bucket_deal_sizes, amounts)
+    assert sizes.equals(expected_sizes), "bucket_deal_sizes disagrees with categorize_deal_size"
+
+    expected_text, apply_text_seconds = timed(amounts.apply, format_currency)
+    text, series_seconds = timed(format_currency_series, amounts)
+    assert text.equals(expected_text.astype(object)), "format_currency_series disagrees with format_currency"
+
+    print(f"deal size, row-wise apply:   {apply_sizes_seconds * 1000:10.1f} ms")
+    print(f"deal size, bucketed:         {bucket_seconds * 1000:10.1f} ms  ({apply_sizes_seconds / bucket_seconds:.1f}x)")
+    print(f"currency, row-wise apply:    {apply_text_seconds * 1000:10.1f} ms")
+    print(f"currency, series:            {series_seconds * 1000:10.1f} ms  ({apply_text_seconds / series_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
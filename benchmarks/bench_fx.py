@@ -0,0 +1,79 @@
+"""
+Benchmark the column-wise USD conversion against a per-row rate lookup.
+
+Builds synthetic deals in the currencies of the rate table (plus missing and
+unknown ones) over its date range, checks that both conversions agree on every
+row, and reports timings.
+
+Usage:
+    python benchmarks/bench_fx.py --rows 2000000
+"""
+import argparse
+import bisect
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fx import DEFAULT_FX_TABLE, FX_RATES_FILE
+
+
+def row_wise_usd(amounts, currencies, dates):
+    """Reference conversion: look up each deal's rate in the table one row at a time."""
+    with open(FX_RATES_FILE, 'r', encoding='utf-8') as file:
+        table = json.load(file)
+    rates = {currency: sorted((pd.Timestamp(date), rate) for date, rate in entries) for currency, entries in table['rates'].items()}
+
+    def convert(amount, currency, date):
+        if pd.isna(currency) or currency == table['base']:
+            return round(amount)
+        if currency not in rates:
+            return pd.NA
+        entries = rates[currency]
+        found = len(entries) - 1 if pd.isna(date) else bisect.bisect_right(entries, (date, float('inf'))) - 1
+        return round(amount * entries[max(found, 0)][1])
+
+    return pd.Series([convert(a, c, d) for a, c, d in zip(amounts, currencies, dates)], dtype='Int64')
+
+
+def synthetic_deals(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    currencies = np.array(DEFAULT_FX_TABLE.currencies + ['JPY', None], dtype=object)
+    start, end = pd.Timestamp('2022-06-01'), pd.Timestamp('2026-01-01')
+    dates = start + pd.to_timedelta(rng.integers(0, (end - start).days, rows), unit='D')
+    return pd.DataFrame({
+        'Amount': rng.integers(1, 2_000, rows) * 50_000,
+        'Currency': pd.Categorical(rng.choice(currencies, rows, p=[0.7, 0.15, 0.1, 0.03, 0.02])),
+        'Funding Date': pd.Series(dates),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Number of synthetic deals')
+    args = parser.parse_args()
+
+    df = synthetic_deals(args.rows)
+    print(f"{len(df):,} deals, table version {DEFAULT_FX_TABLE.version}")
+
+    start = time.perf_counter()
+    expected = row_wise_usd(df['Amount'], df['Currency'], df['Funding Date'])
+    row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converted = DEFAULT_FX_TABLE.convert(df['Amount'], df['Currency'], df['Funding Date'])
+    column_seconds = time.perf_counter() - start
+
+    assert converted.equals(expected), "column-wise conversion disagrees with the per-row lookup"
+
+    print(f"per-row lookup:    {row_seconds * 1000:10.1f} ms")
+    print(f"column-wise:       {column_seconds * 1000:10.1f} ms  ({row_seconds / column_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark the precompiled geography classifier against the row-wise apply.
+
+Builds a synthetic deals table by recombining investor names from data.json,
+checks that both implementations agree on every row, and reports timings.
+
+Usage:
+    python benchmarks/bench_geography.py --rows 200000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geography import EUROPE_INDICATORS, NORTH_AMERICA_INDICATORS, GeographyClassifier
+
+
+def legacy_add_geography(df):
+    """Row-wise implementation used by add_geography_column before the classifier."""
+    def determine_geography(lead_investors, other_investors):
+        all_investors = str(lead_investors).lower() + ' ' + str(other_investors).lower()
+        na_score = sum(1 for indicator in NORTH_AMERICA_INDICATORS if indicator in all_investors)
+        eu_score = sum(1 for indicator in EUROPE_INDICATORS if indicator in all_investors)
+        if na_score > eu_score:
+            return "North America"
+        elif eu_score > na_score:
+            return "Europe"
+        else:
+            return "Global/Other"
+
+    return df.apply(lambda row: determine_geography(row['Lead Investor(s)'], row['Other Investors']), axis=1)
+
+
+def synthetic_deals(rows, seed=0):
+    """Recombine investor names from data.json into a larger deals table."""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data.json')
+    with open(path, 'r', encoding='utf-8') as file:
+        records = json.load(file)
+
+    names = sorted({
+        name.strip()
+        for record in records
+        for column in ('Lead Investor(s)', 'Other Investors')
+        for name in str(record.get(column) or '').split(', ')
+        if name.strip()
+    })
+
+    rng = np.random.default_rng(seed)
+
+    def investor_lists():
+        counts = rng.integers(1, 4, rows)
+        picks = rng.choice(names, counts.sum())
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        return [', '.join(picks[bounds[i]:bounds[i + 1]]) for i in range(rows)]
+
+    return pd.DataFrame({'Lead Investor(s)': investor_lists(), 'Other Investors': investor_lists()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000, help='Number of synthetic deals')
+    args = parser.parse_args()
+
+    df = synthetic_deals(args.rows)
+    print(f"{len(df):,} deals, {df.drop_duplicates().shape[0]:,} distinct investor pairs")
+
+    start = time.perf_counter()
+    expected = legacy_add_geography(df)
+    legacy_seconds = time.perf_counter() - start
+
+    classifier = GeographyClassifier([("North America", NORTH_AMERICA_INDICATORS), ("Europe", EUROPE_INDICATORS)])
+
+    start = time.perf_counter()
+    cold = classifier.classify(df['Lead Investor(s)'], df['Other Investors'])
+    cold_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    warm = classifier.classify(df['Lead Investor(s)'], df['Other Investors'])
+    warm_seconds = time.perf_counter() - start
+
+    assert cold.equals(expected) and warm.equals(expected), "classifier disagrees with the row-wise rules"
+
+    print(f"row-wise apply:    {legacy_seconds * 1000:10.1f} ms")
+    print(f"classifier (cold): {cold_seconds * 1000:10.1f} ms  ({legacy_seconds / cold_seconds:.1f}x)")
+    print(f"classifier (warm): {warm_seconds * 1000:10.1f} ms  ({legacy_seconds / warm_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
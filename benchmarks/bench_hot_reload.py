@@ -0,0 +1,113 @@
+"""
+Benchmark request latency while the data file changes, with and without a watcher.
+
+Writes a synthetic deals file and has reader threads open stores and read
+the top of the investor summary in a loop while deals are appended to the
+file from outside the cache. Without a watcher the first lookup after a change
+rebuilds the dataset on the request path; with one (DatasetCache.watch) the
+rebuild runs in the background and lookups keep getting the old snapshot
+until the new one is swapped in. Checks that the final snapshot matches a
+fresh load and reports request latency percentiles, the slowest request and
+how long each change took to become visible.
+
+Usage:
+    python benchmarks/bench_hot_reload.py --deals 20000 --changes 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_shared_dataset import write_deals
+from deal_store import append_deal_to_file, validate_deal
+from query_engine import DatasetCache, JsonDealStore, load_dataset
+
+
+def new_deal(i):
+    return validate_deal({
+        'Company Name': f"Late Arrival {i}", 'Funding Date': '2025-06-01', 'Amount': 1_000_000, 'Currency': 'USD',
+        'Funding Stage': 'Seed', 'Lead Investor(s)': f"Brand New Capital {i}", 'Other Investors': 'Not specified',
+        'Climate Vertical': 'Water', 'Company Description': 'x', 'Source URL': f"https://example.com/late/{i}"
+    })
+
+
+def run(path, readers, changes, pause, think, watch):
+    """Readers query while the file changes; returns (latencies, seconds until each change was served)."""
+    cache = DatasetCache()
+    if watch:
+        cache.watch(path, interval=0.2, debounce=0.2)
+    rows = len(cache.get(path).df)
+
+    stop = threading.Event()
+    latencies = [[] for _ in range(readers)]
+
+    def reader(index):
+        while not stop.is_set():
+            start = time.perf_counter()
+            store = JsonDealStore(path, cache)
+            store.investor_summary().head(25)
+            latencies[index].append(time.perf_counter() - start)
+            # Time between requests, as spent rendering a page
+            stop.wait(think)
+
+    threads = [threading.Thread(target=reader, args=(index,)) for index in range(readers)]
+    for thread in threads:
+        thread.start()
+
+    visible = []
+    for i in range(changes):
+        time.sleep(pause)
+        append_deal_to_file(path, new_deal(i))
+        rows += 1
+        start = time.perf_counter()
+        while len(cache.get(path).df) != rows:
+            time.sleep(0.01)
+        visible.append(time.perf_counter() - start)
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    cache.unwatch()
+
+    fresh = load_dataset(path)
+    pd.testing.assert_frame_equal(cache.get(path).investor_summary, fresh.investor_summary)
+    return np.concatenate(latencies), visible
+
+
+def report(label, latencies, visible):
+    print(f"{label:<10} {len(latencies):7,} requests   " +
+          '  '.join(f"p{p} {np.percentile(latencies, p) * 1000:7.2f} ms" for p in (50, 99)) +
+          f"  max {latencies.max() * 1000:8.1f} ms   change visible after " +
+          ', '.join(f"{seconds:.2f}s" for seconds in visible))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--deals', type=int, default=20_000, help='Synthetic deals')
+    parser.add_argument('--investors', type=int, default=3_000, help='Synthetic investor population')
+    parser.add_argument('--readers', type=int, default=4, help='Concurrent reader threads')
+    parser.add_argument('--changes', type=int, default=3, help='Changes to the file per run')
+    parser.add_argument('--pause', type=float, default=2.0, help='Seconds between changes')
+    parser.add_argument('--think', type=float, default=0.02, help='Seconds each reader waits between requests')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'deals.json')
+        write_deals(path, args.deals, args.investors)
+        print(f"{args.deals:,} deals, {args.readers} readers, {args.changes} changes")
+
+        for label, watch in (('on request', False), ('watcher', True)):
+            latencies, visible = run(path, args.readers, args.changes, args.pause, args.think, watch)
+            report(label, latencies, visible)
+
+
+if __name__ == '__main__':
+    main()
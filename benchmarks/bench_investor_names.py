@@ -0,0 +1,95 @@
+"""
+Benchmark investor name resolution against comparing every pair of names.
+
+Builds synthetic raw investor names with legal suffixes, division words,
+accents and typos, checks that blocked resolution gives the same investors as
+a pairwise comparison of every earlier name on a prefix of the list and as
+resolving the names one at a time, and reports resolution time for growing
+numbers of distinct names.
+
+Usage:
+    python benchmarks/bench_investor_names.py --names 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from investor_names import InvestorAliases, normalize_investor_name, typo_match
+
+WORDS = ['Alpine', 'Boreal', 'Cascade', 'Delta', 'Ember', 'Fjord', 'Granite', 'Harbor', 'Indigo', 'Juniper',
+         'Kestrel', 'Lumen', 'Meridian', 'Northwind', 'Orchard', 'Pioneer', 'Quarry', 'Redwood', 'Summit', 'Tundra',
+         'Société', 'Énergie', 'Zürich', 'Climate', 'Carbon', 'Ocean', 'Solar', 'Terra', 'Future', 'Planet']
+SUFFIXES = ['Capital', 'Ventures', 'Partners', 'Fund', 'Asset Management', 'Group', 'Inc.', 'LLC', 'GmbH', '']
+
+
+def synthetic_names(count, seed=0):
+    """Distinct raw names; about one in five has a one-character typo in its first word."""
+    rng = np.random.default_rng(seed)
+    names = {}
+    while len(names) < count:
+        words = list(rng.choice(WORDS, rng.integers(1, 3))) + [str(rng.integers(1, 5_000))]
+        if rng.random() < 0.2:
+            word, position = words[0], rng.integers(0, len(words[0]))
+            words[0] = word[:position] + word[position + 1:] if rng.random() < 0.5 else word[:position] + 'x' + word[position:]
+        suffix = rng.choice(SUFFIXES)
+        names[' '.join(words) + (' ' + suffix if suffix else '')] = None
+    return list(names)
+
+
+def pairwise_investors(names):
+    """Reference: compare each name's key with the key of every earlier name."""
+    keys = list(dict.fromkeys(normalize_investor_name(name) for name in names))
+    investor_ids, count = {}, 0
+    for j, key in enumerate(keys):
+        matches = [investor_ids[keys[i]] for i in range(j) if typo_match(key, keys[i])]
+        investor_ids[key] = min(matches) if matches else count
+        count += not matches
+    return [investor_ids[normalize_investor_name(name)] for name in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--names', type=int, default=100_000, help='Number of distinct raw names')
+    parser.add_argument('--checks', type=int, default=3_000, help='Names checked against the pairwise comparison')
+    args = parser.parse_args()
+
+    names = synthetic_names(args.names)
+
+    sample = names[:args.checks]
+    start = time.perf_counter()
+    expected = pairwise_investors(sample)
+    pairwise_seconds = time.perf_counter() - start
+    aliases = InvestorAliases()
+    aliases.add(sample)
+    assert aliases.to_frame()['Investor ID'].tolist() == expected, "blocked resolution disagrees with the pairwise comparison"
+
+    one_by_one = InvestorAliases()
+    for name in sample:
+        one_by_one.add([name])
+    assert one_by_one.to_frame().equals(aliases.to_frame()), "resolving one name at a time gives different investors"
+
+    print(f"pairwise check on {len(sample):,} names: {pairwise_seconds * 1000:10.1f} ms "
+          f"(~{pairwise_seconds * (args.names / len(sample)) ** 2:,.0f} s for {args.names:,})")
+
+    for count in sorted({args.names // 8, args.names // 4, args.names // 2, args.names}):
+        start = time.perf_counter()
+        aliases = InvestorAliases()
+        aliases.add(names[:count])
+        seconds = time.perf_counter() - start
+        investors = len(set(aliases.to_frame()['Investor ID']))
+        print(f"{count:>9,} names -> {investors:>9,} investors: {seconds * 1000:10.1f} ms  ({seconds / count * 1e6:.1f} us/name)")
+
+    appends = 1_000
+    start = time.perf_counter()
+    for i in range(appends):
+        aliases.add([f"Late Arrival {i} Capital"])
+    print(f"one new name:       {(time.perf_counter() - start) / appends * 1000:10.3f} ms per name ({appends:,} names)")
+
+
+if __name__ == '__main__':
+    main()
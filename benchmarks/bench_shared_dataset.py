@@ -0,0 +1,180 @@
+"""
+Benchmark worker processes sharing one published dataset against private copies.
+
+Writes a synthetic deals file and starts several worker processes that load
+it either privately (each parses and enriches the file itself) or through
+DatasetCache, where the first worker publishes the enriched table and the
+participation index and the others map them. Checks that every worker sees
+the same investor summary, reports load time and per-worker memory (unique
+and proportional set size), then appends a deal and reports how the shared
+workers pick up the new generation.
+
+Usage:
+    python benchmarks/bench_shared_dataset.py --deals 200000 --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+VERTICALS = ['Energy', 'Mobility', 'Food & Agriculture', 'Buildings', 'Carbon Removal', 'Industry', 'Water']
+STAGES = ['Pre-Seed', 'Seed', 'Series A', 'Series B', 'Series C', 'Growth']
+COUNTRIES = ['Germany', 'France', 'United States', 'Canada', 'India', 'Kenya', 'Brazil', 'Australia']
+
+
+def write_deals(path, deals, investors, seed=0):
+    """NDJSON deals whose investors are drawn from a Zipf-like population."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Investor {i:06d}" for i in range(investors)], dtype=object)
+    popularity = 1.0 / np.arange(1, investors + 1)
+    popularity /= popularity.sum()
+    dates = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 2_000, deals), unit='D')
+
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(deals):
+            picks = list(dict.fromkeys(names[rng.choice(investors, rng.integers(1, 7), p=popularity)]))
+            file.write(json.dumps({
+                'Company Name': f"Company {i:07d}",
+                'Funding Date': dates[i].strftime('%Y-%m-%d'),
+                'Amount': int(rng.integers(1, 2_000)) * 50_000,
+                'Currency': str(rng.choice(['USD', 'EUR'])),
+                'Funding Stage': str(rng.choice(STAGES)),
+                'Lead Investor(s)': picks[0],
+                'Other Investors': ', '.join(picks[1:]) or 'Not specified',
+                'Climate Vertical': str(rng.choice(VERTICALS)),
+                'Company Description': f"Climate company {i} based in {rng.choice(COUNTRIES)}, building {rng.choice(VERTICALS).lower()} products.",
+                'Source URL': f"https://example.com/news/{i}",
+            }) + '\n')
+
+
+def memory(mapped=None):
+    """
+    (USS, PSS) of this process in MB, from /proc/self/smaps (zeros elsewhere).
+
+    With mapped, only mappings of files whose path contains it are counted.
+    """
+    uss = pss = 0
+    counted = mapped is None
+    try:
+        with open('/proc/self/smaps', encoding='utf-8', errors='replace') as file:
+            for line in file:
+                parts = line.split()
+                if not line[0].isupper():
+                    # Mapping header: address range, permissions, offset, device, inode, [path]
+                    counted = mapped is None or (len(parts) > 5 and mapped in parts[5])
+                elif counted and parts[0] in ('Private_Clean:', 'Private_Dirty:'):
+                    uss += int(parts[1])
+                elif counted and parts[0] == 'Pss:':
+                    pss += int(parts[1])
+    except OSError:
+        pass
+    return uss / 1024, pss / 1024
+
+
+def checksum(dataset):
+    return int(pd.util.hash_pandas_object(dataset.investor_summary, index=False).sum())
+
+
+def worker(path, warmup_path, shared, barrier, results):
+    from query_engine import DatasetCache, load_dataset
+    from table_cache import CACHE_DIR_NAME
+
+    # Load a small file first, so imports and allocator pools are not counted
+    load_dataset(warmup_path)
+    before = memory()
+    start = time.perf_counter()
+    cache = DatasetCache()
+    dataset = cache.get(path) if shared else load_dataset(path)
+    seconds = time.perf_counter() - start
+
+    # Measure once every worker holds its dataset, so shared pages are counted as shared
+    barrier.wait()
+    uss, pss = memory()
+    mapped_uss, mapped_pss = memory(CACHE_DIR_NAME)
+    tables = (dataset.df.memory_usage(deep=True).sum() + dataset.participation.memory_usage(deep=True).sum()) / 2 ** 20
+    results.put({'seconds': seconds, 'tables': tables, 'mapped_uss': mapped_uss, 'mapped_pss': mapped_pss,
+                 'uss': uss - before[0], 'pss': pss - before[1], 'generation': dataset.generation, 'summary': checksum(dataset)})
+    barrier.wait()
+
+    if shared:
+        # The main process appends a deal; every worker then looks the file up again
+        barrier.wait()
+        start = time.perf_counter()
+        dataset = cache.get(path)
+        results.put({'seconds': time.perf_counter() - start, 'generation': dataset.generation, 'summary': checksum(dataset)})
+        barrier.wait()
+
+
+def run(path, warmup_path, workers, shared):
+    context = multiprocessing.get_context('spawn')
+    barrier, results = context.Barrier(workers + 1), context.Queue()
+    processes = [context.Process(target=worker, args=(path, warmup_path, shared, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    barrier.wait()
+    barrier.wait()
+    loads = [results.get() for _ in range(workers)]
+    reloads = []
+    if shared:
+        from deal_store import append_deal_to_file, validate_deal
+        append_deal_to_file(path, validate_deal({
+            'Company Name': 'Late Arrival', 'Funding Date': '2025-06-01', 'Amount': 1_000_000, 'Currency': 'USD',
+            'Funding Stage': 'Seed', 'Lead Investor(s)': 'Brand New Capital', 'Other Investors': 'Not specified',
+            'Climate Vertical': 'Water', 'Company Description': 'x', 'Source URL': 'https://example.com/late'
+        }))
+        barrier.wait()
+        barrier.wait()
+        reloads = [results.get() for _ in range(workers)]
+
+    for process in processes:
+        process.join()
+    return loads, reloads
+
+
+def report(label, loads, workers):
+    seconds = sorted(load['seconds'] for load in loads)
+    print(f"{label:<16} {seconds[0]:6.2f}-{seconds[-1]:5.2f} s", end='')
+    if 'uss' in loads[0]:
+        for key in ('tables', 'mapped_uss', 'mapped_pss', 'uss', 'pss'):
+            print(f"  {np.mean([load[key] for load in loads]):8.1f}", end='')
+        print(f"  {sum(load['uss'] for load in loads):8.1f}", end='')
+    print(f"   generation {sorted({load['generation'] for load in loads})}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--deals', type=int, default=200_000, help='Synthetic deals')
+    parser.add_argument('--investors', type=int, default=20_000, help='Synthetic investor population')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'deals.json')
+        warmup_path = os.path.join(directory, 'warmup.json')
+        write_deals(path, args.deals, args.investors)
+        write_deals(warmup_path, 500, 100, seed=1)
+
+        private, _ = run(path, warmup_path, args.workers, shared=False)
+        shared, reloads = run(path, warmup_path, args.workers, shared=True)
+        assert len({load['summary'] for load in private + shared}) == 1, "workers disagree on the investor summary"
+        assert len({load['summary'] for load in reloads}) == 1 and reloads[0]['summary'] != shared[0]['summary'], "workers disagree after the append"
+
+        print(f"{args.deals:,} deals, {args.workers} workers; memory in MB per worker "
+              f"(table size, USS and PSS of the mapped tables, USS and PSS growth of the process) and USS of all workers")
+        print(f"{'':<16} {'load':>12}  {'tables':>8}  {'map USS':>8}  {'map PSS':>8}  {'USS':>8}  {'PSS':>8}  {'all USS':>8}")
+        report('private copies', private, args.workers)
+        report('shared (mapped)', shared, args.workers)
+        report('after append', reloads, args.workers)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark the sparse investor similarity queries against dense brute-force cosine.
+
+Builds a synthetic deals table with a long-tailed investor population, checks
+that the top similar investors and profile matches agree with a dense
+investor x feature matrix for a sample of queries, and reports build time,
+memory and query latency percentiles.
+
+Usage:
+    python benchmarks/bench_similarity.py --deals 200000 --investors 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enrichment import build_participation_index
+from similarity import PROFILE_COLUMNS, InvestorProfiles
+
+VALUES = {
+    'Climate Vertical': ['Energy', 'Mobility', 'Food & Agriculture', 'Buildings', 'Carbon Removal', 'Industry', 'Water', None],
+    'Funding Stage': ['Pre-Seed', 'Seed', 'Series A', 'Series B', 'Series C', 'Growth', None],
+    'Deal Size Category': ['Micro', 'Small', 'Medium', 'Large', 'Mega'],
+    'Geography': ['North America', 'Europe', 'Asia', 'Oceania', 'Africa', 'South America', None],
+}
+
+
+def synthetic_deals(deals, investors, seed=0):
+    """Deals with 1-3 lead and 0-8 other investors drawn from a Zipf-like population."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Investor {i:06d}" for i in range(investors)], dtype=object)
+    popularity = 1.0 / np.arange(1, investors + 1)
+    popularity /= popularity.sum()
+
+    def investor_lists(low, high):
+        counts = rng.integers(low, high, deals)
+        picks = names[rng.choice(investors, counts.sum(), p=popularity)]
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        return [', '.join(dict.fromkeys(picks[bounds[i]:bounds[i + 1]])) or None for i in range(deals)]
+
+    df = pd.DataFrame({
+        'Lead Investor(s)': investor_lists(1, 4),
+        'Other Investors': investor_lists(0, 9),
+    })
+    for column, values in VALUES.items():
+        df[column] = pd.Categorical(rng.choice(np.array(values, dtype=object), deals))
+    return df
+
+
+def dense_matrix(df, participation):
+    """Reference vectors: one dense row per investor, one column per (column, value)."""
+    positions = df.index.get_indexer(participation['Deal ID'])
+    names = pd.unique(participation['Investor'])
+    rows = pd.Index(names).get_indexer(participation['Investor'])
+    features, blocks = [], []
+    for column in PROFILE_COLUMNS:
+        codes = df[column].cat.codes.to_numpy()[positions]
+        block = np.zeros((len(names), len(df[column].cat.categories)))
+        np.add.at(block, (rows[codes >= 0], codes[codes >= 0]), 1)
+        features += [(column, value) for value in df[column].cat.categories]
+        blocks.append(block)
+    return list(names), {feature: i for i, feature in enumerate(features)}, np.hstack(blocks)
+
+
+def dense_top(matrix, query, k, exclude=None):
+    """Brute-force cosine over every investor, ties by first appearance."""
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(norms > 0, matrix @ query / norms, 0.0)
+    ranked = [i for i in sorted(range(len(scores)), key=lambda i: (-scores[i], i)) if scores[i] > 0 and i != exclude]
+    return ranked[:k], scores
+
+
+def percentiles(seconds):
+    return ', '.join(f"p{p} {np.percentile(seconds, p) * 1000:.2f} ms" for p in (50, 90, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--deals', type=int, default=100_000, help='Number of synthetic deals')
+    parser.add_argument('--investors', type=int, default=10_000, help='Size of the investor population')
+    parser.add_argument('--queries', type=int, default=500, help='Number of top-k queries')
+    parser.add_argument('--checks', type=int, default=5, help='Queries checked against brute-force cosine')
+    args = parser.parse_args()
+
+    df = synthetic_deals(args.deals, args.investors)
+    participation = build_participation_index(df)
+
+    start = time.perf_counter()
+    profiles = InvestorProfiles.from_deals(df, participation)
+    build_seconds = time.perf_counter() - start
+
+    profile_bytes = sum(array.nbytes for array in (profiles._rows, profiles._indices, profiles._data, profiles._indptr, profiles._norms))
+    print(f"{len(df):,} deals, {len(profiles):,} investors, {len(profiles._features)} features, {len(profiles._data):,} non-zeros")
+
+    names, feature_ids, matrix = dense_matrix(df, participation)
+    rng = np.random.default_rng(1)
+    for investor_id in rng.choice(len(names), args.checks):
+        ranked, scores = dense_top(matrix, matrix[investor_id], 10, exclude=investor_id)
+        got = profiles.similar_investors(names[investor_id], 10)
+        assert got['Investor Name'].tolist() == [names[i] for i in ranked], f"similar investors disagree for {names[investor_id]!r}"
+        assert np.allclose(got['Similarity'], scores[ranked])
+
+        profile = {column: [v for v in rng.choice(np.array(values, dtype=object), 2) if v is not None] for column, values in VALUES.items()}
+        query = np.zeros(matrix.shape[1])
+        for column, values in profile.items():
+            for value in values:
+                query[feature_ids[(column, value)]] = 1.0
+        ranked, scores = dense_top(matrix, query, 10)
+        got = profiles.match_profile(profile, 10)
+        assert got['Investor Name'].tolist() == [names[i] for i in ranked], f"profile match disagrees for {profile!r}"
+        assert np.allclose(got['Similarity'], scores[ranked])
+
+    dense_seconds = []
+    similar_seconds = []
+    for name in rng.choice(names, args.queries):
+        start = time.perf_counter()
+        profiles.similar_investors(name, 10)
+        similar_seconds.append(time.perf_counter() - start)
+    for investor_id in rng.choice(len(names), min(args.queries, 50)):
+        start = time.perf_counter()
+        dense_top(matrix, matrix[investor_id], 10, exclude=investor_id)
+        dense_seconds.append(time.perf_counter() - start)
+
+    match_seconds = []
+    for _ in range(args.queries):
+        profile = {column: [v for v in rng.choice(np.array(values, dtype=object), 2) if v is not None] for column, values in VALUES.items()}
+        start = time.perf_counter()
+        profiles.match_profile(profile, 10)
+        match_seconds.append(time.perf_counter() - start)
+
+    print(f"profiles build:     {build_seconds * 1000:10.1f} ms")
+    print(f"profiles memory:    {profile_bytes / 2 ** 20:10.1f} MiB")
+    print(f"brute-force cosine: {percentiles(dense_seconds)}")
+    print(f"similar investors:  {percentiles(similar_seconds)}")
+    print(f"profile match:      {percentiles(match_seconds)}")
+
+
+if __name__ == '__main__':
+    main()
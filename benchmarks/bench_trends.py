@@ -0,0 +1,136 @@
+"""
+Benchmark the funding trends cube against grouping the deals table per query.
+
+Builds synthetic deals over several years, checks that cube queries match a
+pandas groupby over the filtered deals for a sample of slices, and reports
+build time, append time and query latency percentiles.
+
+Usage:
+    python benchmarks/bench_trends.py --deals 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trends import TREND_DIMENSIONS, TREND_MEASURES, UNKNOWN_LABEL, FundingCube, month_ordinals
+
+VALUES = {
+    'Climate Vertical': [f"Vertical {i}" for i in range(40)] + [None],
+    'Funding Stage': ['Pre-Seed', 'Seed', 'Series A', 'Series B', 'Series C', 'Series D', 'Growth', 'Debt', 'Grant', None],
+    'Geography': ['North America', 'Europe', 'Asia', 'Oceania', 'Africa', 'South America', None],
+}
+
+
+def synthetic_deals(deals, seed=0):
+    rng = np.random.default_rng(seed)
+    start, end = pd.Timestamp('2015-01-01'), pd.Timestamp('2025-09-01')
+    dates = start + pd.to_timedelta(rng.integers(0, (end - start).days, deals), unit='D')
+    dates = pd.Series(dates).where(rng.random(deals) > 0.01)
+    df = pd.DataFrame({
+        'Funding Date': dates,
+        'Amount (USD)': rng.integers(1, 2_000, deals) * 50_000,
+    })
+    for column, values in VALUES.items():
+        df[column] = pd.Categorical(rng.choice(np.array(values, dtype=object), deals))
+    return df, rng.integers(0, 4, deals)
+
+
+def grouped_trend(df, leads, measure, filters, by):
+    """Reference: filter and group every deal for each query."""
+    deals = df.assign(deals=1, capital=df['Amount (USD)'], lead_investors=leads).dropna(subset=['Funding Date'])
+    months = deals['Funding Date'].dt.to_period('M')
+    full = pd.period_range(months.min(), months.max(), freq='M').to_timestamp()
+    for column, values in filters.items():
+        deals = deals[deals[column].isin(values)]
+    month = deals['Funding Date'].dt.to_period('M').dt.to_timestamp()
+    column = TREND_MEASURES[measure]
+    if by is None:
+        return deals.groupby(month)[column].sum().reindex(full, fill_value=0).to_frame(measure)
+    series = deals[by].astype(object).fillna(UNKNOWN_LABEL)
+    table = deals.groupby([month, series])[column].sum().unstack(fill_value=0).reindex(full, fill_value=0)
+    table = table.loc[:, table.sum() != 0]
+    return table[sorted(table.columns, key=lambda label: (-table[label].sum(), label))]
+
+
+def random_query(rng):
+    filters = {}
+    for column in TREND_DIMENSIONS:
+        if rng.random() < 0.5:
+            values = [value for value in VALUES[column] if value is not None]
+            filters[column] = list(rng.choice(values, rng.integers(1, 4), replace=False))
+    by = [None, *TREND_DIMENSIONS][rng.integers(0, len(TREND_DIMENSIONS) + 1)]
+    return list(TREND_MEASURES)[rng.integers(0, len(TREND_MEASURES))], filters, by
+
+
+def percentiles(seconds):
+    return ', '.join(f"p{p} {np.percentile(seconds, p) * 1000:.2f} ms" for p in (50, 90, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--deals', type=int, default=1_000_000, help='Number of synthetic deals')
+    parser.add_argument('--queries', type=int, default=500, help='Number of cube queries')
+    parser.add_argument('--checks', type=int, default=5, help='Queries checked against a pandas groupby')
+    parser.add_argument('--appends', type=int, default=1_000, help='Deals appended to the cube one at a time')
+    args = parser.parse_args()
+
+    df, leads = synthetic_deals(args.deals)
+
+    start = time.perf_counter()
+    cube = FundingCube(
+        month_ordinals(df['Funding Date']),
+        {column: df[column] for column in TREND_DIMENSIONS},
+        df['Amount (USD)'].to_numpy(dtype=np.int64),
+        leads
+    )
+    build_seconds = time.perf_counter() - start
+    print(f"{len(df):,} deals, {len(cube._months):,} cube cells")
+
+    rng = np.random.default_rng(1)
+    scan_seconds = []
+    for _ in range(args.checks):
+        measure, filters, by = random_query(rng)
+        start = time.perf_counter()
+        expected = grouped_trend(df, leads, measure, filters, by)
+        scan_seconds.append(time.perf_counter() - start)
+        got = cube.trend(measure, filters, by)
+        assert list(got.columns) == list(expected.columns), f"cube series disagree for {measure}, {filters}, {by}"
+        assert (got.to_numpy() == expected.to_numpy()).all(), f"cube totals disagree for {measure}, {filters}, {by}"
+
+    query_seconds = []
+    for _ in range(args.queries):
+        measure, filters, by = random_query(rng)
+        start = time.perf_counter()
+        cube.trend(measure, filters, by)
+        query_seconds.append(time.perf_counter() - start)
+
+    append_seconds = []
+    appended = cube
+    for i in range(args.appends):
+        values = {column: VALUES[column][i % len(VALUES[column])] for column in TREND_DIMENSIONS}
+        start = time.perf_counter()
+        appended = appended.appended(pd.Timestamp('2025-09-15'), values, 1_000_000, 1)
+        append_seconds.append(time.perf_counter() - start)
+
+    overlay_seconds = []
+    for _ in range(args.queries):
+        measure, filters, by = random_query(rng)
+        start = time.perf_counter()
+        appended.trend(measure, filters, by)
+        overlay_seconds.append(time.perf_counter() - start)
+
+    print(f"cube build:         {build_seconds * 1000:10.1f} ms")
+    print(f"groupby per query:  {percentiles(scan_seconds)}")
+    print(f"cube query:         {percentiles(query_seconds)}")
+    print(f"append one deal:    {percentiles(append_seconds)}")
+    print(f"query after {args.appends:,} appends: {percentiles(overlay_seconds)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Investor co-investment graph for "Who co-invests with X?".
+
+Built once from the deal -> investor participation index: every pair of
+investors in the same deal is an edge, weighted by the deals they share, the
+deals they both led and the capital of those shared deals. Edges are kept in
+CSR form (one row of neighbors per investor), so memory grows with the number
+of edges rather than with investors squared, and a top-k query only reads the
+investor's own row.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Ranking label -> weight, as offered on the investor profile
+CO_INVESTOR_WEIGHTS = {
+    "Shared Deals": 'deals',
+    "Shared Lead Deals": 'lead_deals',
+    "Shared Capital": 'capital',
+}
+
+CO_INVESTOR_COLUMNS = ['Co-Investor', 'Shared Deals', 'Shared Lead Deals', 'Shared Capital']
+
+
+class CoInvestmentGraph:
+    """
+    Weighted, undirected co-investment graph over the investors of a deals table.
+
+    Per pair of investors: 'deals' counts the deals both took part in,
+    'lead_deals' the deals both led and 'capital' sums the USD amounts of the
+    shared deals (whole rounds, not each investor's share).
+    """
+
+    def __init__(self, participation, amounts):
+        """
+        Args:
+            participation (pd.DataFrame): Participation index from
+                enrichment.build_participation_index
+            amounts (pd.Series): USD amount per deal, indexed like the deals
+                table the participation index was built on
+        """
+        codes, names = pd.factorize(participation['Investor'])
+        self._names = names.tolist()
+        self._ids = {name: i for i, name in enumerate(self._names)}
+
+        # Edges added by appended(), per investor id: {neighbor id: [deals, lead_deals, capital]}
+        self._extra = {}
+
+        # Group the participations of each deal together
+        deals = participation['Deal ID'].to_numpy()
+        order = np.argsort(amounts.index.get_indexer(deals), kind='stable')
+        codes = codes[order]
+        lead = (participation['Role'] == 'Lead').to_numpy()[order]
+        capital = amounts.reindex(deals[order]).fillna(0).to_numpy(dtype=np.int64)
+        deals = deals[order]
+
+        starts = np.flatnonzero(np.r_[True, deals[1:] != deals[:-1]]) if len(deals) else np.array([], dtype=np.int64)
+        sizes = np.diff(np.r_[starts, len(deals)])
+
+        # Every ordered pair of participations within a deal, in one vectorized step
+        per_row = np.repeat(sizes, sizes)
+        left = np.repeat(np.arange(len(deals)), per_row)
+        right = np.repeat(np.repeat(starts, sizes), per_row) + (np.arange(len(left)) - np.repeat(np.cumsum(per_row) - per_row, per_row))
+        distinct = left != right
+        left, right = left[distinct], right[distinct]
+
+        # Sum the weights of each (investor, neighbor) edge over its deals
+        keys = codes[left].astype(np.int64) * len(self._names) + codes[right]
+        # Any order of equal keys gives the same sums, so the faster unstable sort is enough
+        order = np.argsort(keys)
+        keys = keys[order]
+        edge_starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+        left, right = left[order], right[order]
+
+        self._deals = np.diff(np.r_[edge_starts, len(keys)]).astype(np.int64)
+        self._lead_deals = np.add.reduceat((lead[left] & lead[right]).astype(np.int64), edge_starts) if len(keys) else np.array([], dtype=np.int64)
+        self._capital = np.add.reduceat(capital[left], edge_starts) if len(keys) else np.array([], dtype=np.int64)
+
+        # CSR rows: neighbors of each investor, sorted by neighbor id
+        sources = keys[edge_starts] // max(len(self._names), 1)
+        self._indices = keys[edge_starts] % max(len(self._names), 1)
+        self._indptr = np.searchsorted(sources, np.arange(len(self._names) + 1))
+
+    @property
+    def edge_count(self):
+        """Number of distinct co-investor pairs (each pair counted once)."""
+        # Appended edges only count when the pair had no edge yet
+        extra = 0
+        for source, neighbors in self._extra.items():
+            existing = set(self._indices[self._indptr[source]:self._indptr[source + 1]].tolist()) if source < len(self._indptr) - 1 else set()
+            extra += len(neighbors.keys() - existing)
+        return (len(self._indices) + extra) // 2
+
+    def appended(self, investors, roles, amount):
+        """
+        Return a copy of the graph with one more deal.
+
+        Only the edge lists of the deal's investors are copied and extended; the
+        CSR arrays are shared with this graph.
+
+        Args:
+            investors (list): Investors of the new deal (no repeats)
+            roles (list): "Lead" or "Other" per investor
+            amount (int): USD amount of the deal (missing: adds no capital)
+
+        Returns:
+            CoInvestmentGraph: Graph including the new deal
+        """
+        graph = copy.copy(self)
+        new_names = [name for name in investors if name not in self._ids]
+        if new_names:
+            graph._names = self._names + new_names
+            graph._ids = {**self._ids, **{name: len(self._names) + i for i, name in enumerate(new_names)}}
+
+        ids = [graph._ids[name] for name in investors]
+        graph._extra = dict(self._extra)
+        for source, source_role in zip(ids, roles):
+            neighbors = {key: list(weights) for key, weights in self._extra.get(source, {}).items()}
+            for target, target_role in zip(ids, roles):
+                if target != source:
+                    weights = neighbors.setdefault(target, [0, 0, 0])
+                    weights[0] += 1
+                    weights[1] += int(source_role == 'Lead' and target_role == 'Lead')
+                    weights[2] += 0 if pd.isna(amount) else int(amount)
+            graph._extra[source] = neighbors
+
+        return graph
+
+    def neighbors(self, investor_name):
+        """
+        All co-investors of an investor with their edge weights.
+
+        Args:
+            investor_name (str): Name of the investor
+
+        Returns:
+            tuple: (neighbor ids, deals, lead_deals, capital) arrays, by neighbor id
+        """
+        source = self._ids.get(investor_name)
+        empty = np.array([], dtype=np.int64)
+        if source is None:
+            return empty, empty, empty, empty
+
+        if source < len(self._indptr) - 1:
+            row = slice(self._indptr[source], self._indptr[source + 1])
+            ids, deals, lead_deals, capital = self._indices[row], self._deals[row], self._lead_deals[row], self._capital[row]
+        else:
+            ids, deals, lead_deals, capital = empty, empty, empty, empty
+
+        extra = self._extra.get(source)
+        if extra:
+            # Add the appended deals onto existing edges, then append the new edges
+            ids, deals, lead_deals, capital = ids.copy(), deals.copy(), lead_deals.copy(), capital.copy()
+            new = []
+            for target, weights in extra.items():
+                found = np.searchsorted(ids, target)
+                if found < len(ids) and ids[found] == target:
+                    deals[found] += weights[0]
+                    lead_deals[found] += weights[1]
+                    capital[found] += weights[2]
+                else:
+                    new.append((target, *weights))
+            if new:
+                new = np.array(sorted(new), dtype=np.int64)
+                ids, deals, lead_deals, capital = (np.concatenate([a, new[:, i]]) for i, a in enumerate([ids, deals, lead_deals, capital]))
+                order = np.argsort(ids, kind='stable')
+                ids, deals, lead_deals, capital = ids[order], deals[order], lead_deals[order], capital[order]
+
+        return ids, deals, lead_deals, capital
+
+    def top_co_investors(self, investor_name, k=10, by="Shared Deals"):
+        """
+        Find the investors that co-invest most with an investor.
+
+        Args:
+            investor_name (str): Name of the investor
+            k (int): Maximum number of co-investors
+            by (str): Ranking, a key of CO_INVESTOR_WEIGHTS
+
+        Returns:
+            pd.DataFrame: CO_INVESTOR_COLUMNS, ranked by the chosen weight, ties
+                in order of the co-investors' first appearance
+        """
+        ids, deals, lead_deals, capital = self.neighbors(investor_name)
+        weights = {'deals': deals, 'lead_deals': lead_deals, 'capital': capital}[CO_INVESTOR_WEIGHTS[by]]
+
+        # Ids follow first appearance, so sorting by id breaks ties
+        if len(ids) > k:
+            # Only the candidates that can make the top k are sorted
+            cutoff = np.partition(weights, len(weights) - k)[len(weights) - k]
+            keep = weights >= cutoff
+            ids, deals, lead_deals, capital, weights = ids[keep], deals[keep], lead_deals[keep], capital[keep], weights[keep]
+        top = np.lexsort((ids, -weights))[:k]
+
+        names = self._names
+        return pd.DataFrame({
+            'Co-Investor': [names[i] for i in ids[top].tolist()],
+            'Shared Deals': deals[top],
+            'Shared Lead Deals': lead_deals[top],
+            'Shared Capital': capital[top],
+        }, columns=CO_INVESTOR_COLUMNS)
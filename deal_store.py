@@ -0,0 +1,195 @@
+"""
+Validation and appending of single deal records to the deals file.
+
+New deals are appended in place: only the tail of the file is rewritten, so
+adding a deal costs one small write whatever the size of the file. Deals are
+deduplicated on company name, funding date and amount.
+"""
+import datetime
+import json
+import math
+import os
+
+# Keys of a deal record, in data.json order
+DEAL_FIELDS = [
+    'Company Name', 'Funding Date', 'Amount', 'Currency', 'Funding Stage',
+    'Lead Investor(s)', 'Other Investors', 'Climate Vertical', 'Company Description', 'Source URL'
+]
+
+# Placeholder used in data.json when no investors are known
+NOT_SPECIFIED = "Not specified"
+
+
+def validate_deal(record):
+    """
+    Check a deal record and normalize it to the data.json schema.
+
+    Args:
+        record (dict): Deal with (a subset of) the DEAL_FIELDS keys
+
+    Returns:
+        dict: Normalized record with every DEAL_FIELDS key, in order
+
+    Raises:
+        ValueError: Listing every problem found in the record
+    """
+    if not isinstance(record, dict):
+        raise ValueError("A deal must be a JSON object")
+
+    problems = [f"Unknown field '{key}'" for key in record if key not in DEAL_FIELDS]
+    deal = {}
+
+    def text(key, required):
+        value = record.get(key)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            if required:
+                problems.append(f"'{key}' is required")
+            return None
+        if not isinstance(value, str):
+            problems.append(f"'{key}' must be a string")
+            return None
+        return value.strip()
+
+    deal['Company Name'] = text('Company Name', required=True)
+
+    funding_date = text('Funding Date', required=True)
+    if funding_date is not None:
+        try:
+            funding_date = datetime.date.fromisoformat(funding_date).isoformat()
+        except ValueError:
+            problems.append("'Funding Date' must be a date in YYYY-MM-DD format")
+    deal['Funding Date'] = funding_date
+
+    amount = record.get('Amount')
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount) or amount < 0:
+        problems.append("'Amount' must be a non-negative number")
+        amount = None
+    deal['Amount'] = int(round(amount)) if amount is not None else None
+
+    currency = text('Currency', required=True)
+    if currency is not None and not (len(currency) == 3 and currency.isalpha()):
+        problems.append("'Currency' must be a three-letter currency code")
+    deal['Currency'] = currency.upper() if currency is not None else None
+
+    deal['Funding Stage'] = text('Funding Stage', required=True)
+    deal['Lead Investor(s)'] = text('Lead Investor(s)', required=False) or NOT_SPECIFIED
+    deal['Other Investors'] = text('Other Investors', required=False) or NOT_SPECIFIED
+    deal['Climate Vertical'] = text('Climate Vertical', required=True)
+    deal['Company Description'] = text('Company Description', required=False)
+    deal['Source URL'] = text('Source URL', required=False)
+
+    if problems:
+        raise ValueError('; '.join(problems))
+    return deal
+
+
+def deal_key(company_name, funding_date, amount):
+    """
+    Deduplication key of a deal.
+
+    Args:
+        company_name (str): Company name (compared case-insensitively)
+        funding_date (str): Funding date as YYYY-MM-DD
+        amount (int): Amount in whole currency units
+
+    Returns:
+        tuple: (normalized company name, date, amount)
+    """
+    return (str(company_name).strip().casefold(), str(funding_date), int(amount))
+
+
+def _last_significant(file, end):
+    """
+    Find the last non-whitespace byte before a position, reading backwards in blocks.
+
+    Args:
+        file: File opened in binary mode
+        end (int): Position to search before
+
+    Returns:
+        tuple: (position, byte), or (-1, b'') if there is only whitespace
+    """
+    while end > 0:
+        start = max(0, end - 4096)
+        file.seek(start)
+        block = file.read(end - start)
+        stripped = block.rstrip()
+        if stripped:
+            return start + len(stripped) - 1, stripped[-1:]
+        end = start
+    return -1, b''
+
+
+def _record_layout(file):
+    """
+    Find how the records of a file of bare objects are written, from its first two records.
+
+    Args:
+        file: File opened in binary mode
+
+    Returns:
+        tuple: (separator, indent): ',' if records are comma-separated or '' if
+            only whitespace separates them, and 4 if records span several lines
+            or None if each is on one line. Files with one record read as NDJSON.
+    """
+    decoder = json.JSONDecoder()
+    file.seek(0)
+    data = b''
+    while True:
+        block = file.read(1 << 16)
+        data += block
+        # A multi-byte character cut at the block end is completed by the next read
+        text = data.decode('utf-8', errors='ignore').lstrip()
+        try:
+            _, end = decoder.raw_decode(text)
+        except ValueError:
+            if not block:
+                return '', None
+            continue
+
+        rest = text[end:].lstrip()
+        if rest or not block:
+            return (',' if rest.startswith(',') else ''), (4 if '\n' in text[:end] else None)
+
+
+def append_deal_to_file(filepath, deal):
+    """
+    Append a deal to a deals file without rewriting the existing records.
+
+    Supports the formats read by ingest.read_deals: a JSON array (the record
+    is inserted before the closing bracket), a comma-separated sequence of
+    objects and newline-delimited JSON. Bare objects are appended with the
+    file's own separator and layout, so the file keeps one format.
+
+    Args:
+        filepath (str): Path of the deals file
+        deal (dict): Validated deal record
+
+    Raises:
+        ValueError: If the file does not end with a complete record or array
+    """
+    with open(filepath, 'rb+') as file:
+        last_pos, last = _last_significant(file, file.seek(0, os.SEEK_END))
+
+        if last == b']':
+            # Replace the closing bracket, after a comma unless the array is empty
+            cut, before = _last_significant(file, last_pos)
+            separator = '\n' if before == b'[' else ',\n'
+            tail = f"{separator}{json.dumps(deal, indent=4, ensure_ascii=False)}\n]\n"
+        elif last == b'}':
+            # Bare objects or NDJSON: separated and laid out like the records already there
+            separator, indent = _record_layout(file)
+            cut = last_pos
+            tail = f"{separator}\n{json.dumps(deal, indent=indent, ensure_ascii=False)}\n"
+        elif last == b'':
+            # Empty file: start NDJSON
+            cut = last_pos
+            tail = f"{json.dumps(deal, ensure_ascii=False)}\n"
+        else:
+            raise ValueError(f"Cannot append to {filepath}: it does not end with a complete record")
+
+        file.seek(cut + 1)
+        file.truncate()
+        file.write(tail.encode('utf-8'))
+        file.flush()
+        os.fsync(file.fileno())
@@ -0,0 +1,190 @@
+"""
+Enrichment of loaded deals, shared by every storage backend.
+
+Adds the derived 'Amount (USD)', 'Geography' and 'Deal Size Category' columns
+and splits the investor columns into a deal -> investor participation index
+keyed by canonical investor names (see investor_names). Nothing here
+depends on Streamlit, so the SQLite importer enriches deals exactly like the
+app does when it loads data.json.
+"""
+import numpy as np
+import pandas as pd
+
+from fx import DEFAULT_FX_TABLE
+from geography import DEFAULT_CLASSIFIER
+from ingest import apply_deal_schema
+from investor_names import NOT_INVESTORS, InvestorAliases, split_and
+
+
+def split_participation(df):
+    """
+    Split the investor columns of deals into one row per (deal, raw investor name).
+
+    Entries are separated by ", " or ";", and "A and B" counts as two
+    investors when both sides look like investor names (see
+    investor_names.split_and). An investor listed in both columns of the same
+    deal appears once, with the "Lead" role.
+
+    Args:
+        df (pd.DataFrame): Original deals DataFrame
+
+    Returns:
+        pd.DataFrame: Columns 'Deal ID' (index label of the deal in df),
+            'Investor' and 'Role' ("Lead" or "Other"), in deal order
+    """
+    parts = []
+
+    for column, role in [('Lead Investor(s)', 'Lead'), ('Other Investors', 'Other')]:
+        # Explode the separated names into one row per (deal, investor)
+        names = df[column].dropna().astype(str).str.split(r', |;', regex=True).explode().str.strip()
+
+        # Only entries with " and " need the word-level check
+        joined = names.str.contains(' and ', regex=False, na=False)
+        if joined.any():
+            names = names.astype(object)
+            names[joined] = names[joined].map(split_and)
+            names = names.explode()
+
+        # Clean investor names (skip "Not specified")
+        names = names[names.notna() & ~names.isin(NOT_INVESTORS)]
+
+        # Intern the names: every row for an investor shares one string object
+        codes, uniques = pd.factorize(names)
+        parts.append(pd.DataFrame({
+            'Deal ID': names.index,
+            'Investor': uniques.to_numpy(dtype=object)[codes],
+            'Role': role
+        }))
+
+    # Lead rows come first, so a duplicate (deal, investor) pair keeps the Lead role
+    participation = pd.concat(parts, ignore_index=True).drop_duplicates(['Deal ID', 'Investor'])
+
+    # Order by deal position, keeping lead investors ahead of other investors within a deal
+    order = np.argsort(df.index.get_indexer(participation['Deal ID']), kind='stable')
+
+    return participation.iloc[order].reset_index(drop=True)
+
+
+def build_participation_index(df, aliases=None):
+    """
+    Build a deal -> investor participation index from deals data.
+
+    The investor columns are split and cleaned once (see split_participation)
+    and every raw name is replaced by its canonical investor, giving a long
+    table with one row per (deal, investor) pair.
+
+    Args:
+        df (pd.DataFrame): Original deals DataFrame
+        aliases (InvestorAliases): Resolutions of every investor name in df;
+            when not given, the names of df are resolved on their own
+
+    Returns:
+        pd.DataFrame: Columns 'Deal ID' (index label of the deal in df),
+            'Investor' (canonical name) and 'Role' ("Lead" or "Other"), in deal order
+    """
+    participation = split_participation(df)
+    if aliases is None:
+        aliases = InvestorAliases()
+        aliases.add(pd.unique(participation['Investor']))
+    return aliases.canonicalize(participation)
+
+
+# Deal size buckets as (label, upper bound, bound included), smallest first.
+# The last bucket has no bound; missing amounts (e.g. in a currency without
+# an exchange rate) get no bucket.
+DEAL_SIZE_STAGES = [
+    ("Pre-Seed (<$1M)", 1_000_000, False),
+    ("Seed ($1M-$5M)", 5_000_000, True),
+    ("Series A ($5M-$20M)", 20_000_000, True),
+    ("Series B+ (>$20M)", None, True),
+]
+
+
+def categorize_deal_size(amount, stages=DEAL_SIZE_STAGES):
+    """
+    Categorize deal size into buckets relevant to funding stages.
+
+    Args:
+        amount (float): Deal amount in USD
+        stages (list): Stage map, see DEAL_SIZE_STAGES
+
+    Returns:
+        str: Deal size category, or None for a missing amount
+    """
+    if pd.isna(amount):
+        return None
+    for label, bound, inclusive in stages[:-1]:
+        if amount <= bound if inclusive else amount < bound:
+            return label
+    return stages[-1][0]
+
+
+def bucket_deal_sizes(amounts, stages=DEAL_SIZE_STAGES):
+    """
+    Categorize a whole column of deal amounts, like categorize_deal_size per value.
+
+    Each bound is one comparison over the column, applied from the largest
+    bucket down so that every amount ends in the smallest bucket it fits.
+
+    Args:
+        amounts (pd.Series): Deal amounts in USD
+        stages (list): Stage map, see DEAL_SIZE_STAGES
+
+    Returns:
+        pd.Series: Categorical deal size categories (missing for missing
+            amounts), with the index of amounts
+    """
+    values = pd.to_numeric(amounts, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = np.full(len(values), len(stages) - 1, dtype=np.int8)
+    for code in range(len(stages) - 2, -1, -1):
+        _, bound, inclusive = stages[code]
+        codes[values <= bound if inclusive else values < bound] = code
+    missing = np.isnan(values)
+
+    # Same categories as astype('category') on the labels: used ones, sorted
+    labels = [label for label, _, _ in stages]
+    used = sorted(np.flatnonzero(np.bincount(codes[~missing], minlength=len(stages))), key=lambda code: labels[code])
+    recode = np.full(len(stages), -1, dtype=np.int8)
+    recode[used] = np.arange(len(used))
+    categories = pd.Categorical.from_codes(np.where(missing, -1, recode[codes]), [labels[code] for code in used])
+    return pd.Series(categories, index=amounts.index)
+
+
+def add_geography_column(df):
+    """
+    Add geography information based on investor names and known patterns.
+    This is a simplified approach - in production, you'd have a proper database.
+
+    Args:
+        df (pd.DataFrame): Original deals DataFrame
+
+    Returns:
+        pd.DataFrame: DataFrame with Geography column added
+    """
+    df = df.copy()
+
+    # Score each distinct investor pair once with the precompiled indicator rules
+    df['Geography'] = DEFAULT_CLASSIFIER.classify(df['Lead Investor(s)'], df['Other Investors'])
+
+    return df
+
+
+def enrich_deals(df):
+    """
+    Add the derived columns to loaded deals and apply the compact schema.
+
+    Args:
+        df (pd.DataFrame): Deals with ingest.apply_deal_schema applied
+
+    Returns:
+        pd.DataFrame: Copy of df with 'Geography', 'Amount (USD)' and 'Deal Size Category'
+    """
+    # Add geography column to the data
+    df = add_geography_column(df)
+
+    # Convert amounts to USD at the rate of their funding date
+    df['Amount (USD)'] = DEFAULT_FX_TABLE.convert(df['Amount'], df['Currency'], df['Funding Date'])
+
+    # Add deal size categories
+    df['Deal Size Category'] = bucket_deal_sizes(df['Amount (USD)'])
+    return apply_deal_schema(df)
@@ -0,0 +1,120 @@
+"""
+Background watcher that reports when a data file has changed.
+
+A daemon thread polls the file's stat signature (mtime, size and inode, so
+files replaced by rename are noticed too) and calls back once a change has
+settled: the signature must stay the same for the debounce period, so a file
+being written in several steps triggers one reload of its final content, not
+one per write. Polling costs one stat per interval and works on every
+platform and filesystem, including network and container mounts where
+inotify events are not delivered.
+
+    watcher = FileWatcher('data.json', on_change=reload, interval=1.0, debounce=0.5)
+    watcher.start()
+"""
+import os
+import threading
+
+
+def stat_signature(filepath):
+    """
+    Signature of a file that changes whenever it is written or replaced.
+
+    Args:
+        filepath (str): Path of the file
+
+    Returns:
+        tuple: (mtime in ns, size, inode), or None if the file does not exist
+    """
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class FileWatcher:
+    """
+    Poll a file and call back from a background thread when it changes.
+
+    The callback runs on the watcher thread, so slow work (reloading the data)
+    stays off the request path. Calls never overlap; a change made while the
+    callback runs is reported on a later poll. Exceptions raised by the
+    callback are kept in last_error and do not stop the watcher.
+    """
+
+    def __init__(self, filepath, on_change, interval=1.0, debounce=0.5):
+        """
+        Args:
+            filepath (str): File to watch
+            on_change (callable): Called with the file path after each settled change
+            interval (float): Seconds between polls
+            debounce (float): Seconds the file must stay unchanged before on_change runs
+        """
+        self.filepath = os.path.abspath(filepath)
+        self.on_change = on_change
+        self.interval = interval
+        self.debounce = debounce
+        self.changes = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._signature = stat_signature(self.filepath)
+
+    def start(self):
+        """Start polling (no-op if already running)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"FileWatcher({os.path.basename(self.filepath)})", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Stop polling, waiting for a running callback to finish.
+
+        Args:
+            timeout (float): Seconds to wait for the thread, or None to wait indefinitely
+        """
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def poll(self):
+        """
+        Check the file once, waiting out the debounce period if it changed.
+
+        Returns:
+            bool: True if a settled change was found and on_change was called
+        """
+        signature = stat_signature(self.filepath)
+        if signature == self._signature or signature is None:
+            # Unchanged, or mid-replace: a missing file is picked up once it is back
+            return False
+
+        # Wait until writes stop before reloading
+        while not self._stop.is_set():
+            if self._stop.wait(self.debounce):
+                return False
+            settled = stat_signature(self.filepath)
+            if settled == signature:
+                break
+            signature = settled
+        if signature is None:
+            return False
+
+        self._signature = signature
+        self.changes += 1
+        try:
+            self.on_change(self.filepath)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = e
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
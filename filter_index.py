@@ -0,0 +1,136 @@
+"""
+Bitmap indexes for combining the sidebar filters.
+
+Each filter column gets one packed bitset (one bit per row) per distinct value,
+built once per dataset load. A filter combination is then evaluated as a
+bitwise OR of the selected values within a column and a bitwise AND across
+columns, touching rows/8 bytes per bitset instead of copying DataFrames.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+
+class BitmapIndex:
+    """
+    Per-value row bitsets over selected columns of a table.
+
+    Values are matched like Series.isin: a missing value (NaN/None) in a
+    selection matches rows where the column is missing.
+    """
+
+    def __init__(self, df, columns):
+        """
+        Args:
+            df (pd.DataFrame): Table to index
+            columns (list): Columns to build bitsets for
+        """
+        self.num_rows = len(df)
+        self._num_bytes = (self.num_rows + 7) // 8
+        self._bitmaps = {}
+
+        for column in columns:
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                values = series.cat.categories
+            else:
+                codes, values = pd.factorize(series)
+
+            # Group row positions by value code in one sort, then set their bits
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(-1, len(values) + 1))
+
+            bitmaps = {}
+            for code in range(-1, len(values)):
+                rows = order[bounds[code + 1]:bounds[code + 2]]
+                if len(rows) == 0 and code >= 0:
+                    continue
+                key = None if code < 0 else values[code]
+                bitmaps[key] = self._pack(rows)
+
+            self._bitmaps[column] = bitmaps
+
+    def _pack(self, rows):
+        bits = np.zeros(self._num_bytes, dtype=np.uint8)
+        np.bitwise_or.at(bits, rows >> 3, (128 >> (rows & 7)).astype(np.uint8))
+        return bits
+
+    def appended(self, row):
+        """
+        Return a copy of the index with one more row at the end.
+
+        Only the bitsets of the new row's values are copied and extended; all
+        other bitsets are shared with this index (bitsets shorter than the
+        table have zeros for the missing rows).
+
+        Args:
+            row (dict): Column -> value of the new row
+
+        Returns:
+            BitmapIndex: Index over num_rows + 1 rows
+        """
+        index = copy.copy(self)
+        index.num_rows = self.num_rows + 1
+        index._num_bytes = (index.num_rows + 7) // 8
+        index._bitmaps = {}
+
+        position = self.num_rows
+        for column, bitmaps in self._bitmaps.items():
+            value = row.get(column)
+            key = None if pd.isna(value) else value
+
+            bits = np.zeros(index._num_bytes, dtype=np.uint8)
+            old = bitmaps.get(key)
+            if old is not None:
+                bits[:len(old)] = old
+            bits[position >> 3] |= 128 >> (position & 7)
+
+            index._bitmaps[column] = {**bitmaps, key: bits}
+
+        return index
+
+    def _column_bits(self, column, values):
+        bitmaps = self._bitmaps[column]
+        bits = np.zeros(self._num_bytes, dtype=np.uint8)
+        for value in values:
+            bitmap = bitmaps.get(None if pd.isna(value) else value)
+            if bitmap is not None:
+                # Bitsets shared from before later appends may be shorter
+                np.bitwise_or(bits[:len(bitmap)], bitmap, out=bits[:len(bitmap)])
+        return bits
+
+    def select_bits(self, selections):
+        """
+        Evaluate a filter combination to a packed bitset.
+
+        Args:
+            selections (dict): Column -> values to keep. None (or an empty
+                list) leaves that column unfiltered.
+
+        Returns:
+            np.ndarray: Packed uint8 bitset, or None if no column is filtered
+        """
+        result = None
+        for column, values in selections.items():
+            if values is None or len(values) == 0:
+                continue
+            bits = self._column_bits(column, values)
+            result = bits if result is None else np.bitwise_and(result, bits, out=result)
+        return result
+
+    def select(self, selections):
+        """
+        Evaluate a filter combination to row positions.
+
+        Args:
+            selections (dict): Column -> values to keep (see select_bits)
+
+        Returns:
+            np.ndarray: Sorted positions of matching rows
+        """
+        bits = self.select_bits(selections)
+        if bits is None:
+            return np.arange(self.num_rows)
+        return np.flatnonzero(np.unpackbits(bits, count=self.num_rows))
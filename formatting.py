@@ -0,0 +1,158 @@
+"""
+Human-readable currency formatting of single amounts and whole columns.
+
+format_currency_series gives exactly the strings of format_currency, but for
+a whole Series in a handful of array operations instead of one Python call
+per row. Rounding to one decimal is done on the exact binary value of each
+scaled amount (as str.format does), using an error-free product so that
+amounts like 1.05B round the same way in both versions.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+# (threshold, divisor, suffix), largest first
+CURRENCY_UNITS = [
+    (1_000_000_000, 1_000_000_000, 'B'),
+    (1_000_000, 1_000_000, 'M'),
+    (1_000, 1_000, 'K'),
+]
+
+# Splits a float into two halves of 26 bits (Dekker), so products by 10 are exact
+_SPLITTER = 134217729.0
+
+# Scaled amounts from here on are integers and beyond int64-safe digit math
+_EXACT_LIMIT = 2.0 ** 52
+
+# Output keys of the amounts that are not formatted from a rounded number
+_KEY_NAN = -1
+_KEY_INF = -2
+_KEY_NEGATIVE_ZERO = -3
+_SPECIAL_LABELS = {_KEY_NAN: "$0", _KEY_INF: "N/A", _KEY_NEGATIVE_ZERO: "$-0"}
+
+
+def format_currency(amount):
+    """
+    Format currency amounts to be human-readable.
+
+    Args:
+        amount (float): Amount to format
+
+    Returns:
+        str: Formatted currency string
+    """
+    # Handle NaN, None, and infinite values
+    if pd.isna(amount) or amount is None:
+        return "$0"
+    if math.isinf(amount):
+        return "N/A"
+
+    # Convert to float and handle any remaining edge cases
+    try:
+        amount = float(amount)
+    except (ValueError, TypeError):
+        return "$0"
+
+    # Handle negative values
+    if amount < 0:
+        return f"-{format_currency(abs(amount))}"
+
+    # Format based on magnitude
+    if amount >= 1_000_000_000:
+        return f"${amount / 1_000_000_000:.1f}B"
+    if amount >= 1_000_000:
+        return f"${amount / 1_000_000:.1f}M"
+    if amount >= 1_000:
+        return f"${amount / 1_000:.1f}K"
+    return f"${amount:.0f}"
+
+
+def _tenths(values):
+    """
+    Round non-negative floats to tenths like f"{value:.1f}" does.
+
+    The product by 10 is split into a rounded part and its exact error, so
+    the decision to round up or down is taken on the exact value, with ties
+    to even.
+
+    Args:
+        values (np.ndarray): Non-negative float64 values below _EXACT_LIMIT / 10
+
+    Returns:
+        np.ndarray: int64 number of tenths
+    """
+    product = values * 10.0
+    whole = np.floor(product)
+    fraction = product - whole
+    tenths = whole.astype(np.int64) + (fraction > 0.5)
+
+    # Products rounded to exactly .5 go the way of their exact error, ties to even
+    ties = np.flatnonzero(fraction == 0.5)
+    tied = values[ties]
+    split = _SPLITTER * tied
+    high = split - (split - tied)
+    error = (high * 10.0 - product[ties]) + (tied - high) * 10.0
+    tenths[ties] += (error > 0) | ((error == 0) & (tenths[ties] % 2 == 1))
+    return tenths
+
+
+def format_currency_series(amounts):
+    """
+    Format a column of amounts, with exactly the output of format_currency per value.
+
+    The rounding is decided for all rows at once; rows then share the string
+    of their (sign, unit, rounded number), so only the distinct outputs are
+    ever formatted.
+
+    Args:
+        amounts (pd.Series): Numeric amounts (missing values allowed)
+
+    Returns:
+        pd.Series: Formatted strings, with the index and name of amounts
+    """
+    values = pd.to_numeric(amounts, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    size = np.abs(values)
+    finite = np.isfinite(values)
+
+    # Scale each amount by the largest unit it reaches (unscaled below 1,000)
+    unit = np.full(len(values), len(CURRENCY_UNITS))
+    for i in range(len(CURRENCY_UNITS) - 1, -1, -1):
+        unit[size >= CURRENCY_UNITS[i][0]] = i
+    divisors = np.array([divisor for _, divisor, _ in CURRENCY_UNITS] + [1], dtype=np.float64)
+    scaled = np.where(finite, size, 0.0) / divisors[unit]
+
+    # Values too large for exact digit arithmetic are formatted one by one (never in practice)
+    exact = scaled < _EXACT_LIMIT / 10
+    scaled = np.where(exact, scaled, 0.0)
+
+    # Tenths of a unit, or whole dollars below 1,000
+    small = unit == len(CURRENCY_UNITS)
+    number = np.where(small, np.rint(scaled).astype(np.int64), _tenths(scaled))
+
+    # One key per distinct output; negative keys are the special cases
+    key = number * 16 + unit * 2 + (values < 0)
+    key[np.isnan(values)] = _KEY_NAN
+    key[np.isinf(values)] = _KEY_INF
+    key[(values == 0) & np.signbit(values)] = _KEY_NEGATIVE_ZERO
+
+    codes, keys = pd.factorize(key)
+    labels = np.array([_format_key(k) for k in keys.tolist()], dtype=object)
+    text = labels[codes]
+
+    for i in np.flatnonzero(finite & ~exact):
+        text[i] = format_currency(values[i])
+
+    return pd.Series(text, index=amounts.index, name=amounts.name, dtype=object)
+
+
+def _format_key(key):
+    if key < 0:
+        return _SPECIAL_LABELS[key]
+    number, unit = divmod(key, 16)
+    unit, negative = divmod(unit, 2)
+    sign = "-" if negative else ""
+    if unit == len(CURRENCY_UNITS):
+        return f"{sign}${number}"
+    whole, tenth = divmod(number, 10)
+    return f"{sign}${whole}.{tenth}{CURRENCY_UNITS[unit][2]}"
@@ -0,0 +1,127 @@
+"""
+Currency normalization of deal amounts.
+
+Exchange rates come from a local, versioned table (fx_rates.json): for each
+currency, the value of one unit in the base currency (USD) from an effective
+date until the next entry. A whole column of amounts is converted with one
+binary search over the effective dates per currency present, never with a
+lookup per row.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Rate table shipped with the app
+FX_RATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fx_rates.json')
+
+BASE_CURRENCY = 'USD'
+
+
+class FxTable:
+    """
+    Exchange rates to the base currency by currency and effective date.
+
+    A deal converts at the rate in effect on its funding date. Dates before the
+    first entry of a currency use that first rate, and missing dates the latest
+    one. Amounts without a currency are taken to be in the base currency, and
+    amounts in a currency the table does not know have no converted amount
+    (<NA>), so they are never counted as 0 USD.
+    """
+
+    def __init__(self, rates, version, base=BASE_CURRENCY):
+        """
+        Args:
+            rates (dict): Currency code -> list of (effective date, rate) pairs,
+                the rate being the value of one unit in the base currency
+            version (str): Version of the rate table
+            base (str): Currency amounts are converted to
+        """
+        self.version = version
+        self.base = base
+        self._dates = {}
+        self._rates = {}
+        for currency, entries in rates.items():
+            entries = sorted((pd.Timestamp(date), float(rate)) for date, rate in entries)
+            self._dates[currency.upper()] = np.array([date.to_datetime64() for date, _ in entries], dtype='datetime64[ns]')
+            self._rates[currency.upper()] = np.array([rate for _, rate in entries], dtype=np.float64)
+
+        # Identifies the rates themselves, so a table edited without a version bump is still told apart
+        canonical = json.dumps({c: [[str(d), r] for d, r in zip(self._dates[c], self._rates[c].tolist())] for c in sorted(self._dates)})
+        self.digest = hashlib.sha256(f"{version}\n{base}\n{canonical}".encode('utf-8')).hexdigest()
+
+    @classmethod
+    def from_file(cls, path=FX_RATES_FILE):
+        """
+        Load a rate table from a JSON file with 'version', 'base' and 'rates'.
+
+        Args:
+            path (str): Path to the rate table
+
+        Returns:
+            FxTable: The loaded table
+        """
+        with open(path, 'r', encoding='utf-8') as file:
+            table = json.load(file)
+        return cls(table['rates'], table['version'], table.get('base', BASE_CURRENCY))
+
+    @property
+    def currencies(self):
+        """Currencies convertible by the table, the base currency included."""
+        return [self.base] + sorted(self._dates)
+
+    def rates(self, currencies, dates):
+        """
+        Look up the rate of every deal.
+
+        Args:
+            currencies (pd.Series): Currency codes (categorical or text)
+            dates (pd.Series): Funding dates
+
+        Returns:
+            np.ndarray: float64 rates, NaN for unknown currencies
+        """
+        codes, uniques = pd.factorize(currencies)
+        dates = pd.to_datetime(dates).to_numpy(dtype='datetime64[ns]')
+        rates = np.full(len(codes), np.nan)
+
+        # Missing currencies count as the base currency
+        rates[codes < 0] = 1.0
+        for code, currency in enumerate(uniques):
+            rows = np.flatnonzero(codes == code)
+            currency = str(currency).strip().upper()
+            if currency == self.base:
+                rates[rows] = 1.0
+            elif currency in self._dates:
+                effective = self._dates[currency]
+                deal_dates = dates[rows]
+                # Latest entry on or before each date; missing dates take the latest entry
+                found = np.searchsorted(effective, deal_dates, side='right') - 1
+                found[np.isnat(deal_dates)] = len(effective) - 1
+                rates[rows] = self._rates[currency][np.clip(found, 0, len(effective) - 1)]
+
+        return rates
+
+    def convert(self, amounts, currencies, dates):
+        """
+        Convert amounts to the base currency.
+
+        Args:
+            amounts (pd.Series): Amounts in whole currency units
+            currencies (pd.Series): Currency code of each amount
+            dates (pd.Series): Funding date of each amount
+
+        Returns:
+            pd.Series: Int64 whole base currency units, <NA> where the currency
+                has no rate, with the index of amounts
+        """
+        converted = amounts.to_numpy(dtype=np.float64, na_value=np.nan) * self.rates(currencies, dates)
+        known = np.isfinite(converted)
+        values = np.where(known, np.round(converted), 0).astype(np.int64)
+        return pd.Series(pd.arrays.IntegerArray(values, ~known), index=amounts.index)
+
+
+# Rates shipped with the app, used by the enrichment pipeline
+DEFAULT_FX_TABLE = FxTable.from_file()
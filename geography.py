@@ -0,0 +1,158 @@
+"""
+Geography classification of deals based on investor names.
+
+The indicator lists are compiled once into an indicator x region weight matrix.
+Distinct investor strings are scored together in one batch, and each result is
+memoized so repeated strings cost nothing on later loads.
+"""
+import bisect
+
+import numpy as np
+import pandas as pd
+
+# Simple geography mapping based on known investor patterns
+# This is a basic implementation - in reality you'd have a comprehensive database
+NORTH_AMERICA_INDICATORS = [
+    'ventures', 'capital', 'partners', 'fund', 'investment', 'vc',
+    'sequoia', 'andreessen', 'kleiner', 'accel', 'benchmark', 'greylock',
+    'first round', 'union square', 'spark', 'foundry', 'insight',
+    'general catalyst', 'nea', 'khosla', 'draper', 'sv angel'
+]
+
+EUROPE_INDICATORS = [
+    'european', 'london', 'berlin', 'paris', 'stockholm', 'amsterdam',
+    'atomico', 'balderton', 'accel', 'index', 'northzone', 'creandum',
+    'eurazeo', 'lakestar', 'rocket', 'target global'
+]
+
+DEFAULT_REGION = "Global/Other"
+
+# Joins texts into one search buffer; indicators never contain it, so no match can straddle two texts
+_SEPARATOR = '\x00'
+
+
+class GeographyClassifier:
+    """
+    Score investor text against per-region indicator lists.
+
+    A region scores one point per indicator found as a substring of the
+    lowercased investor text. The region with the strictly highest score wins;
+    ties (including no matches) fall back to the default region.
+    """
+
+    def __init__(self, region_indicators, default=DEFAULT_REGION, max_cache_size=1_000_000):
+        """
+        Args:
+            region_indicators (list): (region, indicators) pairs
+            default (str): Region returned when no region strictly wins
+            max_cache_size (int): Distinct investor strings memoized before the cache is reset
+        """
+        self.regions = [region for region, _ in region_indicators]
+        self.default = default
+        self.max_cache_size = max_cache_size
+        self._cache = {}
+
+        # An indicator listed for several regions scores for each of them
+        self.indicators = list(dict.fromkeys(ind for _, inds in region_indicators for ind in inds))
+        self._weights = np.array(
+            [[ind in inds for _, inds in region_indicators] for ind in self.indicators],
+            dtype=np.int64
+        ).reshape(len(self.indicators), len(self.regions))
+
+    def score_texts(self, texts):
+        """
+        Classify a batch of lowercased investor strings, bypassing the cache.
+
+        All texts are joined into a single buffer and each indicator is located
+        with one forward scan over it, so the work is one C-level substring
+        search per indicator rather than one per indicator per text.
+
+        Args:
+            texts (list): Lowercased investor strings
+
+        Returns:
+            list: Region name per text
+        """
+        if not texts:
+            return []
+
+        buffer = _SEPARATOR.join(texts)
+        starts = [0]
+        for text in texts:
+            starts.append(starts[-1] + len(text) + 1)
+
+        hit_texts = []
+        hit_indicators = []
+        for j, indicator in enumerate(self.indicators):
+            pos = buffer.find(indicator)
+            while pos != -1:
+                i = bisect.bisect_right(starts, pos) - 1
+                hit_texts.append(i)
+                hit_indicators.append(j)
+                # Presence is all that counts, so skip ahead to the next text
+                pos = buffer.find(indicator, starts[i + 1])
+
+        scores = np.zeros((len(texts), len(self.regions)), dtype=np.int64)
+        np.add.at(scores, np.array(hit_texts, dtype=np.intp), self._weights[np.array(hit_indicators, dtype=np.intp)])
+
+        best = scores.max(axis=1, keepdims=True)
+        unique_winner = (scores == best).sum(axis=1) == 1
+        labels = np.array(self.regions + [self.default], dtype=object)
+
+        return labels[np.where(unique_winner, scores.argmax(axis=1), len(self.regions))].tolist()
+
+    def classify_texts(self, texts):
+        """
+        Classify lowercased investor strings, scoring only those not seen before.
+
+        Args:
+            texts (list): Lowercased investor strings
+
+        Returns:
+            list: Region name per text
+        """
+        missing = list(dict.fromkeys(text for text in texts if text not in self._cache))
+
+        if missing:
+            if len(self._cache) + len(missing) > self.max_cache_size:
+                self._cache.clear()
+            self._cache.update(zip(missing, self.score_texts(missing)))
+
+        return [self._cache[text] for text in texts]
+
+    def classify(self, lead_investors, other_investors):
+        """
+        Classify deals from their lead and other investor columns.
+
+        Only distinct (lead, other) pairs are scored; the results are then
+        broadcast back to every row.
+
+        Args:
+            lead_investors (pd.Series): 'Lead Investor(s)' column
+            other_investors (pd.Series): 'Other Investors' column
+
+        Returns:
+            pd.Series: Region per deal, aligned with lead_investors
+        """
+        lead_codes, lead_values = pd.factorize(lead_investors, use_na_sentinel=False)
+        other_codes, other_values = pd.factorize(other_investors, use_na_sentinel=False)
+
+        # Factorize the (lead, other) pairs through their combined integer codes
+        width = max(len(other_values), 1)
+        pair_codes, pairs = pd.factorize(lead_codes.astype(np.int64) * width + other_codes)
+
+        lead_text = [str(value).lower() for value in lead_values]
+        other_text = [str(value).lower() for value in other_values]
+        regions = np.array(
+            self.classify_texts([lead_text[pair // width] + ' ' + other_text[pair % width] for pair in pairs]),
+            dtype=object
+        )
+
+        return pd.Series(regions[pair_codes], index=lead_investors.index)
+
+
+# Shared classifier for the default North America / Europe rules
+DEFAULT_CLASSIFIER = GeographyClassifier([
+    ("North America", NORTH_AMERICA_INDICATORS),
+    ("Europe", EUROPE_INDICATORS),
+])
@@ -0,0 +1,308 @@
+"""
+Streaming ingestion of deal records.
+
+Reads a JSON array, a bare comma-separated sequence of objects (the original
+data.json format) or newline-delimited JSON in fixed-size chunks, decoding the
+records of each chunk straight into per-column lists. Only about one chunk of
+raw text is held at a time, instead of the whole file, its stripped/wrapped
+copy and the parsed list of dicts.
+
+Also defines the compact in-memory schema applied to loaded deals.
+
+Usage:
+    python ingest.py data.json
+"""
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Amount columns stored as int64 whole currency units
+AMOUNT_COLUMNS = ['Amount']
+
+# Converted amount columns stored as nullable Int64: <NA> where no conversion exists
+CONVERTED_AMOUNT_COLUMNS = ['Amount (USD)']
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ['Currency', 'Funding Stage', 'Climate Vertical', 'Geography', 'Deal Size Category']
+
+# Separators tolerated around top-level records: array brackets, commas and whitespace
+_SEPARATORS = re.compile(r'[\s,\[\]]*')
+_TRAILING_SEPARATORS = ' \t\r\n,]'
+
+# A '}' and a '{' separated only by whitespace/commas that include a newline.
+# JSON strings cannot contain raw newlines, so such a match is never inside a
+# string and rewriting it to '},{' never changes any value.
+_LINE_BOUNDARY = re.compile(r'\}[ \t\r,]*\n[\s,]*\{')
+
+
+def _decode_prefix(decoder, text):
+    """
+    Decode as many complete top-level records as possible from the start of text.
+
+    Args:
+        decoder (json.JSONDecoder): Decoder to use
+        text (str): Raw text starting at a record or separator
+
+    Returns:
+        tuple: (records, position where decoding stopped)
+    """
+    records = []
+    pos = _SEPARATORS.match(text).end()
+
+    while pos < len(text):
+        try:
+            record, end = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        records.append(record)
+        pos = _SEPARATORS.match(text, end).end()
+
+    return records, pos
+
+
+def iter_record_batches(filepath, chunk_size=1 << 20):
+    """
+    Yield lists of records from a deals file, one chunk's worth at a time.
+
+    Each chunk is cut after its last line break between two records and the
+    whole records before the cut are decoded with a single json.loads call.
+    Input without such line breaks (e.g. a minified array) falls back to
+    decoding record by record.
+
+    Args:
+        filepath (str): Path to a JSON array, comma-separated objects or NDJSON file
+        chunk_size (int): Characters read from the file per chunk
+
+    Yields:
+        list: Deal records (dicts) decoded from the next chunk
+    """
+    decoder = json.JSONDecoder()
+
+    with open(filepath, 'r', encoding='utf-8') as file:
+        buffer = ''
+
+        while True:
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+
+            # Cut after the last line boundary between two records
+            last = None
+            if not eof:
+                for last in _LINE_BOUNDARY.finditer(buffer):
+                    pass
+
+            if last is not None:
+                piece, rest = buffer[:last.start() + 1], buffer[last.start() + 1:]
+            else:
+                piece, rest = buffer, ''
+
+            records = None
+            if last is not None or eof:
+                # Fast path: the piece holds whole records, decode them in one call
+                body = piece[_SEPARATORS.match(piece).end():].rstrip(_TRAILING_SEPARATORS)
+                try:
+                    records = json.loads('[' + _LINE_BOUNDARY.sub('},{', body) + ']') if body else []
+                except json.JSONDecodeError:
+                    records = None
+
+            if records is None:
+                # Slow path: decode record by record and carry the incomplete tail over
+                records, pos = _decode_prefix(decoder, piece)
+                rest = piece[pos:] + rest
+                if eof and rest.strip(_TRAILING_SEPARATORS):
+                    # Raise the decode error for whatever could not be parsed
+                    decoder.raw_decode(rest, _SEPARATORS.match(rest).end())
+
+            for record in records:
+                if not isinstance(record, dict):
+                    raise ValueError(f"Expected a JSON object per record, got {type(record).__name__}")
+
+            if records:
+                yield records
+
+            if eof:
+                return
+            buffer = rest
+
+
+def read_deals(filepath, chunk_size=1 << 20, stats=None, trace_memory=False):
+    """
+    Stream a deals file into a DataFrame built from per-column arrays.
+
+    Produces the same DataFrame as pd.DataFrame(json.loads(...)) on the whole
+    file: columns in first-seen order, NaN where a record lacks a key.
+
+    Args:
+        filepath (str): Path to the deals file
+        chunk_size (int): Characters read from the file per chunk
+        stats (dict): If provided, filled with 'rows', 'bytes', 'seconds',
+            'rows_per_sec' and (with trace_memory) 'peak_memory_bytes'
+        trace_memory (bool): Measure peak Python memory with tracemalloc (slower)
+
+    Returns:
+        pd.DataFrame: One row per record
+    """
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    columns = {}
+    rows = 0
+
+    try:
+        # Transpose each chunk's records into the column lists
+        for batch in iter_record_batches(filepath, chunk_size):
+            for record in batch:
+                if record.keys() != columns.keys():
+                    for key in record:
+                        if key not in columns:
+                            # Column first seen in this batch - earlier rows are missing it
+                            columns[key] = [np.nan] * rows
+
+            for key, column in columns.items():
+                column.extend([record.get(key, np.nan) for record in batch])
+            rows += len(batch)
+
+        df = pd.DataFrame(columns, index=pd.RangeIndex(rows))
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    if stats is not None:
+        seconds = time.perf_counter() - start
+        stats.update({
+            'rows': rows,
+            'bytes': os.path.getsize(filepath),
+            'seconds': seconds,
+            'rows_per_sec': rows / seconds if seconds > 0 else float('inf'),
+        })
+        if trace_memory:
+            stats['peak_memory_bytes'] = peak
+
+    return df
+
+
+def apply_deal_schema(df):
+    """
+    Enforce the compact deals schema, in place, on the columns present in df.
+
+    - 'Funding Date' as datetime64
+    - AMOUNT_COLUMNS as int64 whole currency units (invalid, NaN and infinite amounts become 0)
+    - CONVERTED_AMOUNT_COLUMNS as Int64 whole currency units (missing and
+      invalid amounts stay <NA>: a deal that could not be converted is not 0 USD)
+    - CATEGORICAL_COLUMNS as pandas categoricals, so equality and isin filters
+      compare integer codes rather than strings
+
+    Applying the schema again (e.g. after enrichment adds columns) is cheap.
+
+    Args:
+        df (pd.DataFrame): Deals DataFrame
+
+    Returns:
+        pd.DataFrame: The same DataFrame
+    """
+    # Convert 'Funding Date' column to datetime objects
+    df['Funding Date'] = pd.to_datetime(df['Funding Date'])
+
+    # Clean amount columns - replace infinite and NaN values with 0
+    for column in AMOUNT_COLUMNS:
+        if column in df.columns and df[column].dtype != np.int64:
+            amount = pd.to_numeric(df[column], errors='coerce')
+            amount = amount.replace([np.inf, -np.inf], 0).fillna(0)
+            df[column] = amount.round().astype(np.int64)
+
+    for column in CONVERTED_AMOUNT_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.Int64Dtype):
+            amount = pd.to_numeric(df[column], errors='coerce').astype(np.float64)
+            df[column] = amount.where(np.isfinite(amount)).round().astype('Int64')
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+
+    return df
+
+
+def append_deals(df, rows):
+    """
+    Append rows to a deals table that has the compact schema.
+
+    Categorical columns are combined with union_categoricals, with sorted
+    categories as astype('category') gives on the whole table, and the other
+    columns keep the table's dtypes.
+
+    Args:
+        df (pd.DataFrame): Deals table with the compact schema and a RangeIndex
+        rows (pd.DataFrame): New rows, with apply_deal_schema already applied
+
+    Returns:
+        pd.DataFrame: New table with the rows at the end
+    """
+    index = pd.RangeIndex(len(df) + len(rows))
+    columns = {}
+
+    # Combine column by column, so no column is converted to a wider dtype and back
+    for column in df.columns.append(rows.columns.difference(df.columns, sort=False)):
+        if column not in rows.columns:
+            tail = pd.Series(np.nan, index=rows.index).astype(df[column].dtype)
+        elif column not in df.columns:
+            columns[column] = pd.concat([pd.Series(np.nan, index=df.index), rows[column]], ignore_index=True)
+            continue
+        else:
+            tail = rows[column]
+
+        head = df[column]
+        if isinstance(head.dtype, pd.CategoricalDtype):
+            tail = tail.astype('category')
+            if len(tail.cat.categories) == 0:
+                # All missing: the empty categories must have the table's dtype to be combined
+                tail = tail.astype(pd.CategoricalDtype(head.cat.categories[:0]))
+            columns[column] = pd.Series(pd.api.types.union_categoricals([head, tail], sort_categories=True), index=index)
+        else:
+            columns[column] = pd.concat([head, tail.astype(head.dtype)], ignore_index=True)
+
+    return pd.DataFrame(columns, index=index)
+
+
+def memory_report(before, after):
+    """
+    Compare the deep memory footprint of two versions of a table.
+
+    Args:
+        before (pd.DataFrame): Original table
+        after (pd.DataFrame): Same rows in a different representation
+
+    Returns:
+        pd.DataFrame: Bytes per row for each column and in total
+    """
+    report = pd.DataFrame({
+        'before': before.memory_usage(index=False, deep=True) / max(len(before), 1),
+        'after': after.memory_usage(index=False, deep=True) / max(len(after), 1),
+    })
+    report.loc['Total'] = report.sum()
+    return report
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python ingest.py <deals file>")
+
+    load_stats = {}
+    deals = read_deals(sys.argv[1], stats=load_stats, trace_memory=True)
+    print(f"{load_stats['rows']:,} rows from {load_stats['bytes'] / 1e6:.1f} MB "
+          f"in {load_stats['seconds']:.2f}s ({load_stats['rows_per_sec']:,.0f} rows/sec), "
+          f"peak memory {load_stats['peak_memory_bytes'] / 1e6:.1f} MB")
+
+    print("\nBytes per row, as parsed (before) and with the compact schema (after):")
+    print(memory_report(deals, apply_deal_schema(deals.copy())).round(1).to_string())
@@ -0,0 +1,393 @@
+"""
+Investor name resolution: one canonical investor for every spelling of a name.
+
+Raw names from the investor columns are reduced to a normalized key (case,
+accents, punctuation, parenthetical qualifiers, legal suffixes and trailing
+division words such as "Asset Management" removed). Names with the same key
+are the same investor, and so are names whose keys differ by a one-character
+typo in one long word. Words such as "Capital" and "Ventures" are kept:
+"Breakthrough Energy" and "Breakthrough Energy Ventures" are different
+investors, so "Foo Capital" and "Foo" are not merged either.
+
+Names are resolved in order of first appearance: each new name joins the
+earliest investor it matches, or starts a new one whose canonical name is
+that spelling. Typo candidates are found by blocking on one-character
+deletions of the key, so resolving n names costs about n hash lookups rather
+than n^2 comparisons, and resolving names one deal at a time gives the same
+investors as resolving them all at once.
+"""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Trailing words that do not tell investors apart ("Capital", "Ventures" and the
+# other INVESTOR_WORDS do, and are not stripped)
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'lp', 'llp', 'plc', 'gmbh', 'ag', 'sa', 'sas', 'sarl',
+    'bv', 'nv', 'spa', 'srl', 'pte', 'pty', 'co', 'corp', 'corporation', 'company',
+}
+DIVISION_WORDS = {
+    'asset', 'assets', 'management', 'investment', 'investments', 'advisors', 'advisers', 'advisory',
+    'group', 'holding', 'holdings',
+}
+
+# Words marking a complete investor name, for splitting "A and B" into two investors
+INVESTOR_WORDS = LEGAL_SUFFIXES | DIVISION_WORDS | {
+    'capital', 'ventures', 'venture', 'partners', 'fund', 'funds', 'vc', 'equity', 'invest', 'foundation',
+}
+
+# Shortest word in which a one-character difference counts as a typo
+MIN_TYPO_LENGTH = 6
+
+# Placeholders that are not investors
+NOT_INVESTORS = ['', 'Not specified', 'nan']
+
+_PARENTHETICAL = re.compile(r'\([^)]*\)')
+_NON_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+
+def _tokens(name):
+    if not name.isascii():
+        name = ''.join(char for char in unicodedata.normalize('NFKD', name) if not unicodedata.combining(char))
+    text = name.lower()
+    text = _PARENTHETICAL.sub(' ', text).replace('&', ' and ')
+    return _NON_ALPHANUMERIC.sub(' ', text).split()
+
+
+def normalize_investor_name(name):
+    """
+    Reduce an investor name to the key compared during resolution.
+
+    Args:
+        name (str): Raw investor name
+
+    Returns:
+        str: Lowercase words without accents, punctuation, parenthetical
+            qualifiers, a leading "the" or trailing legal and division words
+    """
+    tokens = _tokens(name)
+    if len(tokens) > 1 and tokens[0] == 'the':
+        tokens = tokens[1:]
+    while len(tokens) > 1 and (tokens[-1] in LEGAL_SUFFIXES or tokens[-1] in DIVISION_WORDS):
+        tokens.pop()
+    return ' '.join(tokens) or name.strip().lower()
+
+
+def split_and(name):
+    """
+    Split "A and B" into two investors when both sides look like investor names.
+
+    Names such as "Bill and Melinda Gates Foundation" are kept whole: every
+    side must contain a word like "Capital", "Ventures" or a legal suffix.
+
+    Args:
+        name (str): One entry of an investor list
+
+    Returns:
+        list: The investors named by the entry
+    """
+    parts = [part.strip() for part in name.split(' and ')]
+    if all(INVESTOR_WORDS.intersection(_tokens(part)) for part in parts):
+        return parts
+    return [name]
+
+
+def _one_edit(a, b):
+    # True if a and b differ by one insertion, deletion, substitution or adjacent transposition
+    if abs(len(a) - len(b)) > 1 or a == b:
+        return False
+    start = 0
+    while start < min(len(a), len(b)) and a[start] == b[start]:
+        start += 1
+    if len(a) == len(b):
+        rest = start + 1
+        return a[rest:] == b[rest:] or (a[start + 2:] == b[start + 2:] and a[start:start + 2] == b[start:start + 2][::-1])
+    if len(a) < len(b):
+        a, b = b, a
+    return a[start + 1:] == b[start:]
+
+
+def typo_match(key_a, key_b):
+    """
+    Whether two normalized keys differ by a one-character typo in one long word.
+
+    Args:
+        key_a (str): Key from normalize_investor_name
+        key_b (str): Key from normalize_investor_name
+
+    Returns:
+        bool: True if the keys have the same words but one, and those two
+            words are alphabetic, at least MIN_TYPO_LENGTH long and one edit apart
+    """
+    tokens_a, tokens_b = key_a.split(' '), key_b.split(' ')
+    if len(tokens_a) != len(tokens_b):
+        return False
+    different = [(a, b) for a, b in zip(tokens_a, tokens_b) if a != b]
+    if len(different) != 1:
+        return False
+    a, b = different[0]
+    return min(len(a), len(b)) >= MIN_TYPO_LENGTH and a.isalpha() and b.isalpha() and _one_edit(a, b)
+
+
+def _deletions(key):
+    # Blocking keys: the key with one character of one long word deleted
+    tokens = key.split(' ')
+    variants = set()
+    for i, token in enumerate(tokens):
+        if len(token) >= MIN_TYPO_LENGTH and token.isalpha():
+            for j in range(len(token)):
+                variants.add(' '.join(tokens[:i] + [token[:j] + token[j + 1:]] + tokens[i + 1:]))
+    return variants
+
+
+class InvestorAliases:
+    """
+    Alias -> canonical investor table, grown by resolving new names.
+
+    Investor ids number the canonical investors in order of first appearance.
+    An alias never changes investor once resolved, so a copy that resolves
+    more names agrees with the original on every name both know (see
+    query_engine.append_deal, which copies the table before adding).
+    """
+
+    # Blocking entries kept in the overlay before it is merged into the sorted arrays
+    OVERLAY_LIMIT = 50_000
+
+    def __init__(self, aliases=(), canonical=()):
+        """
+        Args:
+            aliases (list): Resolved names, in order of first appearance
+            canonical (list): Canonical name of each alias (see to_frame)
+        """
+        codes, names = pd.factorize(pd.Series(list(canonical), dtype=object))
+        self._names = names.tolist()
+        self._ids = dict(zip(aliases, codes.tolist()))
+
+        # Spellings of each investor, in order of first appearance
+        self._aliases = [[] for _ in self._names]
+        for alias, investor_id in self._ids.items():
+            self._aliases[investor_id].append(alias)
+
+        # Blocking index, built on the first resolution of an unknown name
+        self._keys = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def _build_index(self):
+        # Keys in order of first appearance with their investor, and the blocking entries
+        self._keys = []
+        self._key_index = {}
+        self._key_ids = []
+        for alias, investor_id in self._ids.items():
+            key = normalize_investor_name(alias)
+            if key not in self._key_index:
+                self._key_index[key] = len(self._keys)
+                self._keys.append(key)
+                self._key_ids.append(investor_id)
+
+        # Sorted (hash, key index, is deletion) entries, plus an overlay of recent entries by hash
+        self._hashes = np.array([], dtype=np.int64)
+        self._owners = np.array([], dtype=np.int64)
+        self._kinds = np.array([], dtype=bool)
+        self._extra = {}
+        self._merge(*self._entries(range(len(self._keys))))
+
+    def _entries(self, key_indexes):
+        hashes, owners, kinds = [], [], []
+        for index in key_indexes:
+            key = self._keys[index]
+            for variant, kind in [(key, False)] + [(variant, True) for variant in _deletions(key)]:
+                hashes.append(hash(variant))
+                owners.append(index)
+                kinds.append(kind)
+        return np.array(hashes, dtype=np.int64), np.array(owners, dtype=np.int64), np.array(kinds, dtype=bool)
+
+    def _merge(self, hashes, owners, kinds):
+        # Few entries go to the overlay; many are merged into new sorted arrays
+        if len(hashes) + sum(map(len, self._extra.values())) <= self.OVERLAY_LIMIT and len(self._hashes):
+            for entry in zip(hashes.tolist(), owners.tolist(), kinds.tolist()):
+                self._extra.setdefault(entry[0], []).append(entry[1:])
+            return
+        for hash_value, entries in self._extra.items():
+            hashes = np.append(hashes, [hash_value] * len(entries))
+            owners = np.append(owners, [owner for owner, _ in entries])
+            kinds = np.append(kinds, [kind for _, kind in entries])
+        hashes = np.concatenate([self._hashes, hashes])
+        order = np.argsort(hashes, kind='stable')
+        self._hashes = hashes[order]
+        self._owners = np.concatenate([self._owners, owners])[order]
+        self._kinds = np.concatenate([self._kinds, kinds])[order]
+        self._extra = {}
+
+    def _candidates(self, hashes, owners, kinds):
+        # (new key index, earlier key index) pairs sharing a blocking entry, not both plain keys
+        pairs = set()
+
+        # Against keys already indexed
+        starts = np.searchsorted(self._hashes, hashes, side='left')
+        ends = np.searchsorted(self._hashes, hashes, side='right')
+        for i in np.flatnonzero(ends > starts).tolist():
+            for j in range(starts[i], ends[i]):
+                if kinds[i] or self._kinds[j]:
+                    pairs.add((int(owners[i]), int(self._owners[j])))
+        for i, hash_value in enumerate(hashes.tolist()):
+            for owner, kind in self._extra.get(hash_value, ()):
+                if kinds[i] or kind:
+                    pairs.add((int(owners[i]), owner))
+
+        # Among the new keys, each paired with the earlier one
+        order = np.argsort(hashes, kind='stable')
+        sorted_hashes = hashes[order]
+        bounds = np.flatnonzero(np.r_[True, sorted_hashes[1:] != sorted_hashes[:-1], True])
+        shared = np.diff(bounds) > 1
+        for start, end in zip(bounds[:-1][shared].tolist(), bounds[1:][shared].tolist()):
+            for a in order[start:end].tolist():
+                for b in order[start:end].tolist():
+                    if owners[b] < owners[a] and (kinds[a] or kinds[b]):
+                        pairs.add((int(owners[a]), int(owners[b])))
+
+        return pairs
+
+    def add(self, names):
+        """
+        Resolve names not in the table yet, in order.
+
+        Args:
+            names (list): Raw investor names, in order of first appearance
+
+        Returns:
+            list: The names that were added
+        """
+        new_names = [name for name in dict.fromkeys(names) if name not in self._ids]
+        if not new_names:
+            return []
+        if self._keys is None:
+            self._build_index()
+
+        # New keys get key indexes after the known ones
+        first_new = len(self._keys)
+        name_keys = []
+        for name in new_names:
+            key = normalize_investor_name(name)
+            if key not in self._key_index:
+                self._key_index[key] = len(self._keys)
+                self._keys.append(key)
+            name_keys.append(self._key_index[key])
+
+        hashes, owners, kinds = self._entries(range(first_new, len(self._keys)))
+        earlier = {}
+        for new, old in self._candidates(hashes, owners, kinds):
+            if typo_match(self._keys[new], self._keys[old]):
+                earlier.setdefault(new, []).append(old)
+
+        # Each new key joins the earliest investor among its matches, or starts a new one
+        self._key_ids.extend([None] * (len(self._keys) - first_new))
+        names_by_key = {}
+        for name, key_index in zip(new_names, name_keys):
+            names_by_key.setdefault(key_index, name)
+        for key_index in range(first_new, len(self._keys)):
+            matches = [self._key_ids[old] for old in earlier.get(key_index, ())]
+            if matches:
+                self._key_ids[key_index] = min(matches)
+            else:
+                self._key_ids[key_index] = len(self._names)
+                self._aliases.append([])
+                self._names.append(names_by_key[key_index])
+
+        # Alias lists first, so a name is listed by aliases_of as soon as it resolves
+        for name, key_index in zip(new_names, name_keys):
+            self._aliases[self._key_ids[key_index]].append(name)
+            self._ids[name] = self._key_ids[key_index]
+
+        self._merge(hashes, owners, kinds)
+        return new_names
+
+    def copy(self):
+        """
+        Returns:
+            InvestorAliases: Table with the same resolutions, which add() can
+                grow without changing this one
+        """
+        other = InvestorAliases.__new__(InvestorAliases)
+        other._names = list(self._names)
+        other._ids = dict(self._ids)
+        other._aliases = [list(aliases) for aliases in self._aliases]
+        other._keys = None if self._keys is None else list(self._keys)
+        if self._keys is not None:
+            other._key_index = dict(self._key_index)
+            other._key_ids = list(self._key_ids)
+            # _merge replaces the sorted arrays instead of modifying them, so they can be shared
+            other._hashes, other._owners, other._kinds = self._hashes, self._owners, self._kinds
+            other._extra = {hash_value: list(entries) for hash_value, entries in self._extra.items()}
+        return other
+
+    def canonical(self, name):
+        """
+        Args:
+            name (str): Resolved raw name
+
+        Returns:
+            str: Canonical name of its investor
+        """
+        return self._names[self._ids[name]]
+
+    def aliases_of(self, canonical_name):
+        """
+        Args:
+            canonical_name (str): Canonical investor name
+
+        Returns:
+            list: Every spelling resolved to the investor, in order of first appearance
+        """
+        investor_id = self._ids.get(canonical_name)
+        if investor_id is None or self._names[investor_id] != canonical_name:
+            return []
+        return list(self._aliases[investor_id])
+
+    def canonicalize(self, participation):
+        """
+        Replace raw names in a participation index by canonical names.
+
+        Args:
+            participation (pd.DataFrame): Index from enrichment.split_participation,
+                every name already added
+
+        Returns:
+            pd.DataFrame: Same rows with canonical 'Investor' names; an investor
+                listed twice in a deal under different spellings is kept once,
+                with its first (lead first) role
+        """
+        codes, uniques = pd.factorize(participation['Investor'])
+        names = np.array([self._names[self._ids[name]] for name in uniques], dtype=object)
+        participation = participation.assign(Investor=names[codes])
+        return participation.drop_duplicates(['Deal ID', 'Investor']).reset_index(drop=True)
+
+    def to_frame(self):
+        """
+        Returns:
+            pd.DataFrame: 'Alias', 'Investor ID' and 'Investor' (canonical name)
+                per resolved name, in order of first appearance
+        """
+        ids = np.fromiter(self._ids.values(), dtype=np.int64, count=len(self._ids))
+        return pd.DataFrame({
+            'Alias': pd.Series(list(self._ids), dtype=object),
+            'Investor ID': ids,
+            'Investor': pd.Series(np.array(self._names, dtype=object)[ids] if len(ids) else [], dtype=object),
+        })
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Args:
+            frame (pd.DataFrame): Table from to_frame
+
+        Returns:
+            InvestorAliases: The same resolutions
+        """
+        return cls(frame['Alias'].tolist(), frame['Investor'].tolist())
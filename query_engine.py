@@ -0,0 +1,1330 @@
+"""
+Headless query engine for the investor database.
+
+Loads a deals file (JSON, cached in memory per file fingerprint) or a SQLite
+database built by sqlite_store, and answers the queries the app makes:
+filtered investor summaries, investor deals and profiles, co-investors,
+similar investors, funding trends and company search. Nothing here imports
+Streamlit, so batch jobs and workers can use it directly:
+
+    from query_engine import open_deal_store
+
+    store = open_deal_store('data.json')
+    summary = store.investor_summary(filters={'Geography': ['Europe']})
+"""
+import argparse
+import functools
+import hashlib
+import inspect
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from coinvest import CoInvestmentGraph
+from deal_store import append_deal_to_file, deal_key, validate_deal
+from enrichment import build_participation_index, enrich_deals, split_participation
+from file_watcher import FileWatcher
+from filter_index import BitmapIndex
+from fx import DEFAULT_FX_TABLE
+from geography import DEFAULT_CLASSIFIER
+from ingest import append_deals, apply_deal_schema, read_deals
+from investor_names import InvestorAliases
+from search_index import CompanySearchIndex
+from similarity import PROFILE_COLUMNS, InvestorProfiles
+from sqlite_store import SQLiteDealStore
+from table_cache import (
+    publish_generation, publish_lock, purge_stale_tables, read_generation, read_table, table_cache_path, write_table
+)
+from trends import TREND_DIMENSIONS, FundingCube
+
+
+def load_data(filepath):
+    """
+    Load data from a JSON file and return as a pandas DataFrame.
+
+    The file may be a JSON array, a comma-separated sequence of objects or
+    newline-delimited JSON. It is parsed incrementally (see ingest.read_deals).
+
+    Args:
+        filepath (str): Path to the JSON file
+
+    Returns:
+        pd.DataFrame: DataFrame in the compact deals schema (see ingest.apply_deal_schema)
+
+    Raises:
+        Exception: Whatever reading or parsing the file raised (see load_dataset)
+    """
+    # Stream the records straight into columns
+    df = read_deals(filepath)
+
+    # Enforce the compact schema: datetime dates, int64 amounts, categorical labels
+    return apply_deal_schema(df)
+
+
+def create_investor_summary(df, lead_only=False, participation=None):
+    """
+    Create an investor-centric summary DataFrame from deals data.
+
+    Args:
+        df (pd.DataFrame): Original deals DataFrame
+        lead_only (bool): If True, only include lead investors
+        participation (pd.DataFrame): Participation index from
+            build_participation_index, built from df when not provided. An index
+            built on the full dataset can be reused for any filtered subset.
+
+    Returns:
+        pd.DataFrame: Investor summary with metrics
+    """
+    columns = ['Investor Name', 'Deals Done', 'Lead Deals', 'Total Invested', 'Preferred Verticals', 'Preferred Stages']
+
+    if participation is None:
+        participation = build_participation_index(df)
+
+    # Restrict the index to the deals present in df (and to lead roles if requested)
+    positions = df.index.get_indexer(participation['Deal ID'])
+    keep = positions >= 0
+    if lead_only:
+        keep &= (participation['Role'] == 'Lead').to_numpy()
+
+    positions = positions[keep]
+    if len(positions) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Safely add USD amounts: missing (no exchange rate), NaN and infinite values add nothing
+    amounts = df['Amount (USD)']
+    amounts = amounts.to_numpy(dtype=np.int64, na_value=0) if isinstance(amounts.dtype, pd.Int64Dtype) else amounts.to_numpy()
+    amounts = amounts[positions]
+    if amounts.dtype.kind == 'f':
+        amounts = np.where(np.isfinite(amounts), amounts, 0)
+
+    deals = pd.DataFrame({
+        'Investor': participation['Investor'].to_numpy()[keep],
+        'Position': positions,
+        'Lead': (participation['Role'] == 'Lead').to_numpy()[keep],
+        'Amount': amounts,
+        'Climate Vertical': df['Climate Vertical'].to_numpy()[positions],
+        'Funding Stage': df['Funding Stage'].to_numpy()[positions]
+    })
+
+    # Calculate metrics for each investor in a single grouped pass
+    grouped = deals.groupby('Investor', sort=False)
+    investor_df = pd.DataFrame({
+        'Deals Done': grouped.size(),
+        'Lead Deals': grouped['Lead'].sum(),
+        'Total Invested': grouped['Amount'].sum()
+    })
+
+    def preferred(column):
+        # Top 3 values by count, ties broken by first appearance (same as value_counts)
+        counts = deals.groupby(['Investor', column], sort=False)['Position'].agg(['size', 'min']).reset_index()
+        counts = counts.sort_values(['size', 'min'], ascending=[False, True], kind='stable')
+        top = counts.groupby('Investor', sort=False).head(3)
+        return top.groupby('Investor', sort=False)[column].agg(', '.join)
+
+    # Calculate preferred verticals and stages (top 2-3)
+    investor_df['Preferred Verticals'] = preferred('Climate Vertical').reindex(investor_df.index).fillna('')
+    investor_df['Preferred Stages'] = preferred('Funding Stage').reindex(investor_df.index).fillna('')
+
+    # Sort by total invested
+    investor_df = investor_df.rename_axis('Investor Name').reset_index()[columns]
+    investor_df = investor_df.sort_values('Total Invested', ascending=False, kind='stable').reset_index(drop=True)
+
+    return investor_df
+
+
+def build_investor_lookup(df, participation):
+    """
+    Build an investor -> deals lookup from the participation index.
+
+    Args:
+        df (pd.DataFrame): Deals DataFrame the participation index was built on
+        participation (pd.DataFrame): Participation index from build_participation_index
+
+    Returns:
+        dict: Investor name -> (row positions in df, roles), in deal order
+    """
+    positions = df.index.get_indexer(participation['Deal ID'])
+    roles = participation['Role'].to_numpy()
+
+    return {
+        investor: (positions[rows], roles[rows])
+        for investor, rows in participation.groupby('Investor', sort=False).indices.items()
+    }
+
+
+def update_investor_summary(investor_summary, df, investor_lookup, investor_order, investors):
+    """
+    Recompute the summary rows of some investors from their own deals.
+
+    Only the given investors' deals are aggregated; the other rows are kept.
+    The result is ordered like create_investor_summary on the whole table:
+    by total invested, ties in order of first appearance.
+
+    Args:
+        investor_summary (pd.DataFrame): Summary of all deals (create_investor_summary)
+        df (pd.DataFrame): Deals DataFrame
+        investor_lookup (dict): Lookup from build_investor_lookup for df
+        investor_order (dict): Investor -> rank of first appearance in df
+        investors (list): Investors whose deals changed
+
+    Returns:
+        pd.DataFrame: Updated investor summary
+    """
+    positions = [investor_lookup[name][0] for name in investors]
+    participation = pd.DataFrame({
+        'Deal ID': df.index[np.concatenate(positions)],
+        'Investor': np.repeat(np.array(investors, dtype=object), [len(p) for p in positions]),
+        'Role': np.concatenate([investor_lookup[name][1] for name in investors])
+    })
+    rows = create_investor_summary(df.iloc[np.unique(np.concatenate(positions))], participation=participation)
+
+    summary = pd.concat([investor_summary[~investor_summary['Investor Name'].isin(investors)], rows], ignore_index=True)
+    rank = np.array([investor_order[name] for name in summary['Investor Name'].tolist()])
+    order = np.lexsort((rank, -summary['Total Invested'].to_numpy()))
+
+    return summary.iloc[order].reset_index(drop=True)
+
+
+def get_investor_deals(df, investor_name, investor_lookup=None):
+    """
+    Get all deals for a specific investor.
+
+    Args:
+        df (pd.DataFrame): Original deals DataFrame
+        investor_name (str): Name of the investor
+        investor_lookup (dict): Lookup from build_investor_lookup for this df,
+            built on the fly when not provided
+
+    Returns:
+        pd.DataFrame: All deals this investor participated in
+    """
+    if investor_lookup is None:
+        investor_lookup = build_investor_lookup(df, build_participation_index(df))
+
+    if investor_name not in investor_lookup:
+        return pd.DataFrame()
+
+    # Gather the investor's rows directly and add role information
+    positions, roles = investor_lookup[investor_name]
+    investor_deals = df.iloc[positions].reset_index(drop=True)
+    investor_deals['Role'] = roles
+
+    return investor_deals
+
+
+def file_fingerprint(filepath):
+    """
+    Fingerprint a data file by path, modification time, size and content hash.
+
+    Args:
+        filepath (str): Path to the data file
+
+    Returns:
+        tuple: (absolute path, mtime in ns, size in bytes, SHA-256 hex digest)
+    """
+    path = os.path.abspath(filepath)
+    stat = os.stat(path)
+
+    # Hash the file in chunks so large files are never held in memory twice
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+
+    return (path, stat.st_mtime_ns, stat.st_size, digest.hexdigest())
+
+
+# Deal columns filtered from the sidebar, indexed with per-value bitsets
+FILTER_COLUMNS = ['Geography', 'Deal Size Category', 'Climate Vertical', 'Funding Stage']
+
+
+class Dataset:
+    """
+    Enriched deals data loaded from one data file, with its derived indexes.
+
+    Attributes:
+        df (pd.DataFrame): Deals with 'Geography' and 'Deal Size Category' added
+        participation (pd.DataFrame): Deal -> investor participation index
+        investor_lookup (dict): Investor -> (row positions, roles) in df
+        filter_index (BitmapIndex): Per-value row bitsets for the sidebar filter columns
+        company_index (CompanySearchIndex): Trigram index over company names
+        investor_summary (pd.DataFrame): Summary of all deals and roles (create_investor_summary)
+        investor_order (dict): Investor -> rank of first appearance, for summary tie-breaks
+        fingerprint (tuple): Fingerprint of the source file (see file_fingerprint)
+        coinvestment (CoInvestmentGraph): Co-investment graph of the investors
+        profiles (InvestorProfiles): Investor vectors for similarity queries
+        trends (FundingCube): Monthly funding rollup for the Trends tab
+        aliases (InvestorAliases): Raw investor name -> canonical investor resolutions
+        error (str): Why the file failed to load, or None
+        generation (int): Generation of the file content the dataset was
+            published as (see DatasetCache), 0 if not published
+    """
+
+    def __init__(self, df, participation, investor_lookup, filter_index, company_index,
+                 investor_summary=None, investor_order=None, fingerprint=None, coinvestment=None, profiles=None,
+                 trends=None, aliases=None, error=None):
+        self.df = df
+        self.participation = participation
+        self.investor_lookup = investor_lookup
+        self.filter_index = filter_index
+        self.company_index = company_index
+        self.investor_summary = investor_summary
+        self.investor_order = investor_order if investor_order is not None else {}
+        self.fingerprint = fingerprint
+        self.coinvestment = coinvestment
+        self.profiles = profiles
+        self.trends = trends
+        self.aliases = aliases
+        self.error = error
+        self.generation = 0
+        self._deal_keys = None
+
+    def deal_keys(self):
+        """
+        Deduplication keys (deal_store.deal_key) of the deals, built on first use.
+
+        Returns:
+            set: Keys of every deal in df
+        """
+        if self._deal_keys is None:
+            dates = self.df['Funding Date'].dt.strftime('%Y-%m-%d')
+            self._deal_keys = {
+                deal_key(company, date, amount)
+                for company, date, amount in zip(self.df['Company Name'], dates, self.df['Amount'])
+            }
+        return self._deal_keys
+
+
+def enrichment_version():
+    """
+    Version of the load and enrichment code, derived from its source.
+
+    Any edit to the loader, the enrichment steps, the geography rules or the
+    FX rate table changes the version and so invalidates cached enriched tables.
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    sources = [
+        inspect.getsource(load_data),
+        inspect.getsource(inspect.getmodule(enrich_deals)),
+        inspect.getsource(inspect.getmodule(DEFAULT_CLASSIFIER.__class__)),
+        inspect.getsource(inspect.getmodule(read_deals)),
+        inspect.getsource(inspect.getmodule(DEFAULT_FX_TABLE.__class__)),
+        DEFAULT_FX_TABLE.digest,
+        pd.__version__
+    ]
+    return hashlib.sha256('\n'.join(sources).encode('utf-8')).hexdigest()
+
+
+def resolution_version():
+    """
+    Version of the investor name splitting and resolution code, derived from its source.
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    sources = [
+        inspect.getsource(split_participation),
+        inspect.getsource(inspect.getmodule(InvestorAliases)),
+        pd.__version__
+    ]
+    return hashlib.sha256('\n'.join(sources).encode('utf-8')).hexdigest()
+
+
+def participation_version():
+    """
+    Version of the code the participation index is built with: loading,
+    enrichment, name splitting and resolution.
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    return hashlib.sha256((enrichment_version() + resolution_version()).encode('utf-8')).hexdigest()
+
+
+def _aliases_cache_path(filepath, fingerprint):
+    return table_cache_path(filepath + '.aliases', fingerprint[3], resolution_version())
+
+
+def resolve_investor_names(filepath, participation, fingerprint=None):
+    """
+    Resolve the raw investor names of a data file to canonical investors.
+
+    When the file's fingerprint is known, the alias table is read from (or
+    written to) the columnar cache next to the file, so resolution only runs
+    on the first load of a given file content and code version.
+
+    Args:
+        filepath (str): Path to the JSON file
+        participation (pd.DataFrame): Raw participation index (see enrichment.split_participation)
+        fingerprint (tuple): Fingerprint of the file
+
+    Returns:
+        InvestorAliases: Resolutions of every name in participation
+    """
+    cache_path = None
+    if fingerprint is not None:
+        cache_path = _aliases_cache_path(filepath, fingerprint)
+        table = read_table(cache_path)
+        if table is not None:
+            return InvestorAliases.from_frame(table)
+
+    aliases = InvestorAliases()
+    aliases.add(pd.unique(participation['Investor']))
+
+    # Persist the alias table for later process starts (best effort)
+    if cache_path is not None:
+        try:
+            if write_table(aliases.to_frame(), cache_path):
+                purge_stale_tables(cache_path)
+        except OSError:
+            pass
+
+    return aliases
+
+
+def index_participation(filepath, df, fingerprint=None):
+    """
+    Build the canonical deal -> investor participation index of a data file.
+
+    When the file's fingerprint is known, the index is read from (or written
+    to) the columnar cache like the enriched table. Its columns are memory-mapped,
+    so every process serving the file shares one copy.
+
+    Args:
+        filepath (str): Path to the JSON file
+        df (pd.DataFrame): Enriched deals of the file
+        fingerprint (tuple): Fingerprint of the file
+
+    Returns:
+        tuple: (participation index keyed by canonical names, InvestorAliases)
+    """
+    cache_path = None
+    if fingerprint is not None:
+        cache_path = table_cache_path(filepath + '.participation', fingerprint[3], participation_version())
+        participation = read_table(cache_path)
+        aliases = read_table(_aliases_cache_path(filepath, fingerprint)) if participation is not None else None
+        if aliases is not None:
+            return participation, InvestorAliases.from_frame(aliases)
+
+    raw = split_participation(df)
+    aliases = resolve_investor_names(filepath, raw, fingerprint)
+    participation = aliases.canonicalize(raw)
+
+    # Persist the index for other processes and later starts (best effort)
+    if cache_path is not None:
+        try:
+            if write_table(participation, cache_path):
+                purge_stale_tables(cache_path)
+        except OSError:
+            pass
+
+    return participation, aliases
+
+
+def load_dataset(filepath, fingerprint=None):
+    """
+    Load a data file and run the full enrichment pipeline on it.
+
+    When the file's fingerprint is known, the enriched table and the
+    participation index are read from (or written to) a columnar binary cache
+    next to the file, so only the first load of a given file content and code
+    version parses JSON and enriches, and every process loading the same
+    content maps the same files.
+
+    Args:
+        filepath (str): Path to the JSON file
+        fingerprint (tuple): Fingerprint of the file, recorded on the result
+
+    Returns:
+        Dataset: Enriched deals and indexes (empty, with the error recorded, if
+            the file failed to load)
+    """
+    df = None
+    cache_path = None
+    error = None
+
+    if fingerprint is not None:
+        cache_path = table_cache_path(filepath, fingerprint[3], enrichment_version())
+        df = read_table(cache_path)
+
+    if df is None:
+        try:
+            df = load_data(filepath)
+        except Exception as e:
+            df = pd.DataFrame()
+            error = str(e)
+
+        if not df.empty:
+            # Add the geography and deal size columns
+            df = enrich_deals(df)
+
+            # Persist the enriched table for later process starts (best effort)
+            if cache_path is not None:
+                try:
+                    if write_table(df, cache_path):
+                        purge_stale_tables(cache_path)
+                except OSError:
+                    pass
+
+    # Resolve investor names, then build the deal -> investor indexes once per data load
+    participation, aliases = index_participation(filepath, df, fingerprint) if not df.empty else (None, None)
+    investor_lookup = build_investor_lookup(df, participation) if not df.empty else {}
+    filter_index = BitmapIndex(df, FILTER_COLUMNS) if not df.empty else None
+    company_index = CompanySearchIndex(df['Company Name']) if not df.empty else None
+    coinvestment = CoInvestmentGraph(participation, df['Amount (USD)']) if not df.empty else None
+    profiles = InvestorProfiles.from_deals(df, participation) if not df.empty else None
+    trends = FundingCube.from_deals(df, participation) if not df.empty else None
+
+    # Unfiltered summary, kept up to date as deals are appended
+    investor_summary = create_investor_summary(df, participation=participation) if not df.empty else None
+    investor_order = {name: rank for rank, name in enumerate(pd.unique(participation['Investor']))} if not df.empty else {}
+
+    return Dataset(df, participation, investor_lookup, filter_index, company_index,
+                   investor_summary, investor_order, fingerprint, coinvestment, profiles, trends, aliases, error)
+
+
+def append_deal(dataset, deal, fingerprint=None):
+    """
+    Add one validated deal to a dataset without recomputing it.
+
+    The deal is enriched on its own and every index is updated only for the
+    new row, its filter values, its company name and its investors. The given
+    dataset is left unchanged, so readers of it are unaffected.
+
+    Args:
+        dataset (Dataset): Non-empty dataset to extend
+        deal (dict): Record returned by deal_store.validate_deal
+        fingerprint (tuple): Fingerprint of the data file after the append
+
+    Returns:
+        Dataset: New dataset including the deal
+    """
+    df = dataset.df
+    position = len(df)
+
+    # Enrich the new row exactly like a full load would
+    row = enrich_deals(apply_deal_schema(pd.DataFrame([deal], index=[position])))
+    new_df = append_deals(df, row)
+
+    # New spellings are resolved against every name seen so far, in a copy of
+    # the table if there are any, so the old snapshot's table is never modified
+    new_rows = split_participation(row)
+    names = pd.unique(new_rows['Investor'])
+    aliases = dataset.aliases
+    if any(name not in aliases for name in names):
+        aliases = aliases.copy()
+        aliases.add(names)
+    new_rows = aliases.canonicalize(new_rows)
+    participation = pd.concat([dataset.participation, new_rows], ignore_index=True).astype(dataset.participation.dtypes.to_dict())
+
+    # Copy the lookup and ranks so the old snapshot keeps its own
+    investor_lookup = dict(dataset.investor_lookup)
+    investor_order = dict(dataset.investor_order)
+    for investor, role in zip(new_rows['Investor'], new_rows['Role']):
+        positions, roles = investor_lookup.get(investor, (np.array([], dtype=np.intp), np.array([], dtype=object)))
+        investor_lookup[investor] = (np.append(positions, position), np.append(roles, role))
+        investor_order.setdefault(investor, len(investor_order))
+
+    investors = list(new_rows['Investor'])
+    investor_summary = dataset.investor_summary
+    if investors:
+        investor_summary = update_investor_summary(investor_summary, new_df, investor_lookup, investor_order, investors)
+
+    new_row = new_df.iloc[position]
+    appended = Dataset(
+        new_df, participation, investor_lookup,
+        dataset.filter_index.appended({column: new_row[column] for column in FILTER_COLUMNS}),
+        dataset.company_index.appended(new_row['Company Name'], position),
+        investor_summary, investor_order, fingerprint,
+        dataset.coinvestment.appended(investors, list(new_rows['Role']), new_row['Amount (USD)']),
+        dataset.profiles.appended({column: new_row[column] for column in PROFILE_COLUMNS}, investors),
+        dataset.trends.appended(
+            new_row['Funding Date'], {column: new_row[column] for column in TREND_DIMENSIONS},
+            new_row['Amount (USD)'], int((new_rows['Role'] == 'Lead').sum())
+        ),
+        aliases
+    )
+
+    appended._deal_keys = set(dataset.deal_keys())
+    appended._deal_keys.add(deal_key(deal['Company Name'], deal['Funding Date'], deal['Amount']))
+
+    return appended
+
+
+class DatasetCache:
+    """
+    Memoize enriched datasets keyed on the source file's fingerprint.
+
+    A lookup only stats the file while its mtime and size are unchanged. When
+    they change the content is re-hashed, and the dataset is rebuilt only if the
+    hash differs too. Failed loads are never cached.
+
+    Caches in different processes (e.g. server workers) share their work: a
+    changed file is loaded under a cross-process lock, and its tables and
+    generation are published for the others, which then map the published
+    tables instead of parsing the file (see table_cache.publish_lock). A
+    lookup swaps in the new dataset in one step, while callers holding the
+    old snapshot keep reading it.
+
+    A watched file (see watch) is reloaded by a background thread instead:
+    lookups return the current snapshot without a stat, and a changed file is
+    rebuilt off the request path and swapped in when ready.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._watchers = {}
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def get(self, filepath):
+        """
+        Return the enriched dataset for a file, rebuilding it only if the file changed.
+
+        Args:
+            filepath (str): Path to the JSON file
+
+        Returns:
+            Dataset: Cached or freshly built dataset
+        """
+        path = os.path.abspath(filepath)
+        if path in self._watchers:
+            # The watcher keeps the entry current: no stat and no lock on the request path
+            entry = self._entries.get(path)
+            if entry is not None:
+                return entry
+
+        with self._lock:
+            return self._get(filepath)
+
+    def _get(self, filepath):
+        # Lookup logic of get(); the caller holds the lock
+        path = os.path.abspath(filepath)
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Let load_dataset report the missing file
+            self.misses += 1
+            return load_dataset(filepath)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry.fingerprint[1:3] == (stat.st_mtime_ns, stat.st_size):
+            self.hits += 1
+            return entry
+
+        # One process at a time loads a changed file; the others wait, then map its tables
+        with publish_lock(path):
+            fingerprint = self._fingerprint(path, stat)
+            if entry is not None and entry.fingerprint[3] == fingerprint[3]:
+                # Touched but unchanged content - keep the dataset, refresh the stat
+                entry.fingerprint = fingerprint
+                entry.generation = publish_generation(path, fingerprint)
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            dataset = load_dataset(filepath, fingerprint)
+            if not dataset.df.empty:
+                dataset.generation = publish_generation(path, fingerprint)
+                self._entries[path] = dataset
+
+        return dataset
+
+    @staticmethod
+    def _fingerprint(path, stat):
+        # Skip hashing if another process already published this exact file; call with publish_lock held
+        record = read_generation(path)
+        if record is not None and (record['mtime_ns'], record['size']) == (stat.st_mtime_ns, stat.st_size):
+            return (path, stat.st_mtime_ns, stat.st_size, record['sha256'])
+        return file_fingerprint(path)
+
+    def reload(self, filepath):
+        """
+        Rebuild a file's dataset if its content changed and swap it in.
+
+        Lookups keep returning the current dataset while the new one is built,
+        and callers holding it keep reading it after the swap. If the file
+        fails to load the current dataset is kept.
+
+        Args:
+            filepath (str): Path to the JSON file
+
+        Returns:
+            Dataset: The dataset cached for the file after the reload, or None
+        """
+        path = os.path.abspath(filepath)
+
+        with self._reload_lock:
+            with self._lock:
+                entry = self._entries.get(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return entry
+
+            # Build without holding the cache lock, so lookups are never blocked by a reload
+            dataset = None
+            with publish_lock(path):
+                fingerprint = self._fingerprint(path, stat)
+                generation = publish_generation(path, fingerprint)
+                if entry is None or entry.fingerprint[3] != fingerprint[3]:
+                    dataset = load_dataset(filepath, fingerprint)
+                    dataset.generation = generation
+
+            with self._lock:
+                if self._entries.get(path) is not entry:
+                    # Replaced meanwhile (e.g. by an append); its change is seen on the next poll
+                    return self._entries.get(path)
+                if dataset is None:
+                    # Touched but unchanged content - keep the dataset, refresh the stat
+                    entry.fingerprint = fingerprint
+                    entry.generation = generation
+                elif not dataset.df.empty:
+                    self._entries[path] = dataset
+                    self.reloads += 1
+                return self._entries.get(path)
+
+    def watch(self, filepath, interval=1.0, debounce=0.5):
+        """
+        Reload a file in the background whenever it changes (see file_watcher).
+
+        Watching a file that is already watched does nothing.
+
+        Args:
+            filepath (str): Path to the JSON file
+            interval (float): Seconds between checks of the file
+            debounce (float): Seconds the file must stay unchanged before it is reloaded
+
+        Returns:
+            FileWatcher: The file's watcher
+        """
+        path = os.path.abspath(filepath)
+        with self._lock:
+            watcher = self._watchers.get(path)
+            if watcher is None:
+                watcher = self._watchers[path] = FileWatcher(path, self.reload, interval=interval, debounce=debounce)
+        return watcher.start()
+
+    def unwatch(self, filepath=None):
+        """
+        Stop watching a file; its lookups check the file again.
+
+        Args:
+            filepath (str): File to stop watching, or None to stop every watcher
+        """
+        with self._lock:
+            if filepath is None:
+                watchers = list(self._watchers.values())
+                self._watchers.clear()
+            else:
+                watchers = [watcher for watcher in [self._watchers.pop(os.path.abspath(filepath), None)] if watcher]
+        for watcher in watchers:
+            watcher.stop()
+
+    def append(self, filepath, record):
+        """
+        Add a deal to a data file and update its cached dataset incrementally.
+
+        The record is validated, skipped if a deal with the same company,
+        funding date and amount exists, appended to the file and merged into
+        the cached dataset (see append_deal), which replaces the cached entry.
+
+        Args:
+            filepath (str): Path to the JSON file
+            record (dict): Deal in the data.json schema
+
+        Returns:
+            tuple: (current Dataset, True if the deal was added or False if it
+                was a duplicate)
+
+        Raises:
+            ValueError: If the record is invalid or the file cannot be appended to
+        """
+        deal = validate_deal(record)
+        path = os.path.abspath(filepath)
+
+        with self._lock:
+            dataset = self._get(filepath)
+            if not dataset.df.empty and deal_key(deal['Company Name'], deal['Funding Date'], deal['Amount']) in dataset.deal_keys():
+                return dataset, False
+
+            with publish_lock(path):
+                append_deal_to_file(path, deal)
+                fingerprint = file_fingerprint(path)
+
+                if dataset.df.empty:
+                    # Nothing loaded to extend - load the file with the new deal in it
+                    dataset = load_dataset(filepath, fingerprint)
+                else:
+                    dataset = append_deal(dataset, deal, fingerprint)
+
+                # Other processes rebuild from the file (and publish its tables) on their next lookup
+                if not dataset.df.empty:
+                    dataset.generation = publish_generation(path, fingerprint)
+                    self._entries[path] = dataset
+            return dataset, True
+
+    def invalidate(self, filepath=None):
+        """
+        Drop cached datasets so the next lookup reloads from disk.
+
+        Args:
+            filepath (str): File to drop, or None to drop every entry
+        """
+        with self._lock:
+            if filepath is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(filepath), None)
+
+    def stats(self):
+        """
+        Report cache counters.
+
+        Returns:
+            dict: 'hits' and 'misses' of lookups that check the file (lookups of
+                watched files are not counted), background 'reloads' and
+                number of cached 'entries'
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'reloads': self.reloads, 'entries': len(self._entries)}
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with optional time-to-live expiry.
+
+    Entries are evicted once more than maxsize are stored, or on lookup once
+    they are older than ttl seconds.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Look up a key, marking it as most recently used.
+
+        Args:
+            key: Hashable cache key
+            default: Value returned on a miss
+
+        Returns:
+            The cached value, or default if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entries beyond maxsize.
+
+        Args:
+            key: Hashable cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Report cache counters.
+
+        Returns:
+            dict: 'hits', 'misses' and number of cached 'entries'
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+def summary_cache_key(fingerprint, lead_only, geography, deal_size, verticals, stage, investor_search):
+    """
+    Build a normalized cache key for an investor summary from the sidebar filters.
+
+    Args:
+        fingerprint (tuple): Fingerprint of the dataset being summarized
+        lead_only (bool): Lead Investors Only checkbox
+        geography (str): Selected geography or "All"
+        deal_size (str): Selected deal size category or "All"
+        verticals (list): Selected climate verticals (order does not matter)
+        stage (str): Selected funding stage or "All"
+        investor_search (str): Investor name search text
+
+    Returns:
+        tuple: Hashable cache key
+    """
+    return (
+        fingerprint,
+        bool(lead_only),
+        geography,
+        deal_size,
+        tuple(sorted(verticals, key=str)),
+        stage,
+        investor_search or ''
+    )
+
+
+class JsonDealStore:
+    """
+    Deal store over a JSON data file, served from its in-memory Dataset.
+
+    Callers only talk to a deal store, so they run unchanged on this backend
+    or on sqlite_store.SQLiteDealStore, which provides the same methods.
+    """
+
+    def __init__(self, filepath, cache):
+        """
+        Args:
+            filepath (str): Path to the JSON file
+            cache (DatasetCache): Cache the dataset is loaded from and appended through
+        """
+        self.filepath = filepath
+        self.cache = cache
+        # One snapshot per store, so every query of a rerun sees the same data
+        self.dataset = cache.get(filepath)
+
+    @property
+    def fingerprint(self):
+        """Hashable key of the current data, for result caches."""
+        return self.dataset.fingerprint
+
+    def generation(self):
+        """
+        Returns:
+            int: Generation of the data file content this store reads (see DatasetCache)
+        """
+        return self.dataset.generation
+
+    def is_empty(self):
+        return self.dataset.df.empty
+
+    def filter_values(self, column):
+        """
+        Args:
+            column (str): Deal column
+
+        Returns:
+            list: Distinct values, in order of first appearance
+        """
+        return self.dataset.df[column].unique().tolist()
+
+    def last_updated(self):
+        """
+        Returns:
+            pd.Timestamp: Latest funding date
+        """
+        return self.dataset.df['Funding Date'].max()
+
+    def investor_summary(self, lead_only=False, filters=None, investor_search=''):
+        """
+        Summarize investors over the deals matching the sidebar filters.
+
+        Args:
+            lead_only (bool): If True, only include lead investors
+            filters (dict): Deal column -> values to keep (see BitmapIndex.select)
+            investor_search (str): Keep investors whose name contains this
+                pattern (case-insensitive)
+
+        Returns:
+            pd.DataFrame: Investor summary (see create_investor_summary)
+        """
+        dataset = self.dataset
+        df = dataset.df
+
+        # Filter the deals first to get relevant investors: evaluate all
+        # sidebar filters as one bitmap combination, then gather those rows once
+        deal_positions = dataset.filter_index.select(filters or {})
+        filtered_deals_df = df if len(deal_positions) == len(df) else df.iloc[deal_positions]
+
+        # Create filtered investor summary based on filtered deals and lead_only setting
+        if filtered_deals_df is df and not lead_only:
+            # Unfiltered view - the dataset keeps this summary up to date
+            investor_summary = dataset.investor_summary
+        elif len(filtered_deals_df) > 0:
+            investor_summary = create_investor_summary(filtered_deals_df, lead_only=lead_only, participation=dataset.participation)
+        else:
+            columns = ['Investor Name', 'Deals Done', 'Lead Deals', 'Total Invested', 'Preferred Verticals', 'Preferred Stages']
+            investor_summary = pd.DataFrame(columns=columns)
+
+        # Apply Investor Name filter to investor summary
+        if investor_search:
+            investor_mask = investor_summary['Investor Name'].str.contains(investor_search, case=False, na=False)
+            investor_summary = investor_summary[investor_mask]
+
+        return investor_summary
+
+    def investor_deals(self, investor_name):
+        """
+        Args:
+            investor_name (str): Name of the investor
+
+        Returns:
+            pd.DataFrame: All deals this investor participated in (see get_investor_deals)
+        """
+        return get_investor_deals(self.dataset.df, investor_name, self.dataset.investor_lookup)
+
+    def investor_aliases(self, investor_name):
+        """
+        Args:
+            investor_name (str): Canonical name of the investor
+
+        Returns:
+            list: Spellings of the name found in the data, in order of first appearance
+        """
+        return self.dataset.aliases.aliases_of(investor_name)
+
+    def co_investors(self, investor_name, k=10, by="Shared Deals"):
+        """
+        Args:
+            investor_name (str): Name of the investor
+            k (int): Maximum number of co-investors
+            by (str): Ranking, a key of coinvest.CO_INVESTOR_WEIGHTS
+
+        Returns:
+            pd.DataFrame: Top co-investors (see CoInvestmentGraph.top_co_investors)
+        """
+        return self.dataset.coinvestment.top_co_investors(investor_name, k, by)
+
+    def similar_investors(self, investor_name, k=10):
+        """
+        Args:
+            investor_name (str): Name of the investor
+            k (int): Maximum number of investors
+
+        Returns:
+            pd.DataFrame: Most similar investors (see InvestorProfiles.similar_investors)
+        """
+        return self.dataset.profiles.similar_investors(investor_name, k)
+
+    def match_investors(self, profile, k=10):
+        """
+        Args:
+            profile (dict): similarity.PROFILE_COLUMNS -> wanted values
+            k (int): Maximum number of investors
+
+        Returns:
+            pd.DataFrame: Best matching investors (see InvestorProfiles.match_profile)
+        """
+        return self.dataset.profiles.match_profile(profile, k)
+
+    def trend_months(self):
+        """
+        Returns:
+            tuple: (first, last) month numbers with dated deals (see FundingCube.month_range)
+        """
+        return self.dataset.trends.month_range()
+
+    def funding_trends(self, measure='Deals', filters=None, by=None, start=None, end=None):
+        """
+        Args:
+            measure (str): A key of trends.TREND_MEASURES
+            filters (dict): trends.TREND_DIMENSIONS -> values to keep
+            by (str): Dimension to split into one series per value
+            start (int): First month number shown
+            end (int): Last month number shown
+
+        Returns:
+            pd.DataFrame: Monthly totals (see FundingCube.trend)
+        """
+        return self.dataset.trends.trend(measure, filters, by, start, end)
+
+    def search_companies(self, query, fuzzy=False):
+        """
+        Args:
+            query (str): Company name search text
+            fuzzy (bool): Match similarly spelled names instead of substrings
+
+        Returns:
+            pd.DataFrame: Matching deals (see CompanySearchIndex.search)
+        """
+        return self.dataset.df.iloc[self.dataset.company_index.search(query, fuzzy=fuzzy)]
+
+    def append(self, record):
+        """
+        Add a deal to the data file (see DatasetCache.append).
+
+        Args:
+            record (dict): Deal in the data.json schema
+
+        Returns:
+            bool: True if the deal was added, False if it was a duplicate
+
+        Raises:
+            ValueError: If the record is invalid or the file cannot be appended to
+        """
+        self.dataset, added = self.cache.append(self.filepath, record)
+        return added
+
+
+@functools.lru_cache(maxsize=None)
+def get_dataset_cache():
+    """
+    Return the process-wide dataset cache, shared by every caller in the process.
+
+    Returns:
+        DatasetCache: The shared cache
+    """
+    return DatasetCache()
+
+
+# Data files with these extensions are SQLite databases built by sqlite_store.import_deals
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+
+@functools.lru_cache(maxsize=None)
+def get_sqlite_store(db_path):
+    """
+    Return the process-wide store for a SQLite database.
+
+    Args:
+        db_path (str): Path to the database
+
+    Returns:
+        SQLiteDealStore: The shared store
+    """
+    return SQLiteDealStore(db_path)
+
+
+def open_deal_store(filepath, cache=None, watch=False):
+    """
+    Open the storage backend for a data file, chosen by its extension.
+
+    Args:
+        filepath (str): JSON deals file, or SQLite database (SQLITE_EXTENSIONS)
+        cache (DatasetCache): Cache JSON data is loaded through (default: the
+            process-wide one)
+        watch (bool): Reload a JSON file in the background when it changes
+            (see DatasetCache.watch), instead of checking it on every open
+
+    Returns:
+        JsonDealStore or SQLiteDealStore: Store to query
+
+    Raises:
+        ValueError: If the data file or database cannot be loaded
+    """
+    if filepath.endswith(SQLITE_EXTENSIONS):
+        store = get_sqlite_store(filepath)
+        try:
+            store.generation()
+        except sqlite3.Error as e:
+            raise ValueError(str(e)) from e
+        return store
+
+    cache = cache if cache is not None else get_dataset_cache()
+    if watch:
+        cache.watch(filepath)
+    store = JsonDealStore(filepath, cache)
+    if store.dataset.error is not None:
+        raise ValueError(store.dataset.error)
+    return store
+
+
+def investor_profile(store, investor_name):
+    """
+    Gather the headline figures of an investor's profile.
+
+    Co-investors and similar investors are separate store queries
+    (co_investors, similar_investors).
+
+    Args:
+        store: Deal store (see open_deal_store)
+        investor_name (str): Canonical name of the investor
+
+    Returns:
+        dict: 'deals' (see get_investor_deals; empty for an unknown investor),
+            'deals_done', 'total_invested' (USD), 'verticals' and 'stages'
+            (deal counts per value, most frequent first) and 'other_names'
+            (other spellings merged into the investor)
+    """
+    deals = store.investor_deals(investor_name)
+
+    return {
+        'deals': deals,
+        'deals_done': len(deals),
+        'total_invested': deals['Amount (USD)'].sum() if not deals.empty else 0,
+        # Counted as plain values, so unused categories are not counted
+        'verticals': deals['Climate Vertical'].astype(object).value_counts() if not deals.empty else pd.Series(dtype=np.int64),
+        'stages': deals['Funding Stage'].astype(object).value_counts() if not deals.empty else pd.Series(dtype=np.int64),
+        'other_names': [name for name in store.investor_aliases(investor_name) if name != investor_name],
+    }
+
+
+def extract_funding_data(url, fetcher, extractor, client=None, api_key=None):
+    """
+    Extract funding data from a news article URL using AI.
+
+    Articles and extractions are cached on disk by the fetcher and extractor,
+    so extracting a known article again makes no network calls.
+
+    Args:
+        url (str): URL of the news article
+        fetcher (article_fetcher.ArticleFetcher): Fetcher to use
+        extractor (article_fetcher.FundingExtractor): Extractor to use
+        client: Model client exposing chat.completions.create (default: openai
+            configured with api_key)
+        api_key (str): OpenAI API key, used when no client is given
+
+    Returns:
+        dict: Extracted funding data or error message
+    """
+    # Imported here: only extraction needs the HTTP and model client libraries,
+    # and openai alone takes longer to import than the rest of the engine
+    import openai
+    import requests
+
+    try:
+        # Step A: Fetch and parse the article text
+        try:
+            article = fetcher.fetch(url)
+        except requests.RequestException as e:
+            return {"error": f"Could not fetch the article: {e}"}
+
+        # Find the main article body (this might need tuning for different sites)
+        if not article.text:
+            return {"error": "Could not extract text from the article."}
+
+        # Reuse an earlier extraction of the same content without calling the model
+        cached = extractor.cached_extraction(article)
+        if cached is not None:
+            return cached
+
+        # Step B: Call the OpenAI API
+        if client is None:
+            # Check if OpenAI API key is available and valid
+            if not api_key or api_key == "your-openai-api-key-here":
+                return {"error": "OpenAI API key not configured. Please add a valid OPENAI_API_KEY to .streamlit/secrets.toml"}
+
+            openai.api_key = api_key
+            client = openai
+
+        # Step C: Return the structured data
+        return extractor.extract(article, client)
+
+    except Exception as e:
+        error_msg = str(e)
+        if "429" in error_msg or "insufficient_quota" in error_msg or "quota" in error_msg.lower():
+            return {"error": "OpenAI API quota exceeded. Please check your billing at https://platform.openai.com/usage and add credits to your account."}
+        elif "401" in error_msg or "invalid" in error_msg.lower():
+            return {"error": "Invalid OpenAI API key. Please check your API key at https://platform.openai.com/api-keys"}
+        else:
+            return {"error": f"An error occurred: {error_msg}"}
+
+
+# Sort options for the investor list: label -> (column, ascending)
+INVESTOR_SORT_KEYS = {
+    "Capital Deployed": ('Total Invested', False),
+    "Total Deals": ('Deals Done', False),
+    "Lead Deals": ('Lead Deals', False),
+    "Name (A-Z)": ('Investor Name', True),
+}
+
+
+def sort_investors(investor_summary, sort_by):
+    """
+    Sort the investor summary by one of INVESTOR_SORT_KEYS.
+
+    Ties are broken by investor name, so the order (and therefore the content
+    of each page) is the same on every rerun.
+
+    Args:
+        investor_summary (pd.DataFrame): Output of create_investor_summary
+        sort_by (str): Key of INVESTOR_SORT_KEYS
+
+    Returns:
+        pd.DataFrame: Sorted summary
+    """
+    column, ascending = INVESTOR_SORT_KEYS[sort_by]
+    if column == 'Investor Name':
+        return investor_summary.sort_values('Investor Name', kind='stable')
+    return investor_summary.sort_values([column, 'Investor Name'], ascending=[ascending, True], kind='stable')
+
+
+def page_bounds(total, page, page_size):
+    """
+    Compute the rows shown on one page of a list.
+
+    Args:
+        total (int): Number of items in the list
+        page (int): Requested 1-based page number (clamped to the valid range)
+        page_size (int): Items per page
+
+    Returns:
+        tuple: (start, end, page, num_pages) with start/end as iloc bounds
+    """
+    num_pages = max(1, math.ceil(total / page_size))
+    page = min(max(int(page), 1), num_pages)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total), page, num_pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the investor summary of a deals file or database as CSV.")
+    parser.add_argument('source', help='JSON deals file or SQLite database')
+    parser.add_argument('--lead-only', action='store_true', help='Only count lead investments')
+    parser.add_argument('--geography', action='append', help='Keep deals in this geography (repeatable)')
+    parser.add_argument('--deal-size', action='append', help='Keep deals of this size category (repeatable)')
+    parser.add_argument('--vertical', action='append', help='Keep deals in this climate vertical (repeatable)')
+    parser.add_argument('--stage', action='append', help='Keep deals at this funding stage (repeatable)')
+    parser.add_argument('--investor', default='', help='Keep investors whose name contains this text')
+    parser.add_argument('--sort', default='Capital Deployed', choices=list(INVESTOR_SORT_KEYS), help='Sort order')
+    parser.add_argument('--limit', type=int, help='Print at most this many investors')
+    args = parser.parse_args()
+
+    try:
+        store = open_deal_store(args.source)
+    except ValueError as e:
+        sys.exit(f"Error loading data: {e}")
+
+    summary = store.investor_summary(
+        lead_only=args.lead_only,
+        filters={
+            'Geography': args.geography,
+            'Deal Size Category': args.deal_size,
+            'Climate Vertical': args.vertical,
+            'Funding Stage': args.stage
+        },
+        investor_search=args.investor
+    ) if not store.is_empty() else pd.DataFrame(columns=['Investor Name'])
+    summary = sort_investors(summary, args.sort) if not summary.empty else summary
+    summary.head(args.limit).to_csv(sys.stdout, index=False)
+
+
+if __name__ == '__main__':
+    main()
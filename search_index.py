@@ -0,0 +1,165 @@
+"""
+Company-name search index for "Who funded this company?".
+
+Distinct company names are lowercased and indexed by character trigrams. A
+literal query intersects the postings of its trigrams and only verifies the
+surviving candidates, so lookups do not scan every name. Fuzzy lookups rank
+names by trigram (Jaccard) similarity to the query.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+GRAM_SIZE = 3
+
+# Candidate count below which verifying names beats intersecting more postings
+_VERIFY_DIRECTLY = 64
+
+
+def _grams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class CompanySearchIndex:
+    """
+    Trigram inverted index over the company names of a deals table.
+
+    Literal matching is a case-insensitive substring match (regex characters
+    in the query have no special meaning). Queries shorter than a trigram
+    fall back to a scan of the distinct names.
+    """
+
+    def __init__(self, names):
+        """
+        Args:
+            names (pd.Series): 'Company Name' column of the deals table
+        """
+        codes, uniques = pd.factorize(names)
+        self._names = [str(name).lower() for name in uniques]
+        self._ids = {name: i for i, name in enumerate(uniques)}
+
+        # Rows added by appended(), per name id, on top of the CSR arrays below
+        self._extra_rows = {}
+
+        # Deal rows per distinct name, as CSR-style offsets into one array
+        valid = np.flatnonzero(codes >= 0)
+        order = valid[np.argsort(codes[valid], kind='stable')]
+        self._rows = order
+        self._row_offsets = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+        # Postings of padded names, so fuzzy queries also score word boundaries
+        postings = {}
+        for name_id, name in enumerate(self._names):
+            for gram in _grams(f" {name} "):
+                postings.setdefault(gram, []).append(name_id)
+        self._postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+        self._gram_counts = np.array([len(_grams(f" {name} ")) for name in self._names], dtype=np.int64)
+
+    def __len__(self):
+        return len(self._names)
+
+    def appended(self, name, row):
+        """
+        Return a copy of the index with one more deal row.
+
+        Only the postings of the name's trigrams are copied and extended; the
+        rest of the index is shared with this one.
+
+        Args:
+            name (str): Company name of the new row (missing names are not indexed)
+            row (int): Position of the new row in the table
+
+        Returns:
+            CompanySearchIndex: Index including the new row
+        """
+        index = copy.copy(self)
+        if pd.isna(name):
+            return index
+
+        name_id = self._ids.get(name)
+        if name_id is None:
+            # New name: no rows in the CSR arrays, postings extended for its trigrams
+            name_id = len(self._names)
+            lowered = str(name).lower()
+            grams = _grams(f" {lowered} ")
+            index._names = self._names + [lowered]
+            index._ids = {**self._ids, name: name_id}
+            index._row_offsets = np.append(self._row_offsets, self._row_offsets[-1])
+            index._gram_counts = np.append(self._gram_counts, len(grams))
+            index._postings = dict(self._postings)
+            for gram in grams:
+                index._postings[gram] = np.append(self._postings.get(gram, np.array([], dtype=np.int64)), name_id)
+
+        index._extra_rows = {**self._extra_rows, name_id: self._extra_rows.get(name_id, ()) + (row,)}
+        return index
+
+    def _literal_names(self, query):
+        if len(query) < GRAM_SIZE:
+            return [i for i, name in enumerate(self._names) if query in name]
+
+        # Intersect postings from the rarest trigram up, then verify the candidates
+        lists = sorted((self._postings.get(gram) for gram in _grams(query)), key=lambda ids: -1 if ids is None else len(ids))
+        if lists[0] is None:
+            return []
+        candidates = lists[0]
+        for ids in lists[1:]:
+            if len(candidates) <= _VERIFY_DIRECTLY:
+                break
+            # Postings are sorted, so a binary search keeps the candidates present in ids
+            found = np.searchsorted(ids, candidates)
+            candidates = candidates[ids[np.minimum(found, len(ids) - 1)] == candidates]
+        names = self._names
+        return [i for i in candidates.tolist() if query in names[i]]
+
+    def _fuzzy_names(self, query, threshold, limit):
+        grams = _grams(f" {query} ")
+        hits = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not hits:
+            return []
+
+        # Count shared trigrams per candidate name in one pass
+        shared = np.bincount(np.concatenate(hits), minlength=len(self._names))
+        candidates = np.flatnonzero(shared)
+        similarity = shared[candidates] / (len(grams) + self._gram_counts[candidates] - shared[candidates])
+
+        keep = similarity >= threshold
+        candidates, similarity = candidates[keep], similarity[keep]
+        best = np.argsort(-similarity, kind='stable')[:limit]
+        return candidates[best].tolist()
+
+    def search(self, query, fuzzy=False, threshold=0.3, limit=20):
+        """
+        Find deal rows whose company name matches the query.
+
+        Args:
+            query (str): Search text
+            fuzzy (bool): Rank names by trigram similarity instead of requiring
+                a literal substring match
+            threshold (float): Minimum similarity for fuzzy matches (0-1)
+            limit (int): Maximum number of distinct names for fuzzy matches
+
+        Returns:
+            np.ndarray: Row positions, in table order for literal matches and
+                in order of similarity for fuzzy matches
+        """
+        query = query.lower()
+        if not query:
+            return np.array([], dtype=np.int64)
+
+        name_ids = self._fuzzy_names(query, threshold, limit) if fuzzy else self._literal_names(query)
+        if not name_ids:
+            return np.array([], dtype=np.int64)
+
+        # Gather each name's slice of rows in one vectorized step
+        name_ids = np.asarray(name_ids, dtype=np.int64)
+        starts = self._row_offsets[name_ids]
+        lengths = self._row_offsets[name_ids + 1] - starts
+        slice_starts = np.cumsum(lengths) - lengths
+        rows = self._rows[np.arange(lengths.sum()) + np.repeat(starts - slice_starts, lengths)]
+
+        if self._extra_rows:
+            extra = [row for i in name_ids.tolist() for row in self._extra_rows.get(i, ())]
+            rows = np.concatenate([rows, np.array(extra, dtype=rows.dtype)])
+
+        return rows if fuzzy else np.sort(rows)
@@ -0,0 +1,219 @@
+"""
+Investor similarity: "find investors like X" and "match my startup profile".
+
+Each investor is a sparse vector of deal counts over the values of the deal
+facets (climate vertical, funding stage, deal size category and geography),
+stored in CSR form. A query scores every investor by cosine similarity with
+one weighted bincount over the non-zero entries, so its cost grows with the
+number of non-zeros and never with investors x features.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Deal columns the investor vectors are built over
+PROFILE_COLUMNS = ['Climate Vertical', 'Funding Stage', 'Deal Size Category', 'Geography']
+
+SIMILAR_COLUMNS = ['Investor Name', 'Similarity', 'Deals Done']
+
+
+class InvestorProfiles:
+    """
+    Sparse investor x (column, value) deal count matrix with cosine top-k queries.
+
+    Ties in similarity are broken by the investors' order of first
+    appearance, as in the investor summary.
+    """
+
+    def __init__(self, deals_done, counts):
+        """
+        Args:
+            deals_done (pd.Series): Deals per investor, indexed by investor name
+                in order of first appearance
+            counts (pd.DataFrame): Columns 'Investor', 'Column', 'Value' and
+                'Deals': number of the investor's deals with that value
+        """
+        self._names = deals_done.index.tolist()
+        self._ids = {name: i for i, name in enumerate(self._names)}
+        self._deals_done = deals_done.to_numpy(dtype=np.int64)
+
+        features = pd.MultiIndex.from_frame(counts[['Column', 'Value']])
+        feature_codes, uniques = features.factorize()
+        self._features = list(uniques)
+        self._feature_ids = {feature: i for i, feature in enumerate(self._features)}
+
+        # CSR rows sorted by investor, then feature
+        rows = pd.Index(self._names).get_indexer(counts['Investor'])
+        order = np.lexsort((feature_codes, rows))
+        self._rows = rows[order].astype(np.int64)
+        self._indices = feature_codes[order].astype(np.int64)
+        self._data = counts['Deals'].to_numpy(dtype=np.float64)[order]
+        self._indptr = np.searchsorted(self._rows, np.arange(len(self._names) + 1))
+        self._norms = np.sqrt(np.bincount(self._rows, weights=self._data ** 2, minlength=len(self._names)))
+
+        # Vectors of investors changed by appended(): {investor id: {feature id: deals}}
+        self._extra = {}
+
+    @classmethod
+    def from_deals(cls, df, participation):
+        """
+        Build the profiles of the investors of a deals table.
+
+        Args:
+            df (pd.DataFrame): Enriched deals
+            participation (pd.DataFrame): Participation index from
+                enrichment.build_participation_index
+
+        Returns:
+            InvestorProfiles: Profiles of every investor in participation
+        """
+        positions = df.index.get_indexer(participation['Deal ID'])
+        investors = participation['Investor']
+        deals_done = investors.value_counts(sort=False).reindex(pd.unique(investors))
+
+        parts = []
+        for column in PROFILE_COLUMNS:
+            values = df[column].to_numpy()[positions]
+            part = pd.DataFrame({'Investor': investors.to_numpy(), 'Value': values}).dropna()
+            part = part.groupby(['Investor', 'Value'], sort=False, observed=True).size().rename('Deals').reset_index()
+            part.insert(1, 'Column', column)
+            parts.append(part)
+        counts = pd.concat(parts, ignore_index=True)
+        counts['Value'] = counts['Value'].astype(object)
+
+        return cls(deals_done, counts)
+
+    def __len__(self):
+        return len(self._names)
+
+    def _row(self, investor_id):
+        # {feature id: deals} of one investor, including appended deals
+        if investor_id in self._extra:
+            return self._extra[investor_id]
+        if investor_id >= len(self._indptr) - 1:
+            return {}
+        row = slice(self._indptr[investor_id], self._indptr[investor_id + 1])
+        return dict(zip(self._indices[row].tolist(), self._data[row].tolist()))
+
+    def appended(self, values, investors):
+        """
+        Return a copy of the profiles with one more deal.
+
+        Only the vectors of the deal's investors are copied and changed; the
+        CSR arrays are shared with these profiles.
+
+        Args:
+            values (dict): PROFILE_COLUMNS -> value of the new deal (missing values ignored)
+            investors (list): Investors of the new deal (no repeats)
+
+        Returns:
+            InvestorProfiles: Profiles including the new deal
+        """
+        profiles = copy.copy(self)
+        features = [(column, values[column]) for column in PROFILE_COLUMNS if not pd.isna(values[column])]
+
+        new_features = [feature for feature in features if feature not in self._feature_ids]
+        if new_features:
+            profiles._features = self._features + new_features
+            profiles._feature_ids = {**self._feature_ids, **{f: len(self._features) + i for i, f in enumerate(new_features)}}
+
+        new_names = [name for name in investors if name not in self._ids]
+        if new_names:
+            profiles._names = self._names + new_names
+            profiles._ids = {**self._ids, **{name: len(self._names) + i for i, name in enumerate(new_names)}}
+            profiles._deals_done = np.append(self._deals_done, np.zeros(len(new_names), dtype=np.int64))
+        else:
+            profiles._deals_done = self._deals_done.copy()
+
+        profiles._extra = dict(self._extra)
+        for name in investors:
+            investor_id = profiles._ids[name]
+            row = dict(self._row(investor_id))
+            for feature in features:
+                feature_id = profiles._feature_ids[feature]
+                row[feature_id] = row.get(feature_id, 0.0) + 1.0
+            profiles._extra[investor_id] = row
+            profiles._deals_done[investor_id] += 1
+
+        return profiles
+
+    def _top(self, query, k, exclude=None):
+        """
+        Rank investors by cosine similarity with a query vector.
+
+        Args:
+            query (dict): {feature id: weight}
+            k (int): Maximum number of investors
+            exclude (int): Investor id left out of the results
+
+        Returns:
+            pd.DataFrame: SIMILAR_COLUMNS, most similar first
+        """
+        weights = np.zeros(len(self._features))
+        for feature_id, weight in query.items():
+            weights[feature_id] = weight
+        query_norm = np.sqrt(np.sum(weights ** 2))
+
+        # Dot products of every investor with the query in one pass over the non-zeros
+        dots = np.bincount(self._rows, weights=self._data * weights[self._indices], minlength=len(self._names))
+        norms = np.append(self._norms, np.zeros(len(self._names) - len(self._norms)))
+        for investor_id, row in self._extra.items():
+            dots[investor_id] = sum(count * weights[feature_id] for feature_id, count in row.items())
+            norms[investor_id] = np.sqrt(sum(count ** 2 for count in row.values()))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(norms > 0, dots / (norms * query_norm), 0.0) if query_norm > 0 else np.zeros(len(norms))
+
+        candidates = np.flatnonzero(scores > 0)
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+        if len(candidates) > k:
+            # Only the candidates that can make the top k are sorted
+            cutoff = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[scores[candidates] >= cutoff]
+        top = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+
+        names = self._names
+        return pd.DataFrame({
+            'Investor Name': [names[i] for i in top.tolist()],
+            'Similarity': scores[top],
+            'Deals Done': self._deals_done[top],
+        }, columns=SIMILAR_COLUMNS)
+
+    def similar_investors(self, investor_name, k=10):
+        """
+        Find the investors whose activity looks most like an investor's.
+
+        Args:
+            investor_name (str): Name of the investor
+            k (int): Maximum number of investors
+
+        Returns:
+            pd.DataFrame: SIMILAR_COLUMNS, most similar first (empty for an
+                unknown investor)
+        """
+        investor_id = self._ids.get(investor_name)
+        if investor_id is None:
+            return pd.DataFrame(columns=SIMILAR_COLUMNS)
+        return self._top(self._row(investor_id), k, exclude=investor_id)
+
+    def match_profile(self, profile, k=10):
+        """
+        Find the investors whose activity best matches a startup profile.
+
+        Args:
+            profile (dict): PROFILE_COLUMNS -> list of wanted values; each
+                wanted value weighs the same
+            k (int): Maximum number of investors
+
+        Returns:
+            pd.DataFrame: SIMILAR_COLUMNS, best match first
+        """
+        query = {}
+        for column, values in profile.items():
+            for value in values or []:
+                feature_id = self._feature_ids.get((column, value))
+                if feature_id is not None:
+                    query[feature_id] = 1.0
+        return self._top(query, k)
@@ -0,0 +1,892 @@
+"""
+SQLite storage backend for deals, as an alternative to data.json.
+
+Deals live in normalized tables, so no worker has to hold the whole dataset
+in memory:
+
+- deals: one row per deal, including the enriched 'Amount (USD)',
+  'Geography' and 'Deal Size Category' columns
+- investors: one row per canonical investor (see investor_names)
+- investor_aliases: every raw spelling of an investor name -> its investor
+- deal_investors: one row per (deal, investor) pair with the investor's role
+
+The filter columns, company name, funding date and investor are indexed, and
+company names also have a trigram full-text index. Investor summaries run as
+SQL aggregations over investor_facets, a rollup of deal_investors by investor,
+role and sidebar filter values, so their cost depends on the number of
+distinct combinations rather than on the number of deals. Funding trends
+are read from funding_trends, a rollup of deals by month, climate vertical,
+funding stage and geography. Only result rows reach pandas, and results match
+the in-memory backend of query_engine.
+
+A meta table holds a generation counter that every write increments, so
+caches in any process can tell when the database changed, and the version of
+the FX rate table the USD amounts were converted with.
+
+Usage (one-shot import of a deals file):
+    python sqlite_store.py data.json deals.db
+"""
+import argparse
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import quote
+
+import pandas as pd
+
+from deal_store import DEAL_FIELDS, deal_key, validate_deal
+from coinvest import CO_INVESTOR_COLUMNS, CO_INVESTOR_WEIGHTS
+from enrichment import enrich_deals, split_participation
+from fx import DEFAULT_FX_TABLE
+from ingest import apply_deal_schema, iter_record_batches
+from investor_names import InvestorAliases
+from similarity import PROFILE_COLUMNS, InvestorProfiles
+from trends import TREND_DIMENSIONS, TREND_MEASURES, UNKNOWN_LABEL, month_ordinals, trend_frame
+
+# Deal column -> SQL column of the deals table
+DEAL_COLUMNS = {
+    'Company Name': 'company_name',
+    'Funding Date': 'funding_date',
+    'Amount': 'amount',
+    'Currency': 'currency',
+    'Funding Stage': 'funding_stage',
+    'Lead Investor(s)': 'lead_investors',
+    'Other Investors': 'other_investors',
+    'Climate Vertical': 'climate_vertical',
+    'Company Description': 'company_description',
+    'Source URL': 'source_url',
+    'Geography': 'geography',
+    'Amount (USD)': 'amount_usd',
+    'Deal Size Category': 'deal_size_category',
+}
+
+SCHEMA = """
+CREATE TABLE deals (
+    id INTEGER PRIMARY KEY,             -- position of the deal in the source file
+    company_name TEXT,
+    funding_date TEXT,                  -- YYYY-MM-DD
+    amount INTEGER NOT NULL,
+    currency TEXT,
+    funding_stage TEXT,
+    lead_investors TEXT,                -- investor lists as written in the source
+    other_investors TEXT,
+    climate_vertical TEXT,
+    company_description TEXT,
+    source_url TEXT,
+    geography TEXT,
+    amount_usd INTEGER,                 -- amount converted at the rate of the funding date, NULL without a rate
+    deal_size_category TEXT
+);
+
+CREATE TABLE investors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE investor_aliases (
+    alias TEXT PRIMARY KEY,             -- raw name, rows in order of first appearance
+    investor_id INTEGER NOT NULL REFERENCES investors (id)
+);
+
+CREATE TABLE deal_investors (
+    deal_id INTEGER NOT NULL REFERENCES deals (id),
+    investor_id INTEGER NOT NULL REFERENCES investors (id),
+    role TEXT NOT NULL CHECK (role IN ('Lead', 'Other')),
+    seq INTEGER NOT NULL,               -- participation order: by deal, lead investors first
+    PRIMARY KEY (deal_id, investor_id)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE company_names USING fts5 (
+    company_name, content = 'deals', content_rowid = 'id', tokenize = 'trigram'
+);
+
+-- Rollup of deal_investors per investor, role and filter values
+CREATE TABLE investor_facets (
+    investor_id INTEGER NOT NULL REFERENCES investors (id),
+    role TEXT NOT NULL,
+    geography TEXT,
+    deal_size_category TEXT,
+    climate_vertical TEXT,
+    funding_stage TEXT,
+    deals INTEGER NOT NULL,
+    amount INTEGER NOT NULL,            -- sum of amount_usd
+    first_seq INTEGER NOT NULL,         -- earliest deal_investors.seq
+    first_deal INTEGER NOT NULL         -- earliest deal id
+);
+
+-- Rollup of dated deals per month and trends.TREND_DIMENSIONS values
+CREATE TABLE funding_trends (
+    month INTEGER NOT NULL,             -- months since January 1970
+    climate_vertical TEXT,
+    funding_stage TEXT,
+    geography TEXT,
+    deals INTEGER NOT NULL,
+    capital INTEGER NOT NULL,           -- sum of amount_usd
+    lead_investors INTEGER NOT NULL     -- lead deal_investors rows
+);
+
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+# Created after the bulk import, which is faster than maintaining them row by row
+INDEXES = """
+CREATE INDEX deals_company_name ON deals (company_name);
+CREATE INDEX deals_funding_date ON deals (funding_date);
+CREATE INDEX deals_funding_stage ON deals (funding_stage);
+CREATE INDEX deals_climate_vertical ON deals (climate_vertical);
+CREATE INDEX deals_geography ON deals (geography);
+CREATE INDEX deals_deal_size_category ON deals (deal_size_category);
+CREATE INDEX deal_investors_investor ON deal_investors (investor_id, seq);
+CREATE INDEX investor_facets_investor ON investor_facets (investor_id);
+"""
+
+_BUILD_FACETS = """
+INSERT INTO investor_facets
+SELECT di.investor_id, di.role, d.geography, d.deal_size_category, d.climate_vertical, d.funding_stage,
+       COUNT(*), COALESCE(SUM(d.amount_usd), 0), MIN(di.seq), MIN(d.id)
+FROM deals d CROSS JOIN deal_investors di ON di.deal_id = d.id
+GROUP BY 1, 2, 3, 4, 5, 6
+"""
+
+_BUILD_TRENDS = """
+INSERT INTO funding_trends
+SELECT (CAST(substr(d.funding_date, 1, 4) AS INTEGER) - 1970) * 12 + CAST(substr(d.funding_date, 6, 2) AS INTEGER) - 1,
+       d.climate_vertical, d.funding_stage, d.geography, COUNT(*), COALESCE(SUM(d.amount_usd), 0),
+       SUM((SELECT COUNT(*) FROM deal_investors di WHERE di.deal_id = d.id AND di.role = 'Lead'))
+FROM deals d
+WHERE d.funding_date IS NOT NULL
+GROUP BY 1, 2, 3, 4
+"""
+
+# Key columns of a funding_trends row, in table order
+_TREND_KEY = ('month',) + tuple(DEAL_COLUMNS[column] for column in TREND_DIMENSIONS)
+
+# Deal columns rolled up in investor_facets (the sidebar filter columns)
+FACET_COLUMNS = ['Geography', 'Deal Size Category', 'Climate Vertical', 'Funding Stage']
+
+# Key columns of an investor_facets row, in table order
+_FACET_KEY = ('investor_id', 'role') + tuple(DEAL_COLUMNS[column] for column in FACET_COLUMNS)
+
+SUMMARY_COLUMNS = ['Investor Name', 'Deals Done', 'Lead Deals', 'Total Invested', 'Preferred Verticals', 'Preferred Stages']
+
+# Totals per investor over the filtered facets, ordered like
+# create_investor_summary: by total invested, ties in order of first appearance
+_SUMMARY_TOTALS = """
+SELECT i.id, i.name, t.deals_done, t.lead_deals, t.total_invested
+FROM (
+    SELECT investor_id, SUM(deals) AS deals_done, SUM(CASE WHEN role = 'Lead' THEN deals ELSE 0 END) AS lead_deals,
+           SUM(amount) AS total_invested, MIN(first_seq) AS first_seen
+    FROM investor_facets
+    WHERE {where}
+    GROUP BY investor_id
+) t JOIN investors i ON i.id = t.investor_id
+ORDER BY t.total_invested DESC, t.first_seen
+"""
+
+# Top 3 verticals and stages per investor by deal count, ties broken by first appearance
+_SUMMARY_PREFERRED = """
+WITH counts AS (
+    SELECT investor_id, 'Climate Vertical' AS kind, climate_vertical AS value, SUM(deals) AS n, MIN(first_deal) AS first_deal
+    FROM investor_facets WHERE ({where}) AND climate_vertical IS NOT NULL GROUP BY investor_id, climate_vertical
+    UNION ALL
+    SELECT investor_id, 'Funding Stage', funding_stage, SUM(deals), MIN(first_deal)
+    FROM investor_facets WHERE ({where}) AND funding_stage IS NOT NULL GROUP BY investor_id, funding_stage
+)
+SELECT investor_id, kind, value FROM (
+    SELECT investor_id, kind, value,
+           ROW_NUMBER() OVER (PARTITION BY investor_id, kind ORDER BY n DESC, first_deal) AS rank
+    FROM counts
+)
+WHERE rank <= 3
+ORDER BY investor_id, kind, rank
+"""
+
+# Co-investors of one investor with the weights of coinvest.CoInvestmentGraph.
+# Investor ids follow first appearance, so ordering by id breaks ties the same way.
+_CO_INVESTORS = """
+SELECT i.name, t.deals, t.lead_deals, t.capital
+FROM (
+    SELECT other.investor_id, COUNT(*) AS deals,
+           SUM(mine.role = 'Lead' AND other.role = 'Lead') AS lead_deals, COALESCE(SUM(d.amount_usd), 0) AS capital
+    FROM deal_investors mine
+    JOIN deal_investors other ON other.deal_id = mine.deal_id AND other.investor_id != mine.investor_id
+    JOIN deals d ON d.id = mine.deal_id
+    WHERE mine.investor_id = (SELECT id FROM investors WHERE name = ?)
+    GROUP BY other.investor_id
+) t JOIN investors i ON i.id = t.investor_id
+ORDER BY t.{weight} DESC, t.investor_id
+LIMIT ?
+"""
+
+# Deal counts per investor and value of each profile column, for similarity.InvestorProfiles
+_PROFILE_COUNTS = " UNION ALL ".join(
+    f"SELECT i.name, '{column}', f.{DEAL_COLUMNS[column]}, SUM(f.deals) "
+    f"FROM investor_facets f JOIN investors i ON i.id = f.investor_id "
+    f"WHERE f.{DEAL_COLUMNS[column]} IS NOT NULL GROUP BY f.investor_id, f.{DEAL_COLUMNS[column]}"
+    for column in PROFILE_COLUMNS
+)
+
+# Deals per investor, in order of first appearance
+_PROFILE_DEALS = """
+SELECT i.name, SUM(f.deals) FROM investor_facets f JOIN investors i ON i.id = f.investor_id
+GROUP BY f.investor_id ORDER BY f.investor_id
+"""
+
+GRAM_SIZE = 3
+
+# Full-text candidates scored for a fuzzy company search
+_FUZZY_CANDIDATES = 500
+
+
+def _grams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(pattern):
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _regexp(pattern, value):
+    # SQL "value REGEXP pattern", matching like pandas str.contains(pattern, case=False)
+    return value is not None and _compile(pattern).search(value) is not None
+
+
+def _lower(value):
+    # Python's lowercasing (SQLite's lower() only folds ASCII)
+    return value.lower() if isinstance(value, str) else value
+
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _sql_values(series):
+    # Column values for sqlite3: None for missing values, ISO strings for dates
+    if pd.api.types.is_datetime64_any_dtype(series):
+        series = series.dt.strftime('%Y-%m-%d')
+    values = series.astype(object)
+    return values.where(series.notna(), None).tolist()
+
+
+def _insert_deals(conn, df):
+    """
+    Insert enriched deals, using the DataFrame index as deal ids.
+
+    Args:
+        conn (sqlite3.Connection): Connection in a transaction
+        df (pd.DataFrame): Output of enrichment.enrich_deals
+    """
+    columns = [column for column in DEAL_COLUMNS if column in df.columns]
+    placeholders = ', '.join('?' * (len(columns) + 1))
+    sql_columns = ', '.join(['id'] + [DEAL_COLUMNS[column] for column in columns])
+    rows = zip(df.index.tolist(), *(_sql_values(df[column]) for column in columns))
+    conn.executemany(f"INSERT INTO deals ({sql_columns}) VALUES ({placeholders})", rows)
+
+
+def _insert_participation(conn, df, aliases, investor_ids, first_seq):
+    """
+    Insert the deal -> investor rows of deals, adding investors and spellings not seen before.
+
+    Args:
+        conn (sqlite3.Connection): Connection in a transaction
+        df (pd.DataFrame): Deals indexed by deal id
+        aliases (InvestorAliases): Resolutions of the names already stored,
+            updated with the new spellings of df
+        investor_ids (dict): Investor name -> id, updated with new investors
+        first_seq (int): Participation order number of the first new row
+
+    Returns:
+        list: Inserted (deal_id, investor_id, role, seq) rows
+    """
+    participation = split_participation(df)
+    new_aliases = aliases.add(pd.unique(participation['Investor']))
+    participation = aliases.canonicalize(participation)
+    names = participation['Investor'].tolist()
+
+    new_names = [name for name in dict.fromkeys(names) if name not in investor_ids]
+    if new_names:
+        conn.executemany("INSERT OR IGNORE INTO investors (name) VALUES (?)", ((name,) for name in new_names))
+        for start in range(0, len(new_names), 500):
+            chunk = new_names[start:start + 500]
+            investor_ids.update(conn.execute(
+                f"SELECT name, id FROM investors WHERE name IN ({', '.join('?' * len(chunk))})", chunk
+            ))
+
+    conn.executemany(
+        "INSERT INTO investor_aliases (alias, investor_id) VALUES (?, ?)",
+        ((alias, investor_ids[aliases.canonical(alias)]) for alias in new_aliases)
+    )
+
+    rows = list(zip(participation['Deal ID'].tolist(), [investor_ids[name] for name in names],
+                    participation['Role'].tolist(), range(first_seq, first_seq + len(names))))
+    conn.executemany("INSERT INTO deal_investors (deal_id, investor_id, role, seq) VALUES (?, ?, ?, ?)", rows)
+    return rows
+
+
+def _add_facet(conn, key, amount, seq, deal_id):
+    """
+    Count one more deal in an investor_facets row, creating the row if the combination is new.
+
+    Args:
+        conn (sqlite3.Connection): Connection in a transaction
+        key (tuple): Values of the _FACET_KEY columns
+        amount (int): USD amount of the deal
+        seq (int): deal_investors.seq of the new participation
+        deal_id (int): Id of the deal
+    """
+    # Compared with IS, so missing values match too
+    where = ' AND '.join(f"{column} IS ?" for column in _FACET_KEY)
+    updated = conn.execute(
+        f"UPDATE investor_facets SET deals = deals + 1, amount = amount + ? WHERE {where}", (amount, *key)
+    ).rowcount
+    if not updated:
+        # Rows are only ever added after existing ones, so first_seq/first_deal of older rows stay valid
+        conn.execute(
+            f"INSERT INTO investor_facets ({', '.join(_FACET_KEY)}, deals, amount, first_seq, first_deal) "
+            f"VALUES ({', '.join('?' * (len(_FACET_KEY) + 4))})",
+            (*key, 1, amount, seq, deal_id)
+        )
+
+
+def _add_trend(conn, key, capital, lead_investors):
+    """
+    Count one more deal in a funding_trends row, creating the row if the combination is new.
+
+    Args:
+        conn (sqlite3.Connection): Connection in a transaction
+        key (tuple): Values of the _TREND_KEY columns
+        capital (int): USD amount of the deal
+        lead_investors (int): Lead investors of the deal
+    """
+    where = ' AND '.join(f"{column} IS ?" for column in _TREND_KEY)
+    updated = conn.execute(
+        f"UPDATE funding_trends SET deals = deals + 1, capital = capital + ?, lead_investors = lead_investors + ? WHERE {where}",
+        (capital, lead_investors, *key)
+    ).rowcount
+    if not updated:
+        conn.execute(
+            f"INSERT INTO funding_trends ({', '.join(_TREND_KEY)}, deals, capital, lead_investors) "
+            f"VALUES ({', '.join('?' * (len(_TREND_KEY) + 3))})",
+            (*key, 1, capital, lead_investors)
+        )
+
+
+def _deal_frame(cursor):
+    # Query result with deals columns -> DataFrame with the compact deals schema
+    names = {sql: column for column, sql in DEAL_COLUMNS.items()}
+    names['role'] = 'Role'
+    columns = [names.get(description[0], description[0]) for description in cursor.description]
+    df = pd.DataFrame(cursor.fetchall(), columns=columns)
+    return apply_deal_schema(df)
+
+
+def import_deals(source_path, db_path, chunk_size=1 << 20):
+    """
+    One-shot import of a deals file (data.json) into a new SQLite database.
+
+    The file is streamed in chunks (see ingest.iter_record_batches) and each
+    chunk is enriched like the app does on load, so memory stays bounded.
+    The database is built under a temporary name and moved into place at the
+    end, replacing any existing database at db_path.
+
+    Args:
+        source_path (str): JSON array, comma-separated objects or NDJSON file
+        db_path (str): Path of the database to create
+        chunk_size (int): Characters read from the source file per chunk
+
+    Returns:
+        dict: 'deals', 'investors' and 'participations' imported
+    """
+    tmp_path = db_path + '.importing'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        aliases = InvestorAliases()
+        investor_ids = {}
+        deals = participations = 0
+
+        with conn:
+            for batch in iter_record_batches(source_path, chunk_size):
+                df = pd.DataFrame.from_records(batch, columns=DEAL_FIELDS)
+                df.index = pd.RangeIndex(deals, deals + len(df))
+                df = enrich_deals(apply_deal_schema(df))
+
+                _insert_deals(conn, df)
+                participations += len(_insert_participation(conn, df, aliases, investor_ids, participations))
+                deals += len(df)
+
+            conn.execute("INSERT INTO meta (key, value) VALUES ('generation', 1)")
+            conn.execute("INSERT INTO meta (key, value) VALUES ('fx_version', ?)", (DEFAULT_FX_TABLE.version,))
+
+        with conn:
+            conn.execute(_BUILD_FACETS)
+            conn.execute(_BUILD_TRENDS)
+            conn.execute("INSERT INTO company_names (company_names) VALUES ('rebuild')")
+        conn.executescript(INDEXES)
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+
+    # Journal files of a replaced database must not be applied to the new one
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.replace(tmp_path, db_path)
+    return {'deals': deals, 'investors': len(investor_ids), 'participations': participations}
+
+
+class SQLiteDealStore:
+    """
+    Deal queries and appends against a database created by import_deals.
+
+    Safe to share between threads: each thread reads through its own
+    connection, and appends use a short-lived write transaction.
+    """
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path (str): Path of an existing database (it is never created here)
+        """
+        self.db_path = os.path.abspath(db_path)
+        self._local = threading.local()
+        self._filter_values = {}
+        # (generation, InvestorProfiles) of the latest generation queried
+        self._profiles = None
+        # (generation, InvestorAliases) of the latest generation appended to
+        self._aliases = None
+
+    def _connect(self, readonly=True):
+        if readonly:
+            conn = getattr(self._local, 'conn', None)
+            if conn is not None:
+                return conn
+
+        # mode=rw fails on a missing file instead of creating an empty database
+        conn = sqlite3.connect(f"file:{quote(self.db_path)}?mode=rw", uri=True, timeout=30, isolation_level=None)
+        conn.create_function('regexp', 2, _regexp, deterministic=True)
+        conn.create_function('py_lower', 1, _lower, deterministic=True)
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+        return conn
+
+    def generation(self):
+        """
+        Returns:
+            int: Counter incremented by every write to the database
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened or was not created by import_deals
+        """
+        return self._connect().execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+
+    @property
+    def fingerprint(self):
+        """Hashable key of the current database content, for result caches."""
+        return (self.db_path, self.generation())
+
+    def is_empty(self):
+        """
+        Returns:
+            bool: True if the database has no deals
+        """
+        return self._connect().execute("SELECT NOT EXISTS (SELECT 1 FROM deals)").fetchone()[0] == 1
+
+    def filter_values(self, column):
+        """
+        Distinct values of a deal column, in order of first appearance.
+
+        Args:
+            column (str): Deal column (a key of DEAL_COLUMNS)
+
+        Returns:
+            list: Values, None for missing values
+        """
+        key = (self.generation(), column)
+        values = self._filter_values.get(key)
+        if values is None:
+            sql_column = DEAL_COLUMNS[column]
+            rows = self._connect().execute(f"SELECT {sql_column} FROM deals GROUP BY {sql_column} ORDER BY MIN(id)")
+            values = [row[0] for row in rows]
+            # Only the current generation is worth keeping
+            self._filter_values = {k: v for k, v in self._filter_values.items() if k[0] == key[0]}
+            self._filter_values[key] = values
+        return values
+
+    def last_updated(self):
+        """
+        Returns:
+            pd.Timestamp: Latest funding date (NaT if there is none)
+        """
+        return pd.to_datetime(self._connect().execute("SELECT MAX(funding_date) FROM deals").fetchone()[0])
+
+    def _filtered_where(self, filters, lead_only, investor_search):
+        # WHERE clause and parameters selecting the investor_facets rows of the filtered deals
+        clauses, params = [], []
+        for column, values in (filters or {}).items():
+            if values is None or len(values) == 0:
+                continue
+            sql_column = DEAL_COLUMNS[column]
+            present = [value for value in values if not pd.isna(value)]
+            terms = [f"{sql_column} IN ({', '.join('?' * len(present))})"] if present else []
+            if len(present) < len(values):
+                terms.append(f"{sql_column} IS NULL")
+            clauses.append('(' + ' OR '.join(terms) + ')')
+            params.extend(present)
+
+        if lead_only:
+            clauses.append("role = 'Lead'")
+        if investor_search:
+            clauses.append("investor_id IN (SELECT id FROM investors WHERE name REGEXP ?)")
+            params.append(investor_search)
+
+        return ' AND '.join(clauses) or '1', params
+
+    def investor_summary(self, lead_only=False, filters=None, investor_search=''):
+        """
+        Summarize investors over the deals matching the sidebar filters, in SQL.
+
+        Args:
+            lead_only (bool): If True, only include lead roles
+            filters (dict): Deal column -> allowed values; None or an empty
+                list leaves the column unfiltered (as for BitmapIndex.select)
+            investor_search (str): Keep investors whose name matches this
+                pattern (case-insensitive, like str.contains)
+
+        Returns:
+            pd.DataFrame: Same columns and order as create_investor_summary
+        """
+        where, params = self._filtered_where(filters, lead_only, investor_search)
+        conn = self._connect()
+
+        totals = conn.execute(_SUMMARY_TOTALS.format(where=where), params).fetchall()
+        if not totals:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+        preferred = {}
+        # The filter appears once per facet column in the query
+        for investor_id, kind, value in conn.execute(_SUMMARY_PREFERRED.format(where=where), params * 2):
+            preferred.setdefault((investor_id, kind), []).append(value)
+
+        return pd.DataFrame(
+            [
+                (name, deals_done, lead_deals, total_invested,
+                 ', '.join(preferred.get((investor_id, 'Climate Vertical'), [])),
+                 ', '.join(preferred.get((investor_id, 'Funding Stage'), [])))
+                for investor_id, name, deals_done, lead_deals, total_invested in totals
+            ],
+            columns=SUMMARY_COLUMNS
+        )
+
+    def investor_deals(self, investor_name):
+        """
+        Args:
+            investor_name (str): Name of the investor
+
+        Returns:
+            pd.DataFrame: The investor's deals in deal order, with a 'Role'
+                column (empty if the investor is unknown)
+        """
+        cursor = self._connect().execute(
+            """
+            SELECT d.*, di.role
+            FROM investors i
+            JOIN deal_investors di ON di.investor_id = i.id
+            JOIN deals d ON d.id = di.deal_id
+            WHERE i.name = ?
+            ORDER BY di.seq
+            """,
+            (investor_name,)
+        )
+        df = _deal_frame(cursor)
+        return df.drop(columns='id') if not df.empty else pd.DataFrame()
+
+    def _investor_aliases(self, conn):
+        # Read from investor_aliases once per generation; this store's own appends update it in place
+        generation = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+        cached = self._aliases
+        if cached is None or cached[0] != generation:
+            rows = conn.execute(
+                "SELECT a.alias, i.name FROM investor_aliases a JOIN investors i ON i.id = a.investor_id ORDER BY a.rowid"
+            ).fetchall()
+            cached = (generation, InvestorAliases([alias for alias, _ in rows], [name for _, name in rows]))
+            self._aliases = cached
+        return cached[1]
+
+    def investor_aliases(self, investor_name):
+        """
+        Args:
+            investor_name (str): Canonical name of the investor
+
+        Returns:
+            list: Spellings of the name found in the data, in order of first appearance
+        """
+        rows = self._connect().execute(
+            """
+            SELECT a.alias FROM investors i JOIN investor_aliases a ON a.investor_id = i.id
+            WHERE i.name = ? ORDER BY a.rowid
+            """,
+            (investor_name,)
+        )
+        return [alias for alias, in rows]
+
+    def co_investors(self, investor_name, k=10, by="Shared Deals"):
+        """
+        Find the investors that co-invest most with an investor.
+
+        The investor's deals are read through the deal_investors index, so
+        the cost depends on the investor's deals, not on the table size.
+
+        Args:
+            investor_name (str): Name of the investor
+            k (int): Maximum number of co-investors
+            by (str): Ranking, a key of coinvest.CO_INVESTOR_WEIGHTS
+
+        Returns:
+            pd.DataFrame: Same columns and order as CoInvestmentGraph.top_co_investors
+        """
+        rows = self._connect().execute(_CO_INVESTORS.format(weight=CO_INVESTOR_WEIGHTS[by]), (investor_name, k)).fetchall()
+        return pd.DataFrame(rows, columns=CO_INVESTOR_COLUMNS)
+
+    def _investor_profiles(self):
+        # Built from investor_facets once per generation; this store's own appends update it in place
+        generation = self.generation()
+        cached = self._profiles
+        if cached is None or cached[0] != generation:
+            conn = self._connect()
+            deals_done = pd.DataFrame(conn.execute(_PROFILE_DEALS).fetchall(), columns=['Investor', 'Deals'])
+            counts = pd.DataFrame(conn.execute(_PROFILE_COUNTS).fetchall(), columns=['Investor', 'Column', 'Value', 'Deals'])
+            cached = (generation, InvestorProfiles(deals_done.set_index('Investor')['Deals'], counts))
+            self._profiles = cached
+        return cached[1]
+
+    def similar_investors(self, investor_name, k=10):
+        """
+        Args:
+            investor_name (str): Name of the investor
+            k (int): Maximum number of investors
+
+        Returns:
+            pd.DataFrame: Most similar investors (see InvestorProfiles.similar_investors)
+        """
+        return self._investor_profiles().similar_investors(investor_name, k)
+
+    def match_investors(self, profile, k=10):
+        """
+        Args:
+            profile (dict): similarity.PROFILE_COLUMNS -> wanted values
+            k (int): Maximum number of investors
+
+        Returns:
+            pd.DataFrame: Best matching investors (see InvestorProfiles.match_profile)
+        """
+        return self._investor_profiles().match_profile(profile, k)
+
+    def trend_months(self):
+        """
+        Returns:
+            tuple: (first, last) month numbers with dated deals, (0, -1) if there are none
+        """
+        first, last = self._connect().execute("SELECT MIN(month), MAX(month) FROM funding_trends").fetchone()
+        return (first, last) if first is not None else (0, -1)
+
+    def funding_trends(self, measure='Deals', filters=None, by=None, start=None, end=None):
+        """
+        Monthly totals of a measure over the deals matching filters, from funding_trends.
+
+        Args:
+            measure (str): A key of trends.TREND_MEASURES
+            filters (dict): trends.TREND_DIMENSIONS -> values to keep; None or
+                an empty list leaves the column unfiltered
+            by (str): Dimension to split into one series per value
+            start (int): First month number shown (default: first month with deals)
+            end (int): Last month number shown (default: last month with deals)
+
+        Returns:
+            pd.DataFrame: Same table as trends.FundingCube.trend
+        """
+        first, last = self.trend_months()
+        first = first if start is None else max(first, start)
+        last = last if end is None else min(last, end)
+
+        where, params = self._filtered_where(filters, False, '')
+        group = DEAL_COLUMNS[by] if by is not None else 'NULL'
+        rows = self._connect().execute(
+            f"SELECT month, {group}, SUM({TREND_MEASURES[measure]}) FROM funding_trends "
+            f"WHERE month BETWEEN ? AND ? AND {where} GROUP BY 1, 2",
+            [first, last, *params]
+        ).fetchall()
+
+        months = [row[0] for row in rows]
+        amounts = [row[2] for row in rows]
+        if by is None:
+            return trend_frame(months, amounts, first, last, measure)
+        labels = [UNKNOWN_LABEL if row[1] is None else row[1] for row in rows]
+        return trend_frame(months, amounts, first, last, measure, range(len(labels)), labels)
+
+    def search_companies(self, query, fuzzy=False, threshold=0.3, limit=20):
+        """
+        Find deals by company name.
+
+        Literal matching is a case-insensitive substring match served by the
+        trigram index (queries shorter than a trigram scan the names). Fuzzy
+        matching scores the names sharing the most trigrams with the query by
+        the same similarity as search_index.CompanySearchIndex.
+
+        Args:
+            query (str): Search text
+            fuzzy (bool): Rank names by trigram similarity instead of requiring
+                a literal substring match
+            threshold (float): Minimum similarity for fuzzy matches (0-1)
+            limit (int): Maximum number of distinct names for fuzzy matches
+
+        Returns:
+            pd.DataFrame: Matching deals, in deal order for literal matches and
+                by similarity for fuzzy matches
+        """
+        query = query.lower()
+        conn = self._connect()
+        if not query:
+            return _deal_frame(conn.execute("SELECT * FROM deals WHERE 0")).drop(columns='id')
+
+        if not fuzzy:
+            if len(query) < GRAM_SIZE:
+                cursor = conn.execute("SELECT * FROM deals WHERE instr(py_lower(company_name), ?) > 0 ORDER BY id", (query,))
+            else:
+                cursor = conn.execute(
+                    """
+                    SELECT d.* FROM company_names JOIN deals d ON d.id = company_names.rowid
+                    WHERE company_names MATCH ? AND instr(py_lower(d.company_name), ?) > 0
+                    ORDER BY d.id
+                    """,
+                    (_fts_phrase(query), query)
+                )
+            return _deal_frame(cursor).drop(columns='id')
+
+        # Names sharing any trigram with the query, best full-text rank first
+        grams = _grams(query)
+        candidates = conn.execute(
+            "SELECT rowid, company_name FROM company_names WHERE company_names MATCH ? ORDER BY rank LIMIT ?",
+            (' OR '.join(_fts_phrase(gram) for gram in grams), _FUZZY_CANDIDATES)
+        ).fetchall() if grams else []
+
+        # Score distinct names in table order, so ties rank like CompanySearchIndex
+        query_grams = _grams(f" {query} ")
+        scores = {}
+        for _, name in sorted(candidates):
+            if name not in scores:
+                name_grams = _grams(f" {name.lower()} ")
+                shared = len(query_grams & name_grams)
+                scores[name] = shared / (len(query_grams) + len(name_grams) - shared)
+
+        ranked = sorted((name for name in scores if scores[name] >= threshold), key=lambda name: -scores[name])[:limit]
+        if not ranked:
+            return _deal_frame(conn.execute("SELECT * FROM deals WHERE 0")).drop(columns='id')
+
+        cursor = conn.execute(
+            f"SELECT * FROM deals WHERE company_name IN ({', '.join('?' * len(ranked))}) ORDER BY id", ranked
+        )
+        df = _deal_frame(cursor)
+        rank = df['Company Name'].astype(object).map({name: i for i, name in enumerate(ranked)})
+        return df.iloc[rank.argsort(kind='stable')].drop(columns='id').reset_index(drop=True)
+
+    def append(self, record):
+        """
+        Validate a deal and add it, unless a deal with the same company,
+        funding date and amount exists.
+
+        Args:
+            record (dict): Deal in the data.json schema
+
+        Returns:
+            bool: True if the deal was added, False if it was a duplicate
+
+        Raises:
+            ValueError: If the record is invalid
+        """
+        deal = validate_deal(record)
+        key = deal_key(deal['Company Name'], deal['Funding Date'], deal['Amount'])
+
+        conn = self._connect(readonly=False)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            same_day = conn.execute(
+                "SELECT company_name FROM deals WHERE funding_date = ? AND amount = ?",
+                (deal['Funding Date'], deal['Amount'])
+            )
+            if any(deal_key(name, deal['Funding Date'], deal['Amount']) == key for name, in same_day):
+                conn.execute("ROLLBACK")
+                return False
+
+            deal_id = conn.execute("SELECT COALESCE(MAX(id), -1) + 1 FROM deals").fetchone()[0]
+            next_seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM deal_investors WHERE deal_id = (SELECT MAX(deal_id) FROM deal_investors)"
+            ).fetchone()[0]
+
+            # Enrich the new row exactly like a full import would
+            row = enrich_deals(apply_deal_schema(pd.DataFrame([deal], index=[deal_id])))
+            _insert_deals(conn, row)
+            conn.execute("INSERT INTO company_names (rowid, company_name) VALUES (?, ?)", (deal_id, deal['Company Name']))
+            investor_ids = {}
+            aliases = self._investor_aliases(conn)
+            participation = _insert_participation(conn, row, aliases, investor_ids, next_seq)
+            facet_values = [_sql_values(row[column])[0] for column in FACET_COLUMNS]
+            # A deal without a USD amount counts as a deal but adds no capital, like SUM over NULL
+            amount_usd = row['Amount (USD)'].fillna(0).iloc[0]
+            for _, investor_id, role, seq in participation:
+                _add_facet(conn, (investor_id, role, *facet_values), int(amount_usd), seq, deal_id)
+            if pd.notna(row['Funding Date'].iloc[0]):
+                month = int(month_ordinals(row['Funding Date'])[0])
+                trend_values = [_sql_values(row[column])[0] for column in TREND_DIMENSIONS]
+                lead_investors = sum(role == 'Lead' for _, _, role, _ in participation)
+                _add_trend(conn, (month, *trend_values), int(amount_usd), lead_investors)
+            generation = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            conn.execute("COMMIT")
+            self._aliases = (generation + 1, aliases)
+
+            # Bring cached investor profiles of the previous generation up to date
+            cached = self._profiles
+            if cached is not None and cached[0] == generation:
+                names = {investor_id: name for name, investor_id in investor_ids.items()}
+                values = dict(zip(FACET_COLUMNS, facet_values))
+                investors = [names[investor_id] for _, investor_id, _, _ in participation]
+                self._profiles = (generation + 1, cached[1].appended(values, investors))
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+                # The cached aliases may hold spellings that were rolled back
+                self._aliases = None
+            raise
+        finally:
+            conn.close()
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a deals file into a new SQLite database.")
+    parser.add_argument('source', help='Deals file (JSON array, comma-separated objects or NDJSON)')
+    parser.add_argument('database', help='SQLite database to create (replaced if it exists)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = import_deals(args.source, args.database)
+    seconds = time.perf_counter() - start
+    print(f"{counts['deals']:,} deals, {counts['investors']:,} investors and "
+          f"{counts['participations']:,} deal/investor rows imported into {args.database} in {seconds:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
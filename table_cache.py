@@ -0,0 +1,352 @@
+"""
+Columnar binary cache of the enriched deals table.
+
+A table is stored as a directory of .npy files plus a meta.json schema:
+
+- numeric, boolean and datetime columns are saved as-is and memory-mapped on load
+- nullable integer columns (e.g. Int64) are saved as their values and missing
+  mask, both memory-mapped on load
+- pyarrow-backed string columns (the pandas "str" dtype) are saved as their
+  Arrow buffers (UTF-8 data, offsets and validity bitmap) and memory-mapped
+  on load, so every process reading the table shares one copy of the text
+- other string columns are dictionary-encoded: int32 codes (memory-mapped)
+  plus the distinct values as one UTF-8 blob with offsets
+- categorical columns store their codes and string categories the same way
+
+Directories are written under a temporary name and renamed into place, so a
+reader never sees a half-written table. Tables that cannot be encoded (e.g.
+columns holding lists or mixed types) are simply not cached.
+
+Processes serving the same data file coordinate through a generation record
+next to its tables: whoever finds the file changed takes the file's publish
+lock, builds and writes the tables once and bumps the generation; the other
+processes wait for the lock and then map the published tables.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # string columns are then dictionary-encoded and copied on load
+    pa = None
+
+try:
+    import fcntl
+except ImportError:  # no cross-process lock: concurrent first loads each build the tables
+    fcntl = None
+
+FORMAT_VERSION = 2
+CACHE_DIR_NAME = '.fundsrus_cache'
+
+# Hex digits of the key in a table directory name
+KEY_LENGTH = 24
+
+
+def table_cache_path(source_path, content_hash, version):
+    """
+    Return the cache directory for a source file's content and pipeline version.
+
+    Args:
+        source_path (str): Path of the source data file
+        content_hash (str): Hash of the source file contents
+        version (str): Version of the code that produced the table
+
+    Returns:
+        str: Directory path (may not exist yet)
+    """
+    source_path = os.path.abspath(source_path)
+    key = hashlib.sha256(f"{FORMAT_VERSION}:{content_hash}:{version}".encode()).hexdigest()[:KEY_LENGTH]
+    return os.path.join(os.path.dirname(source_path), CACHE_DIR_NAME, f"{os.path.basename(source_path)}-{key}")
+
+
+def _is_string_column(series):
+    if not (series.dtype == object or isinstance(series.dtype, pd.StringDtype)):
+        return False
+    values = series.dropna()
+    return bool(values.map(type).eq(str).all()) if len(values) else True
+
+
+def _save_strings(directory, name, values):
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(os.path.join(directory, f"{name}.offsets.npy"), offsets)
+    with open(os.path.join(directory, f"{name}.blob"), 'wb') as file:
+        file.write(b''.join(encoded))
+
+
+def _is_arrow_string_column(series):
+    dtype = series.dtype
+    return pa is not None and isinstance(dtype, pd.StringDtype) and dtype.storage == 'pyarrow'
+
+
+def _save_arrow_strings(directory, name, series):
+    array = pa.array(series.array)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    offset_type = np.int64 if pa.types.is_large_string(array.type) else np.int32
+
+    # Offsets of a sliced array point into its parent's data, which is saved whole
+    offsets = np.frombuffer(array.buffers()[1], dtype=offset_type)[array.offset:array.offset + len(array) + 1]
+    data = np.frombuffer(array.buffers()[2], dtype=np.uint8) if array.buffers()[2] is not None else np.zeros(0, dtype=np.uint8)
+    np.save(os.path.join(directory, f"{name}.offsets.npy"), offsets)
+    np.save(os.path.join(directory, f"{name}.data.npy"), data)
+    if array.null_count:
+        valid = ~array.is_null().to_numpy(zero_copy_only=False)
+        np.save(os.path.join(directory, f"{name}.valid.npy"), np.packbits(valid, bitorder='little'))
+    return {'arrow_type': str(array.type), 'null_count': array.null_count}
+
+
+def _load_arrow_strings(directory, column, rows):
+    # Arrow buffers over the memory-mapped files: nothing is copied
+    name = column['file']
+    buffers = [None]
+    if column['null_count']:
+        buffers[0] = pa.py_buffer(np.load(os.path.join(directory, f"{name}.valid.npy"), mmap_mode='r'))
+    for suffix in ('offsets', 'data'):
+        buffers.append(pa.py_buffer(np.load(os.path.join(directory, f"{name}.{suffix}.npy"), mmap_mode='r')))
+
+    arrow_type = pa.large_string() if column['arrow_type'] == 'large_string' else pa.string()
+    array = pa.Array.from_buffers(arrow_type, rows, buffers, null_count=column['null_count'])
+    return pd.array(array, dtype=pd.StringDtype('pyarrow', na_value=np.nan))
+
+
+def _load_strings(directory, name):
+    offsets = np.load(os.path.join(directory, f"{name}.offsets.npy"))
+    with open(os.path.join(directory, f"{name}.blob"), 'rb') as file:
+        blob = file.read()
+    return [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+
+def write_table(df, path):
+    """
+    Write a DataFrame to a columnar cache directory.
+
+    Args:
+        df (pd.DataFrame): Table with a default RangeIndex
+        path (str): Target directory from table_cache_path
+
+    Returns:
+        bool: True if the table was written (or already present)
+    """
+    if os.path.isdir(path):
+        return True
+    if not df.index.equals(pd.RangeIndex(len(df))) or not df.columns.is_unique:
+        return False
+
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix='.tmp-', dir=parent)
+
+    try:
+        columns = []
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            stem = f"c{i}"
+            column = {'name': name, 'file': stem, 'dtype': str(series.dtype)}
+
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                categories = series.cat.categories
+                if not all(isinstance(value, str) for value in categories):
+                    return False
+                column['kind'] = 'categorical'
+                column['ordered'] = bool(series.cat.ordered)
+                column['categories_dtype'] = str(categories.dtype)
+                np.save(os.path.join(tmp, f"{stem}.npy"), series.cat.codes.to_numpy(dtype=np.int32))
+                _save_strings(tmp, stem, list(categories))
+            elif series.dtype.kind in 'biufmM' and not isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+                column['kind'] = 'array'
+                np.save(os.path.join(tmp, f"{stem}.npy"), series.to_numpy())
+            elif isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(series.dtype):
+                column['kind'] = 'masked'
+                np.save(os.path.join(tmp, f"{stem}.npy"), series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0))
+                np.save(os.path.join(tmp, f"{stem}.mask.npy"), series.isna().to_numpy())
+            elif _is_arrow_string_column(series) and series.dtype.na_value is np.nan:
+                column['kind'] = 'utf8'
+                column.update(_save_arrow_strings(tmp, stem, series))
+            elif _is_string_column(series):
+                codes, uniques = pd.factorize(series)
+                column['kind'] = 'strings'
+                np.save(os.path.join(tmp, f"{stem}.npy"), codes.astype(np.int32))
+                _save_strings(tmp, stem, list(uniques))
+            else:
+                return False
+
+            columns.append(column)
+
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as file:
+            json.dump({'format_version': FORMAT_VERSION, 'rows': len(df), 'columns': columns}, file)
+
+        # Publish atomically; if another process got there first keep its copy
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+        return True
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def read_table(path):
+    """
+    Read a cached table, memory-mapping its fixed-width and Arrow string columns.
+
+    Args:
+        path (str): Directory written by write_table
+
+    Returns:
+        pd.DataFrame: The cached table, or None if missing or unreadable
+    """
+    try:
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        if meta.get('format_version') != FORMAT_VERSION:
+            return None
+
+        data = {}
+        for column in meta['columns']:
+            stem = column['file']
+            if column['kind'] == 'utf8':
+                if pa is None:
+                    return None
+                data[column['name']] = pd.Series(_load_arrow_strings(path, column, meta['rows']), copy=False)
+                continue
+
+            # A plain ndarray view keeps the data memory-mapped without the memmap subclass
+            codes = np.load(os.path.join(path, f"{stem}.npy"), mmap_mode='r').view(np.ndarray)
+
+            if column['kind'] == 'array':
+                data[column['name']] = pd.Series(codes, copy=False)
+            elif column['kind'] == 'masked':
+                mask = np.load(os.path.join(path, f"{stem}.mask.npy"), mmap_mode='r').view(np.ndarray)
+                data[column['name']] = pd.Series(pd.arrays.IntegerArray(codes, mask), copy=False)
+            elif column['kind'] == 'categorical':
+                categories = pd.Index(_load_strings(path, stem), dtype=column['categories_dtype'])
+                data[column['name']] = pd.Series(pd.Categorical.from_codes(
+                    codes, categories=categories, ordered=column['ordered']
+                ))
+            else:
+                # Missing values (code -1) map to a trailing NaN
+                uniques = np.array(_load_strings(path, stem) + [np.nan], dtype=object)
+                values = uniques[np.where(codes < 0, len(uniques) - 1, codes)]
+                data[column['name']] = pd.Series(values, dtype=column['dtype'])
+
+        df = pd.DataFrame(data, index=pd.RangeIndex(meta['rows']), copy=False)
+        return df if len(df) == meta['rows'] else None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def purge_stale_tables(path):
+    """
+    Remove cached tables for the same source file other than the given one.
+
+    Args:
+        path (str): Directory of the current table (from table_cache_path)
+    """
+    parent = os.path.dirname(path)
+    # Only "<source basename>-<key>": other files' names may extend this one (data.json-backup.json)
+    stem = os.path.basename(path)[:-(KEY_LENGTH + 1)]
+    pattern = re.compile(re.escape(stem) + f"-[0-9a-f]{{{KEY_LENGTH}}}")
+    try:
+        entries = os.listdir(parent)
+    except OSError:
+        return
+    for entry in entries:
+        if pattern.fullmatch(entry) and os.path.join(parent, entry) != path:
+            shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
+
+
+def _generation_path(source_path):
+    source_path = os.path.abspath(source_path)
+    return os.path.join(os.path.dirname(source_path), CACHE_DIR_NAME, f"{os.path.basename(source_path)}.generation")
+
+
+@contextlib.contextmanager
+def publish_lock(source_path):
+    """
+    Hold the cross-process lock on publishing a data file's tables.
+
+    Only one process at a time loads a changed file and writes its tables;
+    the lock is not re-entrant, even within one process. Without fcntl, or if
+    the cache directory cannot be written, nothing is locked.
+
+    Args:
+        source_path (str): Path of the source data file
+    """
+    try:
+        os.makedirs(os.path.dirname(_generation_path(source_path)), exist_ok=True)
+        file = open(_generation_path(source_path) + '.lock', 'a')
+    except OSError:
+        file = None
+
+    if file is None or fcntl is None:
+        yield
+        return
+
+    with file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def read_generation(source_path):
+    """
+    Read the generation record of a data file.
+
+    Args:
+        source_path (str): Path of the source data file
+
+    Returns:
+        dict: 'generation' (incremented on every content change), 'sha256',
+            'mtime_ns' and 'size' of the content last published, or None
+    """
+    try:
+        with open(_generation_path(source_path), 'r', encoding='utf-8') as file:
+            record = json.load(file)
+        return record if {'generation', 'sha256', 'mtime_ns', 'size'} <= record.keys() else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def publish_generation(source_path, fingerprint):
+    """
+    Record the content of a data file, bumping its generation if the content changed.
+
+    The record is replaced atomically. Call with publish_lock held.
+
+    Args:
+        source_path (str): Path of the source data file
+        fingerprint (tuple): (path, mtime in ns, size, SHA-256 hex digest) of the file
+
+    Returns:
+        int: Generation of the content (0 if the record cannot be written)
+    """
+    record = read_generation(source_path)
+    if record is None:
+        generation = 1
+    elif record['sha256'] == fingerprint[3]:
+        generation = record['generation']
+    else:
+        generation = record['generation'] + 1
+    path = _generation_path(source_path)
+
+    try:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(path), prefix='.tmp-', delete=False) as file:
+            json.dump({'generation': generation, 'sha256': fingerprint[3], 'mtime_ns': fingerprint[1], 'size': fingerprint[2]}, file)
+        os.replace(file.name, path)
+    except OSError:
+        return 0
+    return generation
+
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from api_server import InvestorApi
+
+
+@pytest.fixture
+def api(tmp_path):
+    source = tmp_path / 'deals.json'
+    source.write_text(json.dumps([{
+        'Company Name': 'Solaris Power', 'Funding Date': '2024-01-10', 'Amount': 5_000_000, 'Currency': 'USD',
+        'Funding Stage': 'Seed', 'Lead Investor(s)': 'Green Fund', 'Other Investors': 'Blue Ventures',
+        'Climate Vertical': 'Energy', 'Company Description': 'x', 'Source URL': 'https://example.com/1',
+    }]), encoding='utf-8')
+    return InvestorApi(str(source))
+
+
+@pytest.mark.parametrize('header', [
+    '{etag}',
+    'W/{etag}',
+    '"other", {etag}',
+    '"other",{etag}',
+    '"other" ,\tW/{etag} ',
+    '*',
+])
+def test_if_none_match_returns_not_modified(api, header):
+    status, etag, _, _ = api.respond('/investors')
+    assert status == 200
+
+    assert api.respond('/investors', header.format(etag=etag))[0] == 304
+
+
+@pytest.mark.parametrize('header', ['"other"', 'W/"other", "another"', ''])
+def test_if_none_match_with_other_tags_returns_the_body(api, header):
+    status, _, body, _ = api.respond('/investors', header)
+
+    assert status == 200
+    assert json.loads(b''.join(body))['items'][0]['Investor Name'] in ('Green Fund', 'Blue Ventures')
@@ -0,0 +1,149 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from article_fetcher import ArticleCache, ArticleFetcher, FundingExtractor, deal_record, make_session
+from batch_extract import run_batch
+
+ARTICLE = b"<html><body><p>Acme raised $5M.</p><p>Led by Green Fund.</p></body></html>"
+
+EXTRACTION = {
+    'companyName': 'Acme', 'fundingDate': '2024-03-01', 'amount': 5000000, 'currency': 'usd',
+    'fundingStage': 'Seed', 'leadInvestors': ['Green Fund'], 'otherInvestors': [],
+    'climateVertical': 'Energy', 'companyDescription': 'Batteries',
+}
+
+
+@pytest.fixture
+def server():
+    """Local HTTP server answering /article* with ARTICLE and anything else with 404."""
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            if self.path.startswith('/article'):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(ARTICLE)))
+                self.end_headers()
+                self.wfile.write(ARTICLE)
+            else:
+                self.send_error(404)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", requests_seen
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class StubClient:
+    """Model client exposing chat.completions.create that replies with a fixed JSON object."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages):
+        self.calls.append(messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(self.reply)))])
+
+
+def test_fetch_reuses_cached_content_on_refetch(server, tmp_path):
+    base, requests_seen = server
+    fetcher = ArticleFetcher(session=make_session(retries=0), cache=ArticleCache(str(tmp_path)))
+
+    article = fetcher.fetch(base + '/article/1')
+    again = fetcher.fetch(base + '/article/1')
+
+    assert article.html == ARTICLE
+    assert article.text == 'Acme raised $5M. Led by Green Fund.'
+    assert again == article
+    assert requests_seen == ['/article/1']
+
+    fetcher.fetch(base + '/article/1', refresh=True)
+    assert requests_seen == ['/article/1', '/article/1']
+
+
+def test_fetch_raises_on_error_status_and_does_not_cache(server, tmp_path):
+    base, requests_seen = server
+    fetcher = ArticleFetcher(session=make_session(retries=0), cache=ArticleCache(str(tmp_path)))
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            fetcher.fetch(base + '/missing')
+    assert requests_seen == ['/missing', '/missing']
+
+
+def test_extraction_is_cached_by_content_model_and_prompt(server, tmp_path):
+    base, _ = server
+    cache = ArticleCache(str(tmp_path))
+    fetcher = ArticleFetcher(session=make_session(retries=0), cache=cache)
+    client = StubClient(EXTRACTION)
+
+    # Two URLs with the same content share one extraction
+    first = fetcher.fetch(base + '/article/1')
+    second = fetcher.fetch(base + '/article/2')
+    extractor = FundingExtractor(cache=cache)
+    assert extractor.extract(first, client) == EXTRACTION
+    assert extractor.extract(second, client) == EXTRACTION
+    assert len(client.calls) == 1
+    assert client.calls[0][1]['content'] == first.text
+
+    # Another model or prompt is a different key and calls the model again
+    key = extractor.extraction_key(first)
+    assert key == extractor.extraction_key(second)
+    assert FundingExtractor(cache=cache, model='other-model').extraction_key(first) != key
+    assert FundingExtractor(cache=cache, prompt='Other prompt').extraction_key(first) != key
+    FundingExtractor(cache=cache, model='other-model').extract(first, client)
+    assert len(client.calls) == 2
+
+
+def test_extract_rejects_a_reply_that_is_not_an_object(server, tmp_path):
+    base, _ = server
+    article = ArticleFetcher(session=make_session(retries=0)).fetch(base + '/article/1')
+
+    with pytest.raises(ValueError):
+        FundingExtractor().extract(article, StubClient(['not', 'an', 'object']))
+
+
+def test_deal_record_maps_extraction_to_data_json_schema():
+    record = deal_record(dict(EXTRACTION, otherInvestors=[' Blue Ventures ', '', None], leadInvestors='Green Fund'), 'https://example.com/a')
+
+    assert record == {
+        'Company Name': 'Acme', 'Funding Date': '2024-03-01', 'Amount': 5000000, 'Currency': 'usd',
+        'Funding Stage': 'Seed', 'Lead Investor(s)': 'Green Fund', 'Other Investors': 'Blue Ventures',
+        'Climate Vertical': 'Energy', 'Company Description': 'Batteries', 'Source URL': 'https://example.com/a',
+    }
+    assert deal_record({}, 'u')['Lead Investor(s)'] == 'Not specified'
+
+
+def test_run_batch_writes_valid_deals_and_logs_failures(server, tmp_path):
+    base, _ = server
+    cache = ArticleCache(str(tmp_path / 'cache'))
+    fetcher = ArticleFetcher(session=make_session(retries=0), cache=cache)
+    output = str(tmp_path / 'deals.ndjson')
+    urls = [base + '/article/1', base + '/missing']
+
+    stats = run_batch(urls, output, fetcher, FundingExtractor(cache=cache), StubClient(EXTRACTION), workers=2, retries=0)
+
+    assert (stats['succeeded'], stats['failed']) == (1, 1)
+    with open(output, encoding='utf-8') as file:
+        deals = [json.loads(line) for line in file]
+    assert [deal['Source URL'] for deal in deals] == [base + '/article/1']
+    assert deals[0]['Currency'] == 'USD'
+    with open(output + '.errors.ndjson', encoding='utf-8') as file:
+        assert [json.loads(line)['url'] for line in file] == [base + '/missing']
+
+    # Rerunning skips the URL already written
+    assert run_batch(urls, output, fetcher, FundingExtractor(cache=cache), StubClient(EXTRACTION), retries=0)['skipped'] == 1
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from deal_store import append_deal_to_file, deal_key, validate_deal
+from ingest import read_deals
+
+
+def make_deal(i, **fields):
+    return validate_deal(dict({
+        'Company Name': f"Company {i}", 'Funding Date': '2024-01-15', 'Amount': 1_000_000 * (i + 1),
+        'Currency': 'USD', 'Funding Stage': 'Seed', 'Lead Investor(s)': f"Fund {i}",
+        'Other Investors': 'Not specified', 'Climate Vertical': 'Energy',
+        'Company Description': 'Zürich based', 'Source URL': f"https://example.com/{i}",
+    }, **fields))
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def appended_text(path, deal):
+    append_deal_to_file(path, deal)
+    with open(path, encoding='utf-8') as file:
+        return file.read()
+
+
+def test_append_to_json_array(tmp_path):
+    deals = [make_deal(0), make_deal(1)]
+    path = write(tmp_path / 'deals.json', json.dumps(deals, indent=4) + '\n')
+
+    text = appended_text(path, make_deal(2))
+
+    assert json.loads(text) == deals + [make_deal(2)]
+
+
+def test_append_to_empty_json_array(tmp_path):
+    path = write(tmp_path / 'deals.json', '[]\n')
+
+    assert json.loads(appended_text(path, make_deal(0))) == [make_deal(0)]
+
+
+def test_append_to_comma_separated_objects_keeps_commas(tmp_path):
+    # The original data.json format: one object per line, separated by commas
+    deals = [make_deal(0), make_deal(1)]
+    path = write(tmp_path / 'deals.json', ',\n'.join(json.dumps(deal) for deal in deals) + '\n')
+
+    text = appended_text(path, make_deal(2))
+
+    # Still a valid comma-separated sequence, not a mix of commas and bare lines
+    assert json.loads('[' + text + ']') == deals + [make_deal(2)]
+    assert text.endswith(',\n' + json.dumps(make_deal(2), ensure_ascii=False) + '\n')
+
+
+def test_append_to_indented_objects_keeps_layout(tmp_path):
+    deals = [make_deal(0), make_deal(1)]
+    path = write(tmp_path / 'deals.json', ',\n'.join(json.dumps(deal, indent=4) for deal in deals))
+
+    text = appended_text(path, make_deal(2))
+
+    assert json.loads('[' + text + ']') == deals + [make_deal(2)]
+    assert text.endswith(',\n' + json.dumps(make_deal(2), indent=4, ensure_ascii=False) + '\n')
+
+
+def test_append_to_ndjson(tmp_path):
+    deals = [make_deal(0), make_deal(1)]
+    path = write(tmp_path / 'deals.ndjson', ''.join(json.dumps(deal) + '\n' for deal in deals))
+
+    text = appended_text(path, make_deal(2))
+
+    assert [json.loads(line) for line in text.splitlines()] == deals + [make_deal(2)]
+
+
+@pytest.mark.parametrize('text', ['', '\n  \n'])
+def test_append_to_empty_file_starts_ndjson(tmp_path, text):
+    path = write(tmp_path / 'deals.json', text)
+
+    assert [json.loads(line) for line in appended_text(path, make_deal(0)).splitlines() if line.strip()] == [make_deal(0)]
+
+
+def test_append_to_single_record_file(tmp_path):
+    path = write(tmp_path / 'deals.json', json.dumps(make_deal(0)) + '\n')
+
+    appended_text(path, make_deal(1))
+    appended_text(path, make_deal(2))
+
+    assert read_deals(path).to_dict('records') == [make_deal(0), make_deal(1), make_deal(2)]
+
+
+def test_append_rejects_a_truncated_file(tmp_path):
+    path = write(tmp_path / 'deals.json', json.dumps(make_deal(0))[:-5])
+
+    with pytest.raises(ValueError):
+        append_deal_to_file(path, make_deal(1))
+
+
+def test_deal_key_ignores_case_and_surrounding_spaces_of_the_company_name():
+    key = deal_key('Acme Energy', '2024-01-15', 5_000_000)
+
+    assert deal_key('  ACME energy ', '2024-01-15', 5_000_000.0) == key
+    assert deal_key('Acme Energy', '2024-01-16', 5_000_000) != key
+    assert deal_key('Acme Energy', '2024-01-15', 5_000_001) != key
+    assert deal_key('Acme Energies', '2024-01-15', 5_000_000) != key
@@ -0,0 +1,70 @@
+import json
+
+import pandas as pd
+
+from deal_store import validate_deal
+from query_engine import DatasetCache, LRUCache, append_deal, load_dataset
+
+
+def test_lru_cache_stats_counts_hits_misses_and_entries():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('c', 3)
+
+    assert cache.get('a') is None
+    assert cache.get('c') == 3
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 2}
+
+
+def write_deals(path, deals):
+    path.write_text(''.join(json.dumps(deal) + '\n' for deal in deals), encoding='utf-8')
+    return str(path)
+
+
+def make_deal(i, **fields):
+    return validate_deal(dict({
+        'Company Name': f"Company {i}", 'Funding Date': f"2024-01-{i + 1:02d}", 'Amount': 1_000_000 * (i + 1),
+        'Currency': 'USD', 'Funding Stage': 'Seed', 'Lead Investor(s)': 'Green Fund',
+        'Other Investors': f"Angel {i}", 'Climate Vertical': 'Energy',
+        'Company Description': 'x', 'Source URL': f"https://example.com/{i}",
+    }, **fields))
+
+
+def test_append_deal_leaves_the_previous_dataset_unchanged(tmp_path):
+    dataset = load_dataset(write_deals(tmp_path / 'deals.json', [make_deal(0), make_deal(1)]))
+    before = {
+        'rows': len(dataset.df),
+        'participation': dataset.participation.copy(),
+        'lookup': {name: positions.tolist() for name, (positions, _) in dataset.investor_lookup.items()},
+        'order': dict(dataset.investor_order),
+        'deal_keys': set(dataset.deal_keys()),
+        'aliases': len(dataset.aliases),
+        'summary': dataset.investor_summary.copy(),
+    }
+
+    appended = append_deal(dataset, make_deal(2, **{'Other Investors': 'Brand New Ventures'}))
+
+    assert len(appended.df) == 3
+    assert 'Brand New Ventures' in appended.investor_order
+    assert appended.investor_lookup['Green Fund'][0].tolist() == [0, 1, 2]
+
+    assert len(dataset.df) == before['rows']
+    pd.testing.assert_frame_equal(dataset.participation, before['participation'])
+    assert {name: positions.tolist() for name, (positions, _) in dataset.investor_lookup.items()} == before['lookup']
+    assert dataset.investor_order == before['order']
+    assert dataset.deal_keys() == before['deal_keys']
+    assert len(dataset.aliases) == before['aliases'] and 'Brand New Ventures' not in dataset.aliases
+    pd.testing.assert_frame_equal(dataset.investor_summary, before['summary'])
+
+
+def test_dataset_cache_append_skips_duplicates(tmp_path):
+    path = write_deals(tmp_path / 'deals.json', [make_deal(0)])
+    cache = DatasetCache()
+
+    dataset, added = cache.append(path, make_deal(0, **{'Company Name': '  COMPANY 0 '}))
+    assert not added and len(dataset.df) == 1
+
+    dataset, added = cache.append(path, make_deal(0, **{'Amount': 1}))
+    assert added and len(dataset.df) == 2
+    assert len(load_dataset(path).df) == 2
@@ -0,0 +1,122 @@
+import json
+
+import pandas as pd
+import pytest
+
+from query_engine import DatasetCache, JsonDealStore
+from sqlite_store import SQLiteDealStore, import_deals
+
+DEALS = [
+    ('Solaris Power', '2024-01-10', 5_000_000, 'USD', 'Seed', 'Green Fund', 'Angel One, Blue Ventures', 'Energy', 'Berlin, Germany'),
+    ('Hydra Water', '2024-01-25', 20_000_000, 'EUR', 'Series A', 'Blue Ventures', 'Green Fund', 'Water', 'Nairobi, Kenya'),
+    ('Carbonix', '2024-03-02', 150_000_000, 'USD', 'Series B', 'Green Fund, Blue Ventures', 'Not specified', 'Carbon Removal', 'Austin, United States'),
+    ('Solar Grid Co', '2024-03-15', 800_000, 'GBP', 'Pre-Seed', 'Angel One', 'Green Fund', 'Energy', 'London, United Kingdom'),
+    # No FX rate for XYZ: the deal counts, its USD amount stays missing
+    ('Zeta Mobility', '2024-04-01', 3_000_000, 'XYZ', 'Seed', 'Blue Ventures', 'Angel One', 'Mobility', 'Somewhere'),
+    ('Terra Farms', '2024-05-20', 60_000_000, 'USD', 'Series B', 'Not specified', 'Not specified', 'Food & Agriculture', 'Sydney, Australia'),
+]
+
+FIELDS = ['Company Name', 'Funding Date', 'Amount', 'Currency', 'Funding Stage',
+          'Lead Investor(s)', 'Other Investors', 'Climate Vertical', 'Company Description']
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """A JSON store and a SQLite store imported from the same file."""
+    source = tmp_path / 'deals.json'
+    records = [dict(zip(FIELDS, deal), **{'Source URL': f"https://example.com/{i}"}) for i, deal in enumerate(DEALS)]
+    source.write_text(json.dumps(records, indent=4), encoding='utf-8')
+    db_path = str(tmp_path / 'deals.db')
+    import_deals(str(source), db_path)
+    return JsonDealStore(str(source), DatasetCache()), SQLiteDealStore(db_path)
+
+
+@pytest.mark.parametrize('lead_only', [False, True])
+@pytest.mark.parametrize('filters, investor_search', [
+    (None, ''),
+    ({'Climate Vertical': ['Energy', 'Water']}, ''),
+    ({'Funding Stage': ['Seed'], 'Deal Size Category': []}, ''),
+    ({'Geography': ['Europe']}, 'fund'),
+    ({'Climate Vertical': ['Mobility']}, ''),
+    (None, 'nobody'),
+])
+def test_investor_summary_matches(stores, lead_only, filters, investor_search):
+    json_store, sqlite_store = stores
+
+    expected = json_store.investor_summary(lead_only, filters, investor_search).reset_index(drop=True)
+    result = sqlite_store.investor_summary(lead_only, filters, investor_search)
+
+    if expected.empty:
+        assert result.empty
+    else:
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_unconvertible_amount_is_not_counted_as_zero(stores):
+    json_store, sqlite_store = stores
+
+    for store in stores:
+        summary = store.investor_summary(filters={'Climate Vertical': ['Mobility']}).set_index('Investor Name')
+        assert summary.loc['Blue Ventures', 'Deals Done'] == 1
+        assert summary.loc['Blue Ventures', 'Total Invested'] == 0
+
+    for store in stores:
+        deals = store.investor_deals('Blue Ventures')
+        assert pd.isna(deals.loc[deals['Company Name'] == 'Zeta Mobility', 'Amount (USD)']).all()
+        assert pd.isna(deals.loc[deals['Company Name'] == 'Zeta Mobility', 'Deal Size Category']).all()
+
+
+@pytest.mark.parametrize('investor', ['Green Fund', 'Blue Ventures', 'Angel One', 'Nobody'])
+def test_investor_deals_match(stores, investor):
+    json_store, sqlite_store = stores
+    columns = ['Company Name', 'Funding Date', 'Amount', 'Currency', 'Role']
+
+    expected = json_store.investor_deals(investor)
+    result = sqlite_store.investor_deals(investor)
+
+    if expected.empty:
+        assert result.empty
+    else:
+        pd.testing.assert_frame_equal(result[columns].reset_index(drop=True), expected[columns].reset_index(drop=True),
+                                      check_dtype=False, check_categorical=False)
+        assert result['Amount (USD)'].isna().tolist() == expected['Amount (USD)'].isna().tolist()
+
+
+@pytest.mark.parametrize('by', ['Shared Deals', 'Shared Lead Deals', 'Shared Capital'])
+@pytest.mark.parametrize('investor', ['Green Fund', 'Blue Ventures', 'Angel One', 'Nobody'])
+def test_co_investors_match(stores, investor, by):
+    json_store, sqlite_store = stores
+
+    expected = json_store.co_investors(investor, k=10, by=by).reset_index(drop=True)
+    result = sqlite_store.co_investors(investor, k=10, by=by)
+
+    if expected.empty:
+        assert result.empty
+    else:
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('measure', ['Deals', 'Capital (USD)', 'Lead Investors'])
+@pytest.mark.parametrize('filters, by', [
+    (None, None),
+    ({'Climate Vertical': ['Energy']}, None),
+    (None, 'Funding Stage'),
+    ({'Geography': ['Europe', 'Africa']}, 'Climate Vertical'),
+])
+def test_funding_trends_match(stores, measure, filters, by):
+    json_store, sqlite_store = stores
+
+    assert sqlite_store.trend_months() == json_store.trend_months()
+    pd.testing.assert_frame_equal(
+        sqlite_store.funding_trends(measure, filters, by),
+        json_store.funding_trends(measure, filters, by),
+        check_dtype=False
+    )
+
+
+@pytest.mark.parametrize('query, fuzzy', [('sol', False), ('SOLAR', False), ('x', False), ('nothing', False), ('Solaris Powr', True)])
+def test_search_companies_match(stores, query, fuzzy):
+    json_store, sqlite_store = stores
+
+    expected = json_store.search_companies(query, fuzzy=fuzzy)['Company Name'].tolist()
+    assert sqlite_store.search_companies(query, fuzzy=fuzzy)['Company Name'].tolist() == expected
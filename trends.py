@@ -0,0 +1,256 @@
+"""
+Funding trends: deals, capital and lead investors per month.
+
+Deals are rolled up once into a cube of cells, one per (funding month,
+climate vertical, funding stage, geography) combination present, holding the
+deal count, the USD capital and the number of lead investor slots of the
+deals in the cell. Trend queries filter and group the cells, never the deals,
+so their cost depends on the number of distinct combinations rather than on
+the number of deals. Deals without a funding date are left out.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Deal columns the cube is broken down by, besides the funding month
+TREND_DIMENSIONS = ['Climate Vertical', 'Funding Stage', 'Geography']
+
+# Measure label -> cube measure
+TREND_MEASURES = {
+    'Deals': 'deals',
+    'Capital (USD)': 'capital',
+    'Lead Investors': 'lead_investors',
+}
+
+# Series label of cells with a missing dimension value
+UNKNOWN_LABEL = 'Unknown'
+
+
+def month_ordinals(dates):
+    """
+    Months since January 1970 of funding dates.
+
+    Args:
+        dates (pd.Series): Funding dates
+
+    Returns:
+        np.ndarray: int64 month numbers, -1 for missing dates
+    """
+    dates = pd.to_datetime(dates).to_numpy(dtype='datetime64[ns]')
+    months = dates.astype('datetime64[M]').astype(np.int64)
+    return np.where(np.isnat(dates), -1, months)
+
+
+def month_starts(months):
+    """
+    Args:
+        months (np.ndarray): Month numbers from month_ordinals
+
+    Returns:
+        pd.DatetimeIndex: First day of each month, named 'Month'
+    """
+    return pd.DatetimeIndex(np.asarray(months, dtype=np.int64).astype('datetime64[M]').astype('datetime64[ns]'), name='Month')
+
+
+def trend_frame(months, amounts, first, last, measure, series=None, labels=None):
+    """
+    Shape aggregated cube cells into a chartable table.
+
+    Args:
+        months (np.ndarray): Month number of each cell
+        amounts (np.ndarray): Measure total of each cell
+        first (int): First month of the table
+        last (int): Last month of the table
+        measure (str): Measure label, the column name of a single series
+        series (np.ndarray): Position in labels of each cell's series, or
+            None for a single series
+        labels (list): Series labels (equal labels are one series)
+
+    Returns:
+        pd.DataFrame: One row per month from first to last and one column per
+            series with a non-zero total, largest total first (ties by label),
+            zero-filled
+    """
+    months = np.asarray(months, dtype=np.int64) - first
+    amounts = np.asarray(amounts, dtype=np.int64)
+    index = month_starts(np.arange(first, last + 1))
+
+    if series is None:
+        table = np.zeros(len(index), dtype=np.int64)
+        np.add.at(table, months, amounts)
+        return pd.DataFrame({measure: table}, index=index)
+
+    label_codes, uniques = pd.factorize(pd.Series(labels, dtype=object))
+    table = np.zeros((len(index), len(uniques)), dtype=np.int64)
+    np.add.at(table, (months, label_codes[np.asarray(series, dtype=np.int64)]), amounts)
+
+    totals = table.sum(axis=0)
+    order = sorted((i for i in range(len(uniques)) if totals[i] != 0), key=lambda i: (-totals[i], uniques[i]))
+    return pd.DataFrame(table[:, order], index=index, columns=pd.Index([uniques[i] for i in order], dtype=object))
+
+
+class FundingCube:
+    """
+    Monthly rollup of deals by climate vertical, funding stage and geography.
+    """
+
+    def __init__(self, months, dimensions, capital, lead_investors):
+        """
+        Args:
+            months (np.ndarray): Month number of every deal (-1 if undated)
+            dimensions (dict): TREND_DIMENSIONS -> pd.Series of every deal's value
+            capital (np.ndarray): USD amount of every deal
+            lead_investors (np.ndarray): Lead investors of every deal
+        """
+        dated = months >= 0
+
+        # Dimension values and their codes, -1 for missing values
+        self._values = {}
+        self._value_ids = {}
+        codes = []
+        for column in TREND_DIMENSIONS:
+            column_codes, uniques = pd.factorize(dimensions[column].to_numpy(dtype=object))
+            self._values[column] = list(uniques)
+            self._value_ids[column] = {value: i for i, value in enumerate(self._values[column])}
+            codes.append(column_codes[dated].astype(np.int64))
+        months = months[dated]
+
+        # One key per cell: the month and the codes in mixed radix
+        first = months.min() if len(months) else 0
+        keys = months - first
+        for column, column_codes in zip(TREND_DIMENSIONS, codes):
+            keys = keys * (len(self._values[column]) + 1) + column_codes + 1
+
+        # Any order of equal keys gives the same sums, so the faster unstable sort is enough
+        order = np.argsort(keys)
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+
+        self._months = months[order][starts]
+        self._codes = np.column_stack([column_codes[order][starts] for column_codes in codes]) if len(starts) else np.zeros((0, len(TREND_DIMENSIONS)), dtype=np.int64)
+        self._measures = {
+            'deals': np.diff(np.r_[starts, len(keys)]).astype(np.int64),
+            'capital': np.add.reduceat(np.asarray(capital, dtype=np.int64)[dated][order], starts) if len(starts) else np.array([], dtype=np.int64),
+            'lead_investors': np.add.reduceat(np.asarray(lead_investors, dtype=np.int64)[dated][order], starts) if len(starts) else np.array([], dtype=np.int64),
+        }
+
+        # Cells changed by appended(): {(month, *codes): [deals, capital, lead_investors]}
+        self._extra = {}
+        # Cell arrays with the overlay merged in, built on first query
+        self._merged = None
+
+    @classmethod
+    def from_deals(cls, df, participation):
+        """
+        Build the cube of a deals table.
+
+        Args:
+            df (pd.DataFrame): Enriched deals
+            participation (pd.DataFrame): Participation index from
+                enrichment.build_participation_index
+
+        Returns:
+            FundingCube: Cube of every dated deal in df
+        """
+        leads = df.index.get_indexer(participation['Deal ID'][(participation['Role'] == 'Lead').to_numpy()])
+        return cls(
+            month_ordinals(df['Funding Date']),
+            {column: df[column] for column in TREND_DIMENSIONS},
+            df['Amount (USD)'].to_numpy(dtype=np.int64, na_value=0),
+            np.bincount(leads, minlength=len(df))
+        )
+
+    def appended(self, funding_date, values, capital, lead_investors):
+        """
+        Return a copy of the cube with one more deal.
+
+        Only the overlay of changed cells is copied; the cell arrays are
+        shared with this cube.
+
+        Args:
+            funding_date (pd.Timestamp): Funding date of the deal (missing: the deal is left out)
+            values (dict): TREND_DIMENSIONS -> value of the new deal
+            capital (int): USD amount of the deal (missing: adds no capital)
+            lead_investors (int): Lead investors of the deal
+
+        Returns:
+            FundingCube: Cube including the deal
+        """
+        cube = copy.copy(self)
+        if pd.isna(funding_date):
+            return cube
+
+        key = [int(month_ordinals(pd.Series([funding_date]))[0])]
+        for column in TREND_DIMENSIONS:
+            value = values[column]
+            if pd.isna(value):
+                key.append(-1)
+                continue
+            if value not in self._value_ids[column]:
+                cube._values = {**cube._values, column: cube._values[column] + [value]}
+                cube._value_ids = {**cube._value_ids, column: {**cube._value_ids[column], value: len(cube._values[column]) - 1}}
+            key.append(cube._value_ids[column][value])
+
+        cube._extra = dict(self._extra)
+        cube._merged = None
+        totals = cube._extra.get(tuple(key), [0, 0, 0])
+        cube._extra[tuple(key)] = [totals[0] + 1, totals[1] + (0 if pd.isna(capital) else int(capital)), totals[2] + int(lead_investors)]
+        return cube
+
+    def _cells(self):
+        # Months, codes and measures of all cells, appended deals included
+        if not self._extra:
+            return self._months, self._codes, self._measures
+        if self._merged is None:
+            keys = np.array(list(self._extra), dtype=np.int64)
+            totals = np.array(list(self._extra.values()), dtype=np.int64)
+            measures = {name: np.r_[self._measures[name], totals[:, i]] for i, name in enumerate(TREND_MEASURES.values())}
+            self._merged = (np.r_[self._months, keys[:, 0]], np.vstack([self._codes, keys[:, 1:]]), measures)
+        return self._merged
+
+    def month_range(self):
+        """
+        Returns:
+            tuple: (first, last) month numbers with deals, (0, -1) for an empty cube
+        """
+        months = self._cells()[0]
+        return (int(months.min()), int(months.max())) if len(months) else (0, -1)
+
+    def trend(self, measure='Deals', filters=None, by=None, start=None, end=None):
+        """
+        Monthly totals of a measure over the deals matching filters.
+
+        Args:
+            measure (str): A key of TREND_MEASURES
+            filters (dict): TREND_DIMENSIONS -> values to keep; None or an
+                empty list leaves the column unfiltered, and a missing value in
+                the list keeps deals without a value
+            by (str): A TREND_DIMENSIONS column to split into one series per value
+            start (int): First month number shown (default: first month with deals)
+            end (int): Last month number shown (default: last month with deals)
+
+        Returns:
+            pd.DataFrame: See trend_frame
+        """
+        months, codes, measures = self._cells()
+        first, last = self.month_range()
+        first = first if start is None else max(first, start)
+        last = last if end is None else min(last, end)
+
+        keep = (months >= first) & (months <= last)
+        for column, values in (filters or {}).items():
+            if values is None or len(values) == 0:
+                continue
+            ids = self._value_ids[column]
+            allowed = [ids[value] for value in values if not pd.isna(value) and value in ids]
+            allowed += [-1] if any(pd.isna(value) for value in values) else []
+            keep &= np.isin(codes[:, TREND_DIMENSIONS.index(column)], allowed)
+
+        amounts = measures[TREND_MEASURES[measure]][keep]
+        if by is None:
+            return trend_frame(months[keep], amounts, first, last, measure)
+
+        labels = [UNKNOWN_LABEL] + [str(value) for value in self._values[by]]
+        series = codes[keep, TREND_DIMENSIONS.index(by)] + 1
+        return trend_frame(months[keep], amounts, first, last, measure, series, labels)